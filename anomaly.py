@@ -0,0 +1,144 @@
+"""Anomaly Detection - Streaming latency/throughput baselines per connector."""
+
+import logging
+import math
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from dataclasses import dataclass, field
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Ewma:
+    """Exponentially weighted mean and variance in O(1) memory."""
+    alpha: float = 0.2
+    mean: float = 0.0
+    var: float = 0.0
+    samples: int = 0
+
+    def update(self, value: float) -> None:
+        if self.samples == 0:
+            self.mean = value
+        else:
+            delta = value - self.mean
+            self.mean += self.alpha * delta
+            self.var = (1 - self.alpha) * (self.var + self.alpha * delta * delta)
+        self.samples += 1
+
+    def zscore(self, value: float) -> float:
+        std = math.sqrt(self.var)
+        if std == 0:
+            return 0.0 if value == self.mean else math.copysign(math.inf, value - self.mean)
+        return (value - self.mean) / std
+
+@dataclass
+class AnomalyConfig:
+    alpha: float = 0.2
+    warmup: int = 5
+    z_threshold: float = 3.0
+    latency_ratio: float = 2.0      # spike must also be this many times the mean
+    collapse_ratio: float = 0.5     # items below this fraction of the mean
+    trigger_after: int = 1
+    clear_after: int = 3
+    rebaseline_after: int = 20
+
+@dataclass
+class ConnectorBaseline:
+    latency: Ewma
+    items: Ewma
+    anomalous: bool = False
+    reasons: List[str] = field(default_factory=list)
+    bad_streak: int = 0
+    good_streak: int = 0
+    episodes: int = 0
+
+class AnomalyDetector:
+    """Flags latency spikes and throughput collapse per (connector, operation).
+
+    A connector enters the anomalous state after ``trigger_after``
+    consecutive bad samples and leaves it after ``clear_after`` good ones.
+    Anomalous samples are kept out of the baseline unless the shift persists
+    for ``rebaseline_after`` samples, at which point it becomes the new normal.
+    """
+
+    def __init__(self, config: Optional[AnomalyConfig] = None):
+        self.config = config or AnomalyConfig()
+        self.baselines: Dict[Tuple[str, str], ConnectorBaseline] = {}
+
+    def observe(self, connector: str, operation: str, seconds: float,
+                items: int = 0, error: bool = False) -> None:
+        if error:
+            return
+        c = self.config
+        key = (connector, operation)
+        b = self.baselines.get(key)
+        if b is None:
+            b = self.baselines[key] = ConnectorBaseline(Ewma(c.alpha), Ewma(c.alpha))
+
+        reasons = []
+        if b.latency.samples >= c.warmup:
+            if b.latency.zscore(seconds) > c.z_threshold and seconds > b.latency.mean * c.latency_ratio:
+                reasons.append("latency_spike")
+            if b.items.mean > 0 and b.items.zscore(items) < -c.z_threshold and items < b.items.mean * c.collapse_ratio:
+                reasons.append("throughput_collapse")
+
+        if reasons:
+            b.bad_streak += 1
+            b.good_streak = 0
+            if not b.anomalous and b.bad_streak >= c.trigger_after:
+                b.anomalous = True
+                b.episodes += 1
+                logger.warning(f"[Anomaly] {connector}.{operation}: {', '.join(reasons)} "
+                               f"(latency {seconds * 1000:.1f}ms vs {b.latency.mean * 1000:.1f}ms, "
+                               f"items {items} vs {b.items.mean:.1f})")
+            b.reasons = reasons
+            if b.bad_streak >= c.rebaseline_after:
+                b.latency, b.items = Ewma(c.alpha), Ewma(c.alpha)
+                b.bad_streak = 0
+            else:
+                return
+        else:
+            b.good_streak += 1
+            b.bad_streak = 0
+            if b.anomalous and b.good_streak >= c.clear_after:
+                b.anomalous = False
+                b.reasons = []
+                logger.info(f"[Anomaly] {connector}.{operation} recovered")
+        b.latency.update(seconds)
+        b.items.update(items)
+
+    def is_anomalous(self, connector: str) -> bool:
+        return any(b.anomalous for (name, _), b in self.baselines.items() if name == connector)
+
+    def anomalous_connectors(self, connectors: Optional[Iterable[str]] = None) -> List[str]:
+        names = {name for (name, _), b in self.baselines.items() if b.anomalous}
+        if connectors is not None:
+            names &= set(connectors)
+        return sorted(names)
+
+    def reset(self) -> None:
+        self.baselines.clear()
+
+    def backoff_factor(self, connector: str, max_factor: float = 8.0) -> float:
+        """Interval multiplier for schedulers: 1.0 normally, growing with the bad streak."""
+        streaks = [b.bad_streak for (name, _), b in self.baselines.items() if name == connector and b.anomalous]
+        if not streaks:
+            return 1.0
+        return min(max_factor, 2.0 ** max(1, max(streaks)))
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            f"{connector}.{operation}": {
+                "anomalous": b.anomalous,
+                "reasons": b.reasons,
+                "latency_mean_ms": round(b.latency.mean * 1000, 3),
+                "latency_std_ms": round(math.sqrt(b.latency.var) * 1000, 3),
+                "items_mean": round(b.items.mean, 3),
+                "episodes": b.episodes
+            }
+            for (connector, operation), b in self.baselines.items()
+        }
+
+DETECTOR = AnomalyDetector()
+REGISTRY.subscribe(DETECTOR.observe)
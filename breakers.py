@@ -0,0 +1,187 @@
+"""Breakers - Per-connector circuit breakers and failure-isolated fan-out."""
+
+import asyncio
+import logging
+import random
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Any, Awaitable, Deque, Optional, Tuple
+
+from clock import Clock, SYSTEM_CLOCK
+from limits import throttle_signal
+
+logger = logging.getLogger(__name__)
+
+class BreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+@dataclass
+class BreakerPolicy:
+    window: float = 60.0            # seconds of call outcomes considered
+    min_calls: int = 5              # outcomes needed in the window before it can trip
+    error_rate: float = 0.5         # trip when this share of calls failed...
+    slow_call: float = 5.0          # ...or when calls slower than this (seconds)
+    slow_rate: float = 0.8          # make up this share of the window
+    call_timeout: float = 30.0      # a call still running after this counts as failed
+    base_backoff: float = 1.0       # first open period
+    max_backoff: float = 120.0
+
+class CircuitOpenError(Exception):
+    """Raised without calling the endpoint while its breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit open for {name}, next probe in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Closed -> open on a bad window; open -> half-open after a backoff; one probe decides.
+
+    Open periods follow decorrelated jitter (each one drawn between the base
+    and three times the previous), so breakers on a shared outage do not
+    probe in lockstep. Throttle responses are left to the rate limiter and
+    never trip the breaker: a 429 means the endpoint is alive.
+    """
+
+    def __init__(self, name: str, policy: Optional[BreakerPolicy] = None, clock: Clock = SYSTEM_CLOCK):
+        self.name = name
+        self.policy = policy or BreakerPolicy()
+        self.clock = clock
+        self.state = BreakerState.CLOSED
+        self.outcomes: Deque[Tuple[float, bool, bool]] = deque()   # (at, failed, slow)
+        self.backoff = 0.0
+        self.open_until = 0.0
+        self.probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    def retry_in(self, now: Optional[float] = None) -> float:
+        return max(0.0, self.open_until - (self.clock.monotonic() if now is None else now))
+
+    def check(self) -> None:
+        """Fail fast while open; does not claim the half-open probe."""
+        if self.state is BreakerState.OPEN and self.retry_in() > 0:
+            self.rejected += 1
+            raise CircuitOpenError(self.name, self.retry_in())
+
+    def _admit(self) -> None:
+        if self.state is BreakerState.OPEN:
+            self.check()
+            self.state = BreakerState.HALF_OPEN
+            logger.info(f"[Breaker] {self.name} half-open, probing")
+        if self.state is BreakerState.HALF_OPEN:
+            if self.probing:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self.probing = True
+
+    @contextmanager
+    def guard(self):
+        """Admit one call and record its outcome; the body is the call itself."""
+        self._admit()
+        probe = self.probing
+        started = self.clock.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if throttle_signal(e)[0]:
+                self._settle(probe, None)
+            else:
+                self._settle(probe, (True, self.clock.monotonic() - started))
+            raise
+        except BaseException:
+            self._settle(probe, None)   # cancelled: no verdict either way
+            raise
+        self._settle(probe, (False, self.clock.monotonic() - started))
+
+    def _settle(self, probe: bool, outcome: Optional[Tuple[bool, float]]) -> None:
+        if probe:
+            self.probing = False
+            if outcome is None:
+                return
+            failed, latency = outcome
+            if failed or latency > self.policy.slow_call:
+                self._trip("probe failed" if failed else f"probe took {latency:.2f}s")
+            else:
+                self.state = BreakerState.CLOSED
+                self.outcomes.clear()
+                self.backoff = 0.0
+                logger.info(f"[Breaker] {self.name} closed")
+            return
+        if outcome is None or self.state is not BreakerState.CLOSED:
+            return
+
+        now = self.clock.monotonic()
+        failed, latency = outcome
+        self.outcomes.append((now, failed, latency > self.policy.slow_call))
+        while self.outcomes and self.outcomes[0][0] < now - self.policy.window:
+            self.outcomes.popleft()
+        calls = len(self.outcomes)
+        if calls < self.policy.min_calls:
+            return
+        errors = sum(1 for _, f, _ in self.outcomes if f)
+        slow = sum(1 for _, _, s in self.outcomes if s)
+        if errors / calls >= self.policy.error_rate:
+            self._trip(f"{errors}/{calls} calls failed")
+        elif slow / calls >= self.policy.slow_rate:
+            self._trip(f"{slow}/{calls} calls slower than {self.policy.slow_call}s")
+
+    def _trip(self, reason: str) -> None:
+        policy = self.policy
+        self.backoff = min(policy.max_backoff,
+                           random.uniform(policy.base_backoff, max(policy.base_backoff, self.backoff * 3)))
+        self.open_until = self.clock.monotonic() + self.backoff
+        self.state = BreakerState.OPEN
+        self.outcomes.clear()
+        self.trips += 1
+        logger.warning(f"[Breaker] {self.name} open for {self.backoff:.1f}s: {reason}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "window_calls": len(self.outcomes),
+            "window_errors": sum(1 for _, f, _ in self.outcomes if f),
+            "retry_in": round(self.retry_in(), 3) if self.state is BreakerState.OPEN else None,
+            "trips": self.trips,
+            "rejected": self.rejected
+        }
+
+class BreakerRegistry:
+    """One breaker per connector name, created on first use, on the registry's clock."""
+
+    def __init__(self, policy: Optional[BreakerPolicy] = None, clock: Clock = SYSTEM_CLOCK):
+        self.policy = policy or BreakerPolicy()
+        self.clock = clock
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers[name] = CircuitBreaker(name, self.policy, self.clock)
+        return breaker
+
+    def reset(self) -> None:
+        self.breakers.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {name: breaker.get_status() for name, breaker in self.breakers.items()}
+
+BREAKERS = BreakerRegistry()
+
+async def gather_isolated(calls: Dict[str, Awaitable]) -> Tuple[List[Any], Dict[str, BaseException]]:
+    """Await per-connector calls concurrently; a failing connector never fails or cancels the rest.
+
+    Returns the successful results in call order and the errors by connector name.
+    """
+    outcomes = await asyncio.gather(*calls.values(), return_exceptions=True)
+    results, failures = [], {}
+    for name, outcome in zip(calls, outcomes):
+        if isinstance(outcome, BaseException):
+            failures[name] = outcome
+        else:
+            results.append(outcome)
+    return results, failures
@@ -2,11 +2,21 @@
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from tracing import TRACER
+from startup import CONNECT_GATE, READINESS
+from scheduler import SCHEDULER
+from transport import BaseConnector
+from metrics import instrumented
+from log_writer import kv
+from simulation import SIMULATION
+from breakers import gather_isolated
+
 logger = logging.getLogger(__name__)
 
 class CacheType(Enum):
@@ -20,71 +30,108 @@ class CacheConfig:
     host: str
     port: int
 
-class CacheConnector:
+class CacheConnector(BaseConnector):
     def __init__(self, config: CacheConfig):
-        self.config = config
-        self.connected = False
-        self.last_sync: Optional[datetime] = None
+        super().__init__(config)
         self.keys_synced = 0
+        self.keys_invalidated = 0
     
-    async def connect(self) -> bool:
-        logger.info(f"[{self.config.name}] Connecting to {self.config.cache_type.value}...")
-        await asyncio.sleep(0.1)
-        self.connected = True
-        return True
+    @property
+    def target(self) -> str:
+        return self.config.cache_type.value
     
+    @instrumented("sync_cache")
     async def sync_cache(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.connected:
-            raise Exception("Not connected")
+        self.ensure_connected()
+        encoded = self.encode(data)
         
-        logger.info(f"[{self.config.name}] Syncing {len(data)} cache entries...")
+        logger.debug(kv("sync_cache", connector=self.config.name, entries=len(data), bytes=len(encoded.body)))
         await asyncio.sleep(0.05)
         
-        self.last_sync = datetime.utcnow()
+        self.last_sync = self.clock.utcnow()
         self.keys_synced += len(data)
         
         return {
             "cache": self.config.name,
             "keys_synced": len(data),
             "total_keys": self.keys_synced,
-            "timestamp": self.last_sync.isoformat()
+            "wire_bytes": len(encoded.body),
+            "timestamp": self.last_sync
+        }
+    
+    @instrumented("invalidate")
+    async def invalidate(self, keys: List[str]) -> Dict[str, Any]:
+        self.ensure_connected()
+        
+        logger.debug(kv("invalidate", connector=self.config.name, keys=len(keys)))
+        await asyncio.sleep(0.01)
+        
+        self.keys_invalidated += len(keys)
+        
+        return {
+            "cache": self.config.name,
+            "keys_invalidated": len(keys),
+            "total_invalidated": self.keys_invalidated
         }
 
 class CacheSyncManager:
-    def __init__(self):
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
         self.connectors: Dict[str, CacheConnector] = {}
-        self.sync_history: List[Dict[str, Any]] = []
+        self.clock = clock
+        self.sync_history = HistoryStore(clock=clock)
+        self.polled = 0
         self.is_running = False
     
     def register_cache(self, config: CacheConfig) -> None:
-        self.connectors[config.name] = CacheConnector(config)
+        connector = self.connectors[config.name] = CacheConnector(config)
+        connector.clock = self.clock
         logger.info(f"Registered cache: {config.name}")
     
-    async def run_continuous_sync(self, check_interval: int = 20) -> None:
+    async def invalidate_keys(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """Drop changed keys from every cache so the next read fetches them fresh."""
+        results, failures = await gather_isolated(
+            {name: c.invalidate(keys) for name, c in self.connectors.items()})
+        for name, error in failures.items():
+            self.sync_history.record(name, "invalidate", 0, ok=False)
+            logger.error(f"✗ {name}: {error}")
+        for result in results:
+            self.sync_history.record(result["cache"], "invalidate", result["keys_invalidated"])
+        return results
+    
+    async def run_continuous_sync(self, check_interval: int = 20, initial_delay: float = 0.0) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("CACHE SYNC MANAGER STARTED")
         logger.info("="*80 + "\n")
         
-        for connector in self.connectors.values():
-            await connector.connect()
+        await CONNECT_GATE.connect_all("cache_sync", self.connectors)
         
         try:
             iteration = 0
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Cycle {iteration}] Syncing cache...")
-                
-                sample_data = {f"key_{i}": f"value_{i}" for i in range(10)}
+                with TRACER.span("cache_sync.cycle", iteration=iteration):
+                    changed = SIMULATION.changes("cache_sync", 10)
+                    sample_data = {f"key_{i}": f"value_{i}" for i in range(changed)}
                 
-                tasks = [c.sync_cache(sample_data) for c in self.connectors.values()]
-                results = await asyncio.gather(*tasks)
+                    results, failures = await gather_isolated(
+                        {name: c.sync_cache(sample_data) for name, c in self.connectors.items()})
                 
-                for result in results:
-                    self.sync_history.append(result)
-                    logger.info(f"✓ {result['cache']}: {result['keys_synced']} keys")
+                    for name, error in failures.items():
+                        self.sync_history.record(name, "sync_cache", 0, ok=False)
+                        logger.error(f"✗ {name}: {error}")
+                    for result in results:
+                        self.sync_history.record(result["cache"], "sync_cache", result["keys_synced"])
+                        logger.debug(kv("synced", connector=result["cache"], keys=result["keys_synced"]))
+                    logger.info(kv("cycle", subsystem="cache_sync", iteration=iteration, ok=len(results), failed=len(failures),
+                                keys=sum(r["keys_synced"] for r in results)))
+                    self.polled += sum(r["keys_synced"] for r in results)
                 
-                await asyncio.sleep(check_interval)
+                READINESS.synced("cache_sync")
+                await asyncio.sleep(SCHEDULER.next_interval(
+                    "cache_sync", check_interval, self.polled, self.connectors))
         
         except KeyboardInterrupt:
             logger.info("Cache sync stopped.")
@@ -96,5 +143,6 @@ class CacheSyncManager:
         return {
             "running": self.is_running,
             "cache_providers": list(self.connectors.keys()),
-            "total_syncs": len(self.sync_history)
+            "total_syncs": self.sync_history.total_records,
+            "total_invalidated": self.sync_history.total("invalidate")
         }
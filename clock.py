@@ -0,0 +1,31 @@
+"""Clock - Time source for components that schedule, limit, trace and record."""
+
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class Clock:
+    """Real time; ``monotonic`` for intervals and deadlines, ``time`` for timestamps.
+
+    Limiters, breakers, metrics, the tracer, sync history, connectors,
+    startup readiness, monitoring, pipelines and bulk loads read the clock
+    they were given instead of the ``time`` module, so a simulation can run
+    them on virtual time while everything else in the process stays on
+    real time.
+    """
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def time_ns(self) -> int:
+        return time.time_ns()
+
+    def utcnow(self) -> datetime:
+        return datetime.utcnow()
+
+SYSTEM_CLOCK = Clock()
@@ -0,0 +1,326 @@
+"""Cluster - Lease-based partitioning of connectors across orchestrator nodes."""
+
+import abc
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from process_pool import connector_map
+from startup import CONNECT_GATE
+
+logger = logging.getLogger(__name__)
+
+# A node stops trusting a lease this fraction of the TTL before it expires,
+# so the next owner (which must wait for expiry) never overlaps it
+LEASE_SAFETY_MARGIN = 0.2
+
+def rendezvous_owner(partition: str, nodes: Iterable[str]) -> Optional[str]:
+    """Highest-random-weight owner: a node joining or leaving moves only its own share."""
+    def weight(node: str) -> int:
+        return int.from_bytes(hashlib.blake2b(f"{node}|{partition}".encode(), digest_size=8).digest(), "big")
+    return max(nodes, key=weight, default=None)
+
+class StaleLeaseError(RuntimeError):
+    """A write was attempted under a fencing token that is no longer current."""
+
+class CoordinationBackend(abc.ABC):
+    """Shared store for node heartbeats and partition leases.
+
+    ``acquire`` must be atomic across nodes. Every change of owner bumps
+    the partition's fencing token, so a holder of an older token can
+    always be told apart from the current one.
+    """
+
+    @abc.abstractmethod
+    def heartbeat(self, node_id: str, ttl: float) -> None:
+        """Mark the node live for the next ``ttl`` seconds."""
+
+    @abc.abstractmethod
+    def live_nodes(self) -> List[str]:
+        """Nodes whose heartbeat has not expired."""
+
+    @abc.abstractmethod
+    def acquire(self, node_id: str, partitions: Iterable[str], ttl: float) -> Dict[str, int]:
+        """Grant or renew leases; returns partition -> fencing token for the ones granted."""
+
+    @abc.abstractmethod
+    def release(self, node_id: str, partitions: Iterable[str]) -> None:
+        """Give up leases the node holds, so another node can take them at once."""
+
+    @abc.abstractmethod
+    def validate(self, partition: str, token: int) -> bool:
+        """Whether ``token`` is still the current, unexpired token for the partition."""
+
+    @abc.abstractmethod
+    def leave(self, node_id: str) -> None:
+        """Release every lease the node holds and forget its heartbeat."""
+
+    @abc.abstractmethod
+    def leases(self) -> Dict[str, Dict[str, Any]]:
+        """Unexpired leases: partition -> owner, token and expiry."""
+
+class SQLiteCoordinator(CoordinationBackend):
+    """Coordination in one SQLite file, shared by the nodes of a host or a test.
+
+    Calls block for up to ``busy_timeout`` while another node holds the
+    write lock, so ClusterMember makes them from worker threads; the
+    connection is shared between those threads under a lock.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS nodes (node_id TEXT PRIMARY KEY, expires REAL NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS leases (partition TEXT PRIMARY KEY, owner TEXT, "
+                        "token INTEGER NOT NULL, expires REAL NOT NULL)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self.db.execute(sql, params).fetchall()
+
+    def heartbeat(self, node_id: str, ttl: float) -> None:
+        with self._transaction() as db:
+            db.execute("INSERT INTO nodes VALUES (?, ?) ON CONFLICT(node_id) DO UPDATE SET expires = excluded.expires",
+                       (node_id, time.time() + ttl))
+
+    def live_nodes(self) -> List[str]:
+        rows = self._query("SELECT node_id FROM nodes WHERE expires > ? ORDER BY node_id", (time.time(),))
+        return [node_id for (node_id,) in rows]
+
+    def acquire(self, node_id: str, partitions: Iterable[str], ttl: float) -> Dict[str, int]:
+        granted = {}
+        with self._transaction() as db:
+            now = time.time()
+            for partition in partitions:
+                row = db.execute("SELECT owner, token, expires FROM leases WHERE partition = ?", (partition,)).fetchone()
+                if row is None:
+                    token = 1
+                    db.execute("INSERT INTO leases VALUES (?, ?, ?, ?)", (partition, node_id, token, now + ttl))
+                else:
+                    owner, token, expires = row
+                    held = expires > now
+                    if held and owner != node_id:
+                        continue
+                    if not (held and owner == node_id):
+                        token += 1
+                    db.execute("UPDATE leases SET owner = ?, token = ?, expires = ? WHERE partition = ?",
+                               (node_id, token, now + ttl, partition))
+                granted[partition] = token
+        return granted
+
+    def release(self, node_id: str, partitions: Iterable[str]) -> None:
+        with self._transaction() as db:
+            db.executemany("UPDATE leases SET owner = NULL, expires = 0 WHERE partition = ? AND owner = ?",
+                           [(p, node_id) for p in partitions])
+
+    def validate(self, partition: str, token: int) -> bool:
+        rows = self._query("SELECT token, expires FROM leases WHERE partition = ?", (partition,))
+        return bool(rows) and rows[0][0] == token and rows[0][1] > time.time()
+
+    def leave(self, node_id: str) -> None:
+        with self._transaction() as db:
+            db.execute("UPDATE leases SET owner = NULL, expires = 0 WHERE owner = ?", (node_id,))
+            db.execute("DELETE FROM nodes WHERE node_id = ?", (node_id,))
+
+    def leases(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._query("SELECT partition, owner, token, expires FROM leases WHERE expires > ?", (time.time(),))
+        return {p: {"owner": owner, "token": token, "expires": expires} for p, owner, token, expires in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.close()
+
+@dataclass
+class Fence:
+    """The lease a connector or sync pair writes under; ``check`` refuses a superseded token."""
+    partition: str
+    token: int
+    member: "ClusterMember"
+
+    async def check(self) -> None:
+        if not await self.member.validate(self.partition, self.token):
+            raise StaleLeaseError(f"{self.partition}: fencing token {self.token} is no longer current")
+
+class ClusterMember:
+    """One orchestrator node's share of the registered connectors.
+
+    Every connector (or database sync pair) is a partition named
+    ``subsystem/connector`` (``database_sync/source->target``). Each round the
+    node heartbeats, computes its rendezvous share over the live nodes,
+    releases what it should no longer own and acquires or renews the rest.
+    Managers only see owned partitions: their connector map and sync pairs
+    are swapped for filtered views whenever ownership changes. Owned
+    connectors (or, for pair managers, pairs) also carry a ``Fence`` that is
+    checked against the backend before each write, so a node that lost its
+    lease without noticing cannot write over the new owner. Backend calls
+    run in worker threads.
+    """
+
+    def __init__(self, node_id: str, backend: CoordinationBackend,
+                 lease_ttl: float = 15.0, renew_interval: float = 5.0):
+        self.node_id = node_id
+        self.backend = backend
+        self.lease_ttl = lease_ttl
+        self.renew_interval = renew_interval
+        self.partitions: Dict[str, Tuple[str, str]] = {}
+        self.tokens: Dict[str, int] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._managers: Dict[str, Tuple[Any, Dict[str, Any], Optional[List[tuple]]]] = {}
+        self.nodes: List[str] = []
+        self.rebalances = 0
+        self.is_running = False
+
+    @staticmethod
+    def pair_partition(subsystem: str, pair: tuple) -> str:
+        return f"{subsystem}/{pair[0]}->{pair[1]}"
+
+    def register_manager(self, subsystem: str, manager: Any) -> None:
+        """Take over a manager's connector view; it syncs nothing until leases are granted."""
+        connectors = dict(connector_map(manager))
+        pairs = list(manager.sync_pairs) if getattr(manager, "sync_pairs", None) else None
+        if pairs is not None:
+            for pair in pairs:
+                self.partitions[self.pair_partition(subsystem, pair)] = (subsystem, f"{pair[0]}->{pair[1]}")
+        else:
+            for name in connectors:
+                self.partitions[f"{subsystem}/{name}"] = (subsystem, name)
+        self._managers[subsystem] = (manager, connectors, pairs)
+        self._apply_view(subsystem)
+
+    def owns(self, partition: str) -> bool:
+        return partition in self.tokens and time.time() < self._deadlines[partition]
+
+    def fencing_token(self, partition: str) -> Optional[int]:
+        return self.tokens.get(partition) if self.owns(partition) else None
+
+    def fence(self, partition: str) -> Optional[Fence]:
+        token = self.fencing_token(partition)
+        return Fence(partition, token, self) if token is not None else None
+
+    async def validate(self, partition: str, token: int) -> bool:
+        """Whether ``token`` is ours, unexpired locally, and still current in the backend."""
+        if self.fencing_token(partition) != token:
+            return False
+        return await asyncio.to_thread(self.backend.validate, partition, token)
+
+    async def check_fence(self, partition: str) -> bool:
+        """Ask the backend whether our token is still the current one for this partition."""
+        token = self.fencing_token(partition)
+        return token is not None and await self.validate(partition, token)
+
+    def _apply_view(self, subsystem: str) -> None:
+        manager, connectors, pairs = self._managers[subsystem]
+        if pairs is not None:
+            manager.sync_pairs = [p for p in pairs if self.owns(self.pair_partition(subsystem, p))]
+            manager.fences = {f"{p[0]}->{p[1]}": self.fence(self.pair_partition(subsystem, p))
+                              for p in manager.sync_pairs}
+            used = {name for pair in manager.sync_pairs for name in pair[:2]}
+            view = {n: c for n, c in connectors.items() if n in used}
+        else:
+            view = {n: c for n, c in connectors.items() if self.owns(f"{subsystem}/{n}")}
+            for name, connector in connectors.items():
+                connector.fence = self.fence(f"{subsystem}/{name}")
+        if hasattr(manager, "providers"):
+            manager.providers = view
+        else:
+            manager.connectors = view
+
+    async def _connect_owned(self) -> None:
+        idle = [(name, c) for manager, _, _ in self._managers.values()
+                for name, c in connector_map(manager).items() if not c.connected]
+        # Failures are logged by the gate; the lease stays and the next round retries
+        await asyncio.gather(*(CONNECT_GATE.connect(name, c) for name, c in idle), return_exceptions=True)
+
+    async def rebalance(self) -> None:
+        await asyncio.to_thread(self.backend.heartbeat, self.node_id, self.lease_ttl)
+        self.nodes = sorted(set(await asyncio.to_thread(self.backend.live_nodes)) | {self.node_id})
+        wanted = {p for p in self.partitions if rendezvous_owner(p, self.nodes) == self.node_id}
+
+        dropped = set(self.tokens) - wanted
+        if dropped:
+            # Stop writing before the lease is given up
+            for p in dropped:
+                self.tokens.pop(p, None)
+            for subsystem in self._managers:
+                self._apply_view(subsystem)
+            await asyncio.to_thread(self.backend.release, self.node_id, dropped)
+        now = time.time()
+        granted = await asyncio.to_thread(self.backend.acquire, self.node_id, wanted, self.lease_ttl)
+        changed = bool(dropped) or set(granted) != set(self.tokens) or any(self.tokens.get(p) != t for p, t in granted.items())
+        self.tokens = granted
+        self._deadlines = {p: now + self.lease_ttl * (1 - LEASE_SAFETY_MARGIN) for p in granted}
+        self.rebalances += 1
+
+        if changed:
+            logger.info(f"[Cluster] {self.node_id} owns {len(granted)}/{len(self.partitions)} partitions "
+                        f"across {len(self.nodes)} nodes ({len(wanted) - len(granted)} awaiting release)")
+        for subsystem in self._managers:
+            self._apply_view(subsystem)
+        await self._connect_owned()
+
+    def _expire(self) -> None:
+        """Drop leases we could not renew in time so no sync runs on a lapsed lease."""
+        now = time.time()
+        lapsed = [p for p, deadline in self._deadlines.items() if deadline <= now]
+        if lapsed:
+            logger.warning(f"[Cluster] {self.node_id} lost {len(lapsed)} leases")
+            for p in lapsed:
+                self.tokens.pop(p, None)
+                self._deadlines.pop(p, None)
+            for subsystem in self._managers:
+                self._apply_view(subsystem)
+
+    async def run(self) -> None:
+        self.is_running = True
+        logger.info(f"[Cluster] Node {self.node_id} joined with {len(self.partitions)} partitions")
+        try:
+            while self.is_running:
+                try:
+                    await self.rebalance()
+                except Exception as e:
+                    logger.error(f"[Cluster] Rebalance failed on {self.node_id}: {e}")
+                    self._expire()
+                wake = self.renew_interval
+                if self._deadlines:
+                    wake = min(wake, min(self._deadlines.values()) - time.time())
+                await asyncio.sleep(max(0.0, wake))
+        finally:
+            self.is_running = False
+            self.tokens.clear()
+            self._deadlines.clear()
+            for subsystem in self._managers:
+                self._apply_view(subsystem)
+            try:
+                await asyncio.to_thread(self.backend.leave, self.node_id)
+            except Exception as e:
+                logger.error(f"[Cluster] {self.node_id} could not leave cleanly: {e}")
+            logger.info(f"[Cluster] Node {self.node_id} left")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "running": self.is_running,
+            "nodes": self.nodes,
+            "partitions": len(self.partitions),
+            "owned": sorted(p for p in self.tokens if self.owns(p)),
+            "rebalances": self.rebalances
+        }
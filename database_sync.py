@@ -2,13 +2,33 @@
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Any, AsyncIterator, Awaitable, Callable, Deque, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from tracing import TRACER
+from startup import CONNECT_GATE, READINESS
+from scheduler import SCHEDULER
+from transport import BaseConnector
+from metrics import instrumented
+from log_writer import kv
+from simulation import SIMULATION
+from bulk_load import BulkLoad
+from state_store import StateStore
+from verifier import digest
+
 logger = logging.getLogger(__name__)
 
+# Changes a connector keeps for replay; a bulk load older than this has to start over
+CHANGE_LOG_LIMIT = 100_000
+
+class ChangeLogTruncated(ValueError):
+    """The change log no longer reaches back to the requested position."""
+
 class DatabaseType(Enum):
     """Supported database types."""
     POSTGRESQL = "postgresql"
@@ -29,57 +49,269 @@ class DatabaseConfig:
     db_type: DatabaseType
     connection_string: str
     sync_enabled: bool = True
+    estimated_rows: int = 100_000
 
-class DatabaseConnector:
+class DatabaseConnector(BaseConnector):
     """Base database connector."""
     
     def __init__(self, config: DatabaseConfig):
-        self.config = config
-        self.connected = False
-        self.last_sync: Optional[datetime] = None
+        super().__init__(config)
         self.records_synced = 0
+        self.log_position = 0       # change-log position (LSN / oplog / stream sequence stand-in)
+        self.change_log: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=CHANGE_LOG_LIMIT)
+        self.rows_ingested = 0
+        # Stand-in table: keys below estimated_rows hold generated rows unless bulk ingest replaced them
+        self.rows: Dict[Any, int] = {}
     
-    async def connect(self) -> bool:
-        logger.info(f"[{self.config.name}] Connecting to {self.config.db_type.value}...")
-        await asyncio.sleep(0.1)
-        self.connected = True
-        return True
+    @property
+    def target(self) -> str:
+        return self.config.db_type.value
     
+    @instrumented("sync_data")
     async def sync_data(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
-        if not self.connected:
-            raise Exception("Not connected")
+        self.ensure_connected()
+        encoded = self.encode(records)
         
-        logger.info(f"[{self.config.name}] Syncing {len(records)} records...")
+        logger.debug(kv("sync_data", connector=self.config.name, records=len(records), bytes=len(encoded.body)))
         await asyncio.sleep(0.1)
         
-        self.last_sync = datetime.utcnow()
+        self.last_sync = self.clock.utcnow()
         self.records_synced += len(records)
+        for record in records:
+            self.log_position += 1
+            self.change_log.append((self.log_position, record))
         
         return {
             "database": self.config.name,
             "records_synced": len(records),
             "total_records": self.records_synced,
-            "timestamp": self.last_sync.isoformat()
+            "wire_bytes": len(encoded.body),
+            "timestamp": self.last_sync
         }
+    
+    async def snapshot(self) -> int:
+        """Open a consistent read snapshot and return its change-log position."""
+        self.ensure_connected()
+        await asyncio.sleep(0.01)
+        return self.log_position
+    
+    async def read_changes(self, since: int, limit: int = 5000) -> Tuple[List[Dict[str, Any]], int]:
+        """Up to ``limit`` changes after log position ``since``, and the position they reach."""
+        self.ensure_connected()
+        await asyncio.sleep(0.001)
+        if not self.change_log:
+            return [], since
+        first = self.change_log[0][0]
+        if since < first - 1:
+            raise ChangeLogTruncated(f"{self.config.name}: position {since} is no longer in the change log")
+        # Positions are consecutive, so the first change after since sits at a known offset
+        start = max(0, since - first + 1)
+        entries = list(islice(self.change_log, start, start + limit))
+        return [record for _, record in entries], entries[-1][0] if entries else since
+    
+    async def key_bounds(self) -> Tuple[int, int]:
+        self.ensure_connected()
+        return 0, self.config.estimated_rows
+    
+    async def read_range(self, start: int, end: int, batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream rows with keys in [start, end) from the snapshot, ``batch_size`` at a time."""
+        self.ensure_connected()
+        for low in range(start, end, batch_size):
+            await asyncio.sleep(0.001)
+            yield [self._stand_in_row(k) for k in range(low, min(low + batch_size, end))]
+    
+    @staticmethod
+    def _stand_in_row(key: int) -> Dict[str, Any]:
+        return {"id": key, "data": f"record_{key}"}
+    
+    @instrumented("bulk_ingest")
+    async def bulk_ingest(self, records: List[Dict[str, Any]]) -> int:
+        """Upsert a batch through the bulk path (COPY, insertMany, BatchWriteItem)."""
+        self.ensure_connected()
+        self.encode(records)
+        await asyncio.sleep(0.002)
+        self.rows_ingested += len(records)
+        for record in records:
+            self.rows[record["id"]] = digest(record)
+        return len(records)
+    
+    async def replica_keys(self) -> range:
+        return range(*await self.key_bounds())
+    
+    @instrumented("read_digests")
+    async def read_digests(self, keys: List[Any]) -> Dict[Any, Optional[int]]:
+        """Checksums of the rows at keys; None where the row is missing."""
+        self.ensure_connected()
+        await asyncio.sleep(0.001)
+        digests = {}
+        for key in keys:
+            if key in self.rows:
+                digests[key] = self.rows[key]
+            elif isinstance(key, int) and 0 <= key < self.config.estimated_rows:
+                digests[key] = digest(self._stand_in_row(key))
+            else:
+                digests[key] = None
+        return digests
+    
+    async def repair_from(self, source: "DatabaseConnector", keys: range, batch_size: int = 5000) -> int:
+        """Re-copy a key range from source through the bulk path."""
+        copied = 0
+        async for batch in source.read_range(keys.start, keys.stop, batch_size):
+            await self.bulk_ingest(batch)
+            copied += len(batch)
+        return copied
 
 class DatabaseSyncManager:
     """Manages database synchronization."""
     
-    def __init__(self):
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
         self.connectors: Dict[str, DatabaseConnector] = {}
         self.sync_pairs: List[tuple] = []
-        self.sync_history: List[Dict[str, Any]] = []
+        self.clock = clock
+        self.sync_history = HistoryStore(clock=clock)
+        self.polled = 0
         self.is_running = False
+        # Called with (source, records) once per cycle for every source that synced
+        self.change_subscribers: List[Callable[[str, List[Dict[str, Any]]], Awaitable[None]]] = []
+        self.subscriber_errors = 0
+        # New targets are bulk-loaded before joining incremental sync; progress checkpoints to bulk_state
+        self.bulk_loads: Dict[str, BulkLoad] = {}
+        self.pending_pairs: List[tuple] = []
+        self.watermarks: Dict[str, int] = {}
+        # Pair name -> cluster Fence; only set when a ClusterMember owns this manager's view
+        self.fences: Dict[str, Any] = {}
+        self.bulk_state: Optional[StateStore] = None
+    
+    def checkpoint(self) -> Dict[str, Any]:
+        """Bulk-loaded pairs, their watermarks and the pairs still waiting for a load."""
+        bulk = set(self.watermarks)
+        return {
+            "watermarks": dict(self.watermarks),
+            "pairs": [[s, t, d.value] for s, t, d in self.sync_pairs if f"{s}->{t}" in bulk],
+            "pending": [[s, t, d.value] for s, t, d in self.pending_pairs]
+        }
+    
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Resume checkpointed pairs: loaded ones follow the change log from their watermark
+        instead of loading again, unfinished ones stay queued for their load."""
+        loaded = {(s, t) for s, t, _ in state["pairs"]}
+        self.pending_pairs = [p for p in self.pending_pairs if (p[0], p[1]) not in loaded]
+        known = {(p[0], p[1]) for p in self.sync_pairs + self.pending_pairs}
+        for source, target, direction in state["pairs"]:
+            if (source, target) not in known:
+                self.sync_pairs.append((source, target, SyncDirection(direction)))
+            self.watermarks[f"{source}->{target}"] = state["watermarks"][f"{source}->{target}"]
+        for source, target, direction in state["pending"]:
+            if (source, target) not in known:
+                self.pending_pairs.append((source, target, SyncDirection(direction)))
+    
+    def subscribe_changes(self, callback: Callable[[str, List[Dict[str, Any]]], Awaitable[None]]) -> None:
+        self.change_subscribers.append(callback)
     
     def register_database(self, config: DatabaseConfig) -> None:
-        self.connectors[config.name] = DatabaseConnector(config)
+        connector = self.connectors[config.name] = DatabaseConnector(config)
+        connector.clock = self.clock
         logger.info(f"Registered database: {config.name}")
     
-    def add_sync_pair(self, source: str, target: str, direction: SyncDirection) -> None:
+    def add_sync_pair(self, source: str, target: str, direction: SyncDirection, bulk_load: bool = False) -> None:
+        """Add a pair; with bulk_load the target is filled from a snapshot before it syncs incrementally."""
+        if bulk_load:
+            self.pending_pairs.append((source, target, direction))
+            logger.info(f"Added sync pair: {source} -> {target} (bulk load first)")
+            return
         self.sync_pairs.append((source, target, direction))
         logger.info(f"Added sync pair: {source} -> {target}")
     
-    async def run_continuous_sync(self, check_interval: int = 30) -> None:
+    async def bootstrap_pair(self, source: str, target: str, direction: SyncDirection,
+                             ranges: int = 16, workers: int = 4, batch_size: int = 5000) -> int:
+        """Bulk-load target from a snapshot of source, then hand the pair to incremental sync."""
+        name = f"{source}->{target}"
+        load = self.bulk_loads[name] = BulkLoad(self.connectors[source], self.connectors[target],
+                                                ranges, workers, batch_size, self.bulk_state, self.clock)
+        watermark = await load.run()
+        self.sync_history.record(name, "bulk_load", load.copied)
+        # Replay what the source changed since its snapshot; the last, empty read and the
+        # hand-over below run without yielding, so nothing can slip in between
+        self.watermarks[name] = watermark
+        replayed = await self._catch_up(source, target, batch_size)
+        self.sync_pairs.append((source, target, direction))
+        logger.info(f"✓ {name}: bulk loaded {load.copied} rows from position {watermark}, "
+                    f"replayed {replayed} changes, incremental sync from position {self.watermarks[name]}")
+        return self.watermarks[name]
+    
+    async def _catch_up(self, source: str, target: str, batch_size: int = 5000) -> int:
+        """Apply the source's changes after the pair's watermark to the target and advance it."""
+        name = f"{source}->{target}"
+        position, applied = self.watermarks[name], 0
+        while True:
+            changes, position = await self.connectors[source].read_changes(position, batch_size)
+            if not changes:
+                break
+            await self.connectors[target].bulk_ingest(changes)
+            self.watermarks[name] = position
+            applied += len(changes)
+        self.sync_history.record(name, "replay", applied)
+        return applied
+    
+    async def _bootstrap_pending(self) -> None:
+        pending, self.pending_pairs = self.pending_pairs, []
+        results = await asyncio.gather(*(self.bootstrap_pair(*pair) for pair in pending), return_exceptions=True)
+        for (source, target, direction), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                # Back in the queue: the next attempt resumes from the last checkpointed range
+                self.watermarks.pop(f"{source}->{target}", None)
+                self.pending_pairs.append((source, target, direction))
+                logger.error(f"✗ {source} -> {target}: bulk load failed: {result}")
+    
+    async def _sync_pairs(self, pairs: List[tuple], records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        changed: List[str] = []
+        for source, target, direction in list(pairs):
+            if source not in self.connectors or target not in self.connectors:
+                # One side failed to connect and is reconnecting in the background
+                continue
+            try:
+                fence = self.fences.get(f"{source}->{target}")
+                if fence is not None:
+                    await fence.check()
+                result = await self.connectors[source].sync_data(records)
+                self.sync_history.record(f"{source}->{target}", "sync_data", result["records_synced"])
+                if f"{source}->{target}" in self.watermarks:
+                    # Bulk-loaded pairs follow the source's change log from their watermark
+                    try:
+                        await self._catch_up(source, target)
+                    except ChangeLogTruncated as e:
+                        # Changes were lost past the watermark; only a fresh load brings the target back
+                        logger.warning(f"{source} -> {target}: {e}; bulk loading again")
+                        del self.watermarks[f"{source}->{target}"]
+                        self.sync_pairs.remove((source, target, direction))
+                        self.pending_pairs.append((source, target, direction))
+                logger.debug(kv("synced", pair=f"{source}->{target}", records=result["records_synced"]))
+                results.append(result)
+                if source not in changed:
+                    changed.append(source)
+            except Exception as e:
+                self.sync_history.record(f"{source}->{target}", "sync_data", 0, ok=False)
+                logger.error(f"✗ {source} -> {target}: {str(e)}")
+        # Subscribers get the records already in hand; awaiting them lets a slow one push back
+        for source in changed:
+            for callback in self.change_subscribers:
+                try:
+                    await callback(source, records)
+                except Exception as e:
+                    self.subscriber_errors += 1
+                    logger.error(f"✗ change subscriber {getattr(callback, '__qualname__', callback)} "
+                                 f"failed for {source}: {e}")
+        return results
+    
+    async def sync_scope(self, source: Optional[str] = None, keys: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Sync now, limited to pairs touching source and to keys when given."""
+        pairs = [p for p in self.sync_pairs if source in (p[0], p[1])] or self.sync_pairs
+        records = [{"id": k} for k in keys] if keys else [{"id": i, "data": f"record_{i}"} for i in range(100)]
+        logger.info(f"[Scoped] Syncing {len(records)} records across {len(pairs)} database pairs")
+        return await self._sync_pairs(pairs, records)
+    
+    async def run_continuous_sync(self, check_interval: int = 30, initial_delay: float = 0.0) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("DATABASE SYNC MANAGER STARTED")
@@ -87,31 +319,35 @@ class DatabaseSyncManager:
         logger.info(f"Sync Pairs: {len(self.sync_pairs)}")
         logger.info("="*80 + "\n")
         
-        for connector in self.connectors.values():
-            await connector.connect()
+        await CONNECT_GATE.connect_all("database_sync", self.connectors)
+        bootstrap = asyncio.create_task(self._bootstrap_pending()) if self.pending_pairs else None
         
         try:
             iteration = 0
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Cycle {iteration}] Syncing {len(self.sync_pairs)} database pairs...")
-                
-                sample_records = [{"id": i, "data": f"record_{i}"} for i in range(100)]
-                
-                for source, target, _ in self.sync_pairs:
-                    try:
-                        result = await self.connectors[source].sync_data(sample_records)
-                        self.sync_history.append(result)
-                        logger.info(f"✓ {source} -> {target}: {result['records_synced']} records")
-                    except Exception as e:
-                        logger.error(f"✗ {source} -> {target}: {str(e)}")
+                if self.pending_pairs and (bootstrap is None or bootstrap.done()):
+                    bootstrap = asyncio.create_task(self._bootstrap_pending())
+                with TRACER.span("database_sync.cycle", iteration=iteration):
+                    changed = SIMULATION.changes("database_sync", 100)
+                    sample_records = [{"id": i, "data": f"record_{i}"} for i in range(changed)]
+                    results = await self._sync_pairs(self.sync_pairs, sample_records)
+                    logger.info(kv("cycle", subsystem="database_sync", iteration=iteration, ok=len(results),
+                                failed=len(self.sync_pairs) - len(results), records=sum(r["records_synced"] for r in results)))
+                    self.polled += sum(r["records_synced"] for r in results)
                 
-                await asyncio.sleep(check_interval)
+                READINESS.synced("database_sync")
+                await asyncio.sleep(SCHEDULER.next_interval(
+                    "database_sync", check_interval, self.polled, self.connectors))
         
         except KeyboardInterrupt:
             logger.info("Database sync stopped.")
         finally:
             self.is_running = False
+            if bootstrap is not None:
+                bootstrap.cancel()
             logger.info("Database Sync Manager Stopped")
     
     def get_status(self) -> Dict[str, Any]:
@@ -119,5 +355,9 @@ class DatabaseSyncManager:
             "running": self.is_running,
             "databases": list(self.connectors.keys()),
             "sync_pairs": len(self.sync_pairs),
-            "total_syncs": len(self.sync_history)
+            "bulk_loads": {name: load.get_status() for name, load in self.bulk_loads.items()},
+            "watermarks": dict(self.watermarks),
+            "total_syncs": self.sync_history.total_records,
+            "failed_syncs": self.sync_history.total_errors,
+            "subscriber_errors": self.subscriber_errors
         }
@@ -0,0 +1,155 @@
+"""Diagnostics - Event-loop lag probe, stall detector and sampling profiler."""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Any, Deque, Optional
+from dataclasses import dataclass
+
+from metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SlowCallback:
+    timestamp: float
+    blocked_for: float
+    stack: List[str]
+
+def frame_stack(frame) -> List[str]:
+    """Root-first ``file:function`` entries for a frame and its callers."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+class Diagnostics:
+    """Opt-in event-loop diagnostics.
+
+    The lag probe sleeps for ``lag_interval`` and records how late it wakes
+    up. A watchdog thread notices when the probe is more than
+    ``slow_threshold`` overdue, meaning some callback is blocking the loop,
+    and captures the loop thread's stack while it is still stuck. The
+    profiler samples the loop thread at ``sample_hz`` into collapsed stacks
+    (one ``frame;frame;frame count`` line each) for flamegraph tools.
+    """
+
+    def __init__(self, lag_interval: float = 0.25, slow_threshold: float = 0.1,
+                 sample_hz: float = 19.0, max_stacks: int = 5000, max_slow: int = 50):
+        self.lag_interval = lag_interval
+        self.slow_threshold = slow_threshold
+        self.sample_hz = sample_hz
+        self.max_stacks = max_stacks
+        self.lag = LatencyHistogram()
+        self.slow_callbacks: Deque[SlowCallback] = deque(maxlen=max_slow)
+        self.samples: Counter = Counter()
+        self.samples_taken = 0
+        self.is_running = False
+
+        self._loop_thread: Optional[int] = None
+        self._next_due: Optional[float] = None
+        self._stall_reported = False
+        self._watchdog: Optional[threading.Thread] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._sampling = threading.Event()
+        self._stopped = threading.Event()
+
+    async def run(self) -> None:
+        self.is_running = True
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Diagnostics enabled (lag probe {self.lag_interval}s, stall threshold {self.slow_threshold}s)")
+
+        loop = asyncio.get_running_loop()
+        try:
+            while self.is_running:
+                expected = loop.time() + self.lag_interval
+                self._next_due = time.monotonic() + self.lag_interval
+                await asyncio.sleep(self.lag_interval)
+                self.lag.record(max(0.0, loop.time() - expected))
+                self._stall_reported = False
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self.is_running = False
+        self._next_due = None
+        self._stopped.set()
+        self._sampling.clear()
+
+    def _watch(self) -> None:
+        frames = sys._current_frames
+        while not self._stopped.wait(self.slow_threshold / 2):
+            due = self._next_due
+            if due is None or self._stall_reported:
+                continue
+            overdue = time.monotonic() - due
+            if overdue > self.slow_threshold:
+                frame = frames().get(self._loop_thread)
+                if frame is not None:
+                    self._stall_reported = True
+                    stack = frame_stack(frame)
+                    self.slow_callbacks.append(SlowCallback(time.time(), overdue, stack))
+                    logger.warning(f"[Diagnostics] Event loop blocked {overdue * 1000:.0f}ms in {stack[-1]}")
+
+    def start_profiler(self) -> None:
+        if self._sampling.is_set():
+            return
+        self._sampling.set()
+        self._sampler = threading.Thread(target=self._sample, name="stack-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop_profiler(self) -> str:
+        self._sampling.clear()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1.0)
+            self._sampler = None
+        return self.collapsed()
+
+    def _sample(self) -> None:
+        period = 1.0 / self.sample_hz
+        target = self._loop_thread if self._loop_thread is not None else threading.main_thread().ident
+        while self._sampling.is_set():
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                key = ";".join(frame_stack(frame))
+                if key in self.samples or len(self.samples) < self.max_stacks:
+                    self.samples[key] += 1
+                self.samples_taken += 1
+            time.sleep(period)
+
+    async def profile(self, seconds: float) -> str:
+        """Sample for ``seconds`` without blocking the loop and return collapsed stacks."""
+        if self._loop_thread is None:
+            self._loop_thread = threading.get_ident()
+        self.samples.clear()
+        self.start_profiler()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            collapsed = self.stop_profiler()
+        return collapsed
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "loop_lag": self.lag.summary(),
+            "profiling": self._sampling.is_set(),
+            "samples_taken": self.samples_taken,
+            "slow_callbacks": [
+                {"timestamp": s.timestamp, "blocked_ms": round(s.blocked_for * 1000, 1), "stack": s.stack[-8:]}
+                for s in self.slow_callbacks
+            ]
+        }
@@ -0,0 +1,153 @@
+"""Event Router - Trigger targeted syncs from webhook events."""
+
+import asyncio
+import logging
+from typing import Dict, List, Any, Callable, Awaitable, Optional, Set, Tuple
+from dataclasses import dataclass, field
+
+from webhook_sync import WebhookManager, WebhookEvent, EventType
+from tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+ScopedSync = Callable[[Optional[str], Optional[List[Any]]], Awaitable[Any]]
+
+@dataclass
+class SyncRoute:
+    event_type: EventType
+    target: str
+    sync: ScopedSync
+
+@dataclass
+class ScopedSyncRequest:
+    source: str
+    keys: Set[Any] = field(default_factory=set)
+    full: bool = False
+    events: int = 0
+
+    def merge(self, keys: Optional[List[Any]]) -> None:
+        self.events += 1
+        if keys is None:
+            self.full = True
+        else:
+            self.keys.update(keys)
+
+    def scope(self) -> Optional[List[Any]]:
+        return None if self.full else sorted(self.keys, key=str)
+
+class SyncRouter:
+    """Turns webhook events into scoped manager syncs.
+
+    Requests for the same (target, source) merge while one is pending, and
+    each (target, source) runs at most once per ``min_interval`` seconds.
+    A slot's worker is dropped when it finishes and its last-run time once
+    the interval has passed, so idle sources cost nothing.
+    """
+
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self.routes: Dict[EventType, List[SyncRoute]] = {}
+        self._pending: Dict[Tuple[str, str], ScopedSyncRequest] = {}
+        self._workers: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._last_run: Dict[Tuple[str, str], float] = {}
+        self._next_expiry = float("-inf")
+        self.requests_received = 0
+        self.requests_merged = 0
+        self.syncs_triggered = 0
+        self.sync_errors = 0
+
+    def add_route(self, event_type: EventType, target: str, sync: ScopedSync) -> None:
+        self.routes.setdefault(event_type, []).append(SyncRoute(event_type, target, sync))
+        logger.info(f"Routing {event_type.value} events to {target}")
+
+    def attach(self, webhooks: WebhookManager) -> None:
+        for event_type in self.routes:
+            webhooks.register_handler(event_type, self.handle_event)
+
+    async def handle_event(self, event: WebhookEvent) -> None:
+        for route in self.routes.get(event.event_type, []):
+            self.request(route, event.source, self._event_keys(event))
+
+    @staticmethod
+    def _event_keys(event: WebhookEvent) -> Optional[List[Any]]:
+        """Keys named by the event, or None when it affects the whole source."""
+        payloads = event.data.get("coalesced_events", [event.data])
+        keys: List[Any] = []
+        for payload in payloads:
+            if not isinstance(payload.get("keys"), list):
+                return None
+            keys.extend(payload["keys"])
+        return keys
+
+    def request(self, route: SyncRoute, source: str, keys: Optional[List[Any]]) -> None:
+        self.requests_received += 1
+        slot = (route.target, source)
+        pending = self._pending.get(slot)
+        if pending is None:
+            pending = self._pending[slot] = ScopedSyncRequest(source)
+        else:
+            self.requests_merged += 1
+        pending.merge(keys)
+
+        worker = self._workers.get(slot)
+        if worker is None or worker.done():
+            self._workers[slot] = asyncio.create_task(self._run_slot(route, slot))
+        self._expire(asyncio.get_running_loop().time())
+
+    def _expire(self, now: float) -> None:
+        # At most one sweep per interval; an expired slot would not have to wait anyway
+        if now < self._next_expiry:
+            return
+        self._next_expiry = now + self.min_interval
+        cutoff = now - self.min_interval
+        for slot in [s for s, last in self._last_run.items() if last <= cutoff and s not in self._workers]:
+            del self._last_run[slot]
+
+    async def _run_slot(self, route: SyncRoute, slot: Tuple[str, str]) -> None:
+        try:
+            await self._run_pending(route, slot)
+        finally:
+            if self._workers.get(slot) is asyncio.current_task():
+                del self._workers[slot]
+
+    async def _run_pending(self, route: SyncRoute, slot: Tuple[str, str]) -> None:
+        loop = asyncio.get_running_loop()
+        while slot in self._pending:
+            wait = self._last_run.get(slot, float("-inf")) + self.min_interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            request = self._pending.pop(slot)
+            self._last_run[slot] = loop.time()
+            self.syncs_triggered += 1
+            logger.info(f"[Router] {route.target} <- {request.source} "
+                        f"({request.events} events, {'full' if request.full else len(request.keys)} keys)")
+            try:
+                with TRACER.span(f"{route.target}.scoped_sync", source=request.source,
+                                 events=request.events, full=request.full):
+                    await route.sync(request.source, request.scope())
+            except Exception as e:
+                self.sync_errors += 1
+                logger.error(f"[Router] {route.target} scoped sync failed: {e}")
+
+    async def drain(self) -> None:
+        """Wait for every pending and in-flight scoped sync."""
+        while any(not w.done() for w in self._workers.values()):
+            await asyncio.gather(*list(self._workers.values()), return_exceptions=True)
+
+    def stop(self) -> None:
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        self._pending.clear()
+        self._last_run.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "routes": {t.value: [r.target for r in routes] for t, routes in self.routes.items()},
+            "pending": len(self._pending),
+            "active_slots": len(self._workers),
+            "requests_received": self.requests_received,
+            "requests_merged": self.requests_merged,
+            "syncs_triggered": self.syncs_triggered,
+            "sync_errors": self.sync_errors
+        }
@@ -2,9 +2,19 @@
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any, Optional
 from dataclasses import dataclass
-from datetime import datetime
+
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from tracing import TRACER
+from startup import CONNECT_GATE, READINESS
+from scheduler import SCHEDULER
+from transport import BaseConnector
+from metrics import instrumented
+from log_writer import kv
+from breakers import gather_isolated
+from simulation import SIMULATION
 
 logger = logging.getLogger(__name__)
 
@@ -14,71 +24,88 @@ class GraphQLEndpointConfig:
     endpoint_url: str
     api_token: str
 
-class GraphQLConnector:
+class GraphQLConnector(BaseConnector):
+    wire_format = "json"
+    
     def __init__(self, config: GraphQLEndpointConfig):
-        self.config = config
-        self.connected = False
-        self.last_sync: Optional[datetime] = None
+        super().__init__(config)
         self.syncs_count = 0
     
-    async def connect(self) -> bool:
-        logger.info(f"[{self.config.name}] Connecting to GraphQL endpoint...")
-        await asyncio.sleep(0.1)
-        self.connected = True
-        return True
+    @property
+    def target(self) -> str:
+        return "GraphQL endpoint"
     
+    def base_url(self) -> Optional[str]:
+        return self.config.endpoint_url
+    
+    @instrumented("sync_schema", items_of=lambda schema: len(schema.get("changed_types", ())))
     async def sync_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.connected:
-            raise Exception("Not connected")
+        self.ensure_connected()
+        encoded = self.encode(schema)
         
-        logger.info(f"[{self.config.name}] Syncing GraphQL schema...")
+        logger.debug(kv("sync_schema", connector=self.config.name, bytes=len(encoded.body)))
         await asyncio.sleep(0.1)
         
-        self.last_sync = datetime.utcnow()
+        self.last_sync = self.clock.utcnow()
         self.syncs_count += 1
         
         return {
             "graphql_endpoint": self.config.name,
             "schema_synced": True,
+            "types_synced": len(schema.get("changed_types", ())),
             "total_syncs": self.syncs_count,
-            "timestamp": self.last_sync.isoformat()
+            "wire_bytes": len(encoded.body),
+            "timestamp": self.last_sync
         }
 
 class GraphQLSyncManager:
-    def __init__(self):
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
         self.connectors: Dict[str, GraphQLConnector] = {}
-        self.sync_history: List[Dict[str, Any]] = []
+        self.clock = clock
+        self.sync_history = HistoryStore(clock=clock)
+        self.polled = 0
         self.is_running = False
     
     def register_endpoint(self, config: GraphQLEndpointConfig) -> None:
-        self.connectors[config.name] = GraphQLConnector(config)
+        connector = self.connectors[config.name] = GraphQLConnector(config)
+        connector.clock = self.clock
         logger.info(f"Registered GraphQL endpoint: {config.name}")
     
-    async def run_continuous_sync(self, check_interval: int = 35) -> None:
+    async def run_continuous_sync(self, check_interval: int = 35, initial_delay: float = 0.0) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("GRAPHQL SYNC MANAGER STARTED")
         logger.info("="*80 + "\n")
         
-        for connector in self.connectors.values():
-            await connector.connect()
+        await CONNECT_GATE.connect_all("graphql_sync", self.connectors)
         
         try:
             iteration = 0
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Cycle {iteration}] Syncing GraphQL schemas...")
-                
-                sample_schema = {"type": "schema", "version": "1.0.0"}
+                with TRACER.span("graphql_sync.cycle", iteration=iteration):
+                    changed = SIMULATION.changes("graphql_sync", 1)
+                    sample_schema = {"type": "schema", "version": "1.0.0",
+                                     "changed_types": [f"Type{i}" for i in range(changed)]}
                 
-                tasks = [c.sync_schema(sample_schema) for c in self.connectors.values()]
-                results = await asyncio.gather(*tasks)
+                    results, failures = await gather_isolated(
+                        {name: c.sync_schema(sample_schema) for name, c in self.connectors.items()})
                 
-                for result in results:
-                    self.sync_history.append(result)
-                    logger.info(f"✓ {result['graphql_endpoint']}: schema synced")
+                    for name, error in failures.items():
+                        self.sync_history.record(name, "sync_schema", 0, ok=False)
+                        logger.error(f"✗ {name}: {error}")
+                    for result in results:
+                        self.sync_history.record(result["graphql_endpoint"], "sync_schema", result["types_synced"])
+                        logger.debug(kv("synced", connector=result["graphql_endpoint"], types=result["types_synced"]))
+                    logger.info(kv("cycle", subsystem="graphql_sync", iteration=iteration, ok=len(results), failed=len(failures),
+                                types=sum(r["types_synced"] for r in results)))
+                    self.polled += sum(r["types_synced"] for r in results)
                 
-                await asyncio.sleep(check_interval)
+                READINESS.synced("graphql_sync")
+                await asyncio.sleep(SCHEDULER.next_interval(
+                    "graphql_sync", check_interval, self.polled, self.connectors))
         
         except KeyboardInterrupt:
             logger.info("GraphQL sync stopped.")
@@ -90,5 +117,5 @@ class GraphQLSyncManager:
         return {
             "running": self.is_running,
             "graphql_endpoints": list(self.connectors.keys()),
-            "total_syncs": len(self.sync_history)
+            "total_syncs": self.sync_history.total_records
         }
@@ -0,0 +1,212 @@
+"""History Store - Bounded, indexed event and sync history."""
+
+import gzip
+import json
+import logging
+import os
+from collections import deque
+from typing import Dict, List, Any, Optional, Deque, Hashable, Iterator, Tuple
+from dataclasses import dataclass, asdict
+
+from clock import Clock, SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+# Running totals for sources and kinds past ``max_keys`` are summed under this key
+OTHER = "(other)"
+
+@dataclass(slots=True)
+class HistoryRecord:
+    """Compact history entry; the sequence number orders records across evictions."""
+    seq: int
+    timestamp: float
+    source: str
+    kind: str
+    count: int = 1
+    ok: bool = True
+    payload: Optional[Dict[str, Any]] = None
+
+class HistoryStore:
+    """Fixed-capacity ring buffer with running totals and per-source/per-kind indexes.
+
+    Evicted records are dropped, or appended to gzip'd JSON-lines segments
+    under ``spill_dir`` when one is configured. An index entry goes when its
+    key's last record leaves the ring. Running totals outlive the ring, so
+    they track at most ``max_keys`` sources, kinds and (kind, source) pairs
+    each; the rest are summed under ``OTHER``.
+    """
+
+    def __init__(self, capacity: int = 10000, spill_dir: Optional[str] = None,
+                 segment_records: int = 5000, max_segments: int = 100, max_keys: int = 1000,
+                 clock: Clock = SYSTEM_CLOCK):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self.max_keys = max_keys
+        self.clock = clock
+
+        self._ring: List[Optional[HistoryRecord]] = [None] * capacity
+        self._next_seq = 0
+        self._by_source: Dict[str, Deque[int]] = {}
+        self._by_kind: Dict[str, Deque[int]] = {}
+        self._spill_buffer: List[HistoryRecord] = []
+        self._segments: Deque[str] = deque()
+
+        self.total_records = 0
+        self.total_errors = 0
+        self._count_by_kind: Dict[str, int] = {}
+        self._count_by_source: Dict[str, int] = {}
+        self._count_by_pair: Dict[Tuple[str, str], int] = {}
+        self.overflowed = 0
+
+    def record(self, source: str, kind: str, count: int = 1, ok: bool = True,
+               payload: Optional[Dict[str, Any]] = None,
+               timestamp: Optional[float] = None) -> HistoryRecord:
+        seq = self._next_seq
+        self._next_seq += 1
+        slot = seq % self.capacity
+
+        evicted = self._ring[slot]
+        if evicted is not None:
+            self._unindex(self._by_source, evicted.source, evicted.seq)
+            self._unindex(self._by_kind, evicted.kind, evicted.seq)
+            if self.spill_dir:
+                self._spill(evicted)
+
+        entry = HistoryRecord(seq, timestamp if timestamp is not None else self.clock.time(),
+                              source, kind, count, ok, payload)
+        self._ring[slot] = entry
+
+        self.total_records += 1
+        if not ok:
+            self.total_errors += 1
+        self._add(self._count_by_kind, kind, count, OTHER)
+        self._add(self._count_by_source, source, count, OTHER)
+        self._add(self._count_by_pair, (kind, source), count, (OTHER, OTHER))
+        self._index(self._by_source, source, seq)
+        self._index(self._by_kind, kind, seq)
+        return entry
+
+    def _add(self, counts: Dict[Any, int], key: Hashable, count: int, other: Hashable) -> None:
+        if key not in counts and len(counts) >= self.max_keys:
+            self.overflowed += 1
+            key = other
+        counts[key] = counts.get(key, 0) + count
+
+    @staticmethod
+    def _index(index: Dict[str, Deque[int]], key: str, seq: int) -> None:
+        seqs = index.get(key)
+        if seqs is None:
+            seqs = index[key] = deque()
+        seqs.append(seq)
+
+    @staticmethod
+    def _unindex(index: Dict[str, Deque[int]], key: str, seq: int) -> None:
+        # Records leave the ring oldest first, so an evicted seq heads its key's deque
+        seqs = index.get(key)
+        if seqs and seqs[0] == seq:
+            seqs.popleft()
+            if not seqs:
+                del index[key]
+
+    def total(self, kind: Optional[str] = None, source: Optional[str] = None) -> int:
+        """Running sum of record counts since startup, including evicted records."""
+        if kind is not None and source is not None:
+            return self._count_by_pair.get((kind, source), 0)
+        if kind is not None:
+            return self._count_by_kind.get(kind, 0)
+        if source is not None:
+            return self._count_by_source.get(source, 0)
+        return sum(self._count_by_kind.values())
+
+    def recent(self, limit: int = 50, source: Optional[str] = None,
+               kind: Optional[str] = None) -> List[HistoryRecord]:
+        """Newest-first records still held in memory, optionally filtered."""
+        oldest = max(0, self._next_seq - self.capacity)
+        if source is None and kind is None:
+            seqs: Any = range(self._next_seq - 1, oldest - 1, -1)
+        else:
+            index, key = (self._by_source, source) if source is not None else (self._by_kind, kind)
+            seqs = reversed(index.get(key, ()))
+
+        results: List[HistoryRecord] = []
+        for seq in seqs:
+            if seq < oldest or len(results) >= limit:
+                break
+            entry = self._ring[seq % self.capacity]
+            if kind is not None and source is not None and entry.kind != kind:
+                continue
+            results.append(entry)
+        return results
+
+    def __len__(self) -> int:
+        return min(self._next_seq, self.capacity)
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        for seq in range(max(0, self._next_seq - self.capacity), self._next_seq):
+            yield self._ring[seq % self.capacity]
+
+    def _spill(self, entry: HistoryRecord) -> None:
+        self._spill_buffer.append(entry)
+        if len(self._spill_buffer) >= self.segment_records:
+            self.flush()
+
+    def flush(self) -> Optional[str]:
+        """Write buffered evictions to a new compressed segment."""
+        if not self.spill_dir or not self._spill_buffer:
+            return None
+        os.makedirs(self.spill_dir, exist_ok=True)
+        first, last = self._spill_buffer[0].seq, self._spill_buffer[-1].seq
+        path = os.path.join(self.spill_dir, f"history-{first:012d}-{last:012d}.jsonl.gz")
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for entry in self._spill_buffer:
+                f.write(json.dumps(asdict(entry), default=str) + "\n")
+        self._spill_buffer.clear()
+
+        self._segments.append(path)
+        while len(self._segments) > self.max_segments:
+            stale = self._segments.popleft()
+            try:
+                os.remove(stale)
+            except OSError as e:
+                logger.warning(f"Could not remove history segment {stale}: {e}")
+        return path
+
+    @staticmethod
+    def read_segment(path: str) -> List[HistoryRecord]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return [HistoryRecord(**json.loads(line)) for line in f]
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Running totals; held records are not part of a checkpoint."""
+        return {
+            "total_records": self.total_records,
+            "total_errors": self.total_errors,
+            "count_by_kind": dict(self._count_by_kind),
+            "count_by_source": dict(self._count_by_source),
+            "count_by_pair": [[kind, source, count] for (kind, source), count in self._count_by_pair.items()]
+        }
+
+    def restore(self, checkpoint: Dict[str, Any]) -> None:
+        """Continue running totals from a checkpoint; only valid on an empty store."""
+        if self._next_seq:
+            raise ValueError("can only restore into an empty history store")
+        self.total_records = checkpoint["total_records"]
+        self.total_errors = checkpoint["total_errors"]
+        self._count_by_kind = dict(checkpoint["count_by_kind"])
+        self._count_by_source = dict(checkpoint["count_by_source"])
+        self._count_by_pair = {(kind, source): count for kind, source, count in checkpoint.get("count_by_pair", [])}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "held": len(self),
+            "total_records": self.total_records,
+            "total_errors": self.total_errors,
+            "tracked_keys": len(self._count_by_source) + len(self._count_by_kind),
+            "overflowed": self.overflowed,
+            "spilled_segments": len(self._segments)
+        }
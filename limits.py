@@ -0,0 +1,217 @@
+"""Limits - Per-endpoint token buckets and adaptive concurrency limits."""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Deque, Optional, Tuple
+
+from clock import Clock, SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+class ThrottledError(Exception):
+    """An endpoint asked us to slow down (HTTP 429 or a provider-specific equivalent)."""
+
+    def __init__(self, message: str = "throttled", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def throttle_signal(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """Whether an exception means "slow down", and the Retry-After it carried, if any."""
+    if isinstance(error, ThrottledError):
+        return True, error.retry_after
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        try:
+            return True, float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return True, None
+    return False, None
+
+class TokenBucket:
+    """Documented rate limit: ``rate`` calls per second with bursts of up to ``burst``.
+
+    Callers reserve a token immediately and sleep off any deficit, so
+    waiters are served in arrival order without polling.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Clock = SYSTEM_CLOCK):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock.monotonic()
+        self.paused_until = 0.0
+        self.waited = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        now = self.clock.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        wait = max(-self.tokens / self.rate, self.paused_until - now)
+        if wait > 0:
+            self.waited += wait
+            await asyncio.sleep(wait)
+        return max(0.0, wait)
+
+    def pause(self, seconds: float) -> None:
+        """Honour a Retry-After: hand out no tokens for ``seconds``."""
+        self.paused_until = max(self.paused_until, self.clock.monotonic() + seconds)
+
+class AdaptiveLimit:
+    """AIMD concurrency limit steered by latency and throttling.
+
+    Each success below ``tolerance`` times the best observed latency grows
+    the limit by ~1 per limit's worth of calls; latency above that (the
+    endpoint is queueing) shrinks it by ``latency_backoff``; a throttle
+    response cuts it by ``throttle_backoff``.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 256,
+                 tolerance: float = 2.0, latency_backoff: float = 0.9, throttle_backoff: float = 0.5):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.latency_backoff = latency_backoff
+        self.throttle_backoff = throttle_backoff
+        self.in_flight = 0
+        self.floor: Optional[float] = None
+        self.throttles = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    self._wake()  # pass the slot we were handed to the next waiter
+                raise
+        self.in_flight += 1
+
+    def release(self, latency: float, throttled: bool = False, error: bool = False) -> None:
+        self.in_flight -= 1
+        if throttled:
+            self.throttles += 1
+            self.limit = max(self.min_limit, self.limit * self.throttle_backoff)
+        elif not error:
+            # The floor drifts up slowly so it follows an endpoint that got permanently slower
+            self.floor = latency if self.floor is None else min(self.floor * 1.001, latency)
+            if latency > self.floor * self.tolerance:
+                self.limit = max(self.min_limit, self.limit * self.latency_backoff)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+class EndpointLimiter:
+    def __init__(self, name: str, concurrency: AdaptiveLimit, bucket: Optional[TokenBucket] = None,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.name = name
+        self.concurrency = concurrency
+        self.bucket = bucket
+        self.clock = clock
+        self.calls = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one rate token and one concurrency slot for the duration of a call."""
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        await self.concurrency.acquire()
+        self.calls += 1
+        started = self.clock.monotonic()
+        throttled = error = False
+        try:
+            yield
+        except BaseException as e:
+            error = True
+            throttled, retry_after = throttle_signal(e)
+            if throttled and retry_after and self.bucket is not None:
+                self.bucket.pause(retry_after)
+            raise
+        finally:
+            self.concurrency.release(self.clock.monotonic() - started, throttled, error)
+            if throttled:
+                logger.warning(f"[Limits] {self.name} throttled; concurrency limit now {self.concurrency.limit:.1f}")
+
+    def get_status(self) -> Dict[str, Any]:
+        c = self.concurrency
+        status = {
+            "calls": self.calls,
+            "limit": round(c.limit, 2),
+            "in_flight": c.in_flight,
+            "queued": len(c._waiters),
+            "throttles": c.throttles,
+            "latency_floor_ms": round(c.floor * 1000, 3) if c.floor is not None else None
+        }
+        if self.bucket is not None:
+            status["rate"] = self.bucket.rate
+            status["burst"] = self.bucket.burst
+            status["rate_wait_seconds"] = round(self.bucket.waited, 3)
+        return status
+
+class LimiterRegistry:
+    """One limiter per connector name, created on first use, on the registry's clock."""
+
+    def __init__(self, initial_limit: int = 8, max_limit: int = 256, clock: Clock = SYSTEM_CLOCK):
+        self.initial_limit = initial_limit
+        self.max_limit = max_limit
+        self.clock = clock
+        self.rates: Dict[str, Tuple[float, Optional[float]]] = {}
+        self.limiters: Dict[str, EndpointLimiter] = {}
+
+    def set_rate(self, name: str, rate: float, burst: Optional[float] = None) -> None:
+        """Apply an endpoint's documented rate limit (calls per second)."""
+        self.rates[name] = (rate, burst)
+        limiter = self.limiters.get(name)
+        if limiter is not None:
+            limiter.bucket = TokenBucket(rate, burst, self.clock)
+
+    def get(self, name: str) -> EndpointLimiter:
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            rate = self.rates.get(name)
+            limiter = self.limiters[name] = EndpointLimiter(
+                name,
+                AdaptiveLimit(self.initial_limit, max_limit=self.max_limit),
+                TokenBucket(*rate, self.clock) if rate else None,
+                self.clock
+            )
+        return limiter
+
+    def reset(self) -> None:
+        self.limiters.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {name: limiter.get_status() for name, limiter in self.limiters.items()}
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, Optional[float]]]:
+    """Parse ``"Algolia=10:20,Vercel=2"`` into {name: (rate, burst)}."""
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = entry.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[name.strip()] = (float(rate), float(burst) if burst else None)
+    return limits
+
+LIMITERS = LimiterRegistry()
@@ -0,0 +1,209 @@
+"""Log Writer - Structured log events written off the event loop by a background thread."""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Any, Optional, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+class Event:
+    """A log message as an event name plus fields, rendered only when written.
+
+    ``logger.info(kv("cycle", subsystem="cache_sync", ok=4))`` costs a dict
+    on the caller's side; the text is built by the writer thread.
+    """
+    __slots__ = ("event", "fields")
+
+    def __init__(self, event: str, fields: Dict[str, Any]):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return " ".join([self.event] + [f"{key}={value}" for key, value in self.fields.items()])
+
+def kv(event: str, **fields: Any) -> Event:
+    return Event(event, fields)
+
+class KeyValueFormatter(logging.Formatter):
+    def __init__(self, process: bool = False):
+        process_field = "%(processName)s - " if process else ""
+        super().__init__(f"%(asctime)s - {process_field}%(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} (+{suppressed} similar suppressed)" if suppressed else text
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; an Event's fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.processName,
+        }
+        if isinstance(record.msg, Event):
+            entry["event"] = record.msg.event
+            entry.update(record.msg.fields)
+        else:
+            entry["message"] = record.getMessage()
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site for records below WARNING.
+
+    A call site is its file and line, so a per-item line inside a loop is
+    one site however many items pass through it. Lines that were dropped are
+    counted on the next one let through from the same site.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sites: Dict[Tuple[str, int], list] = {}
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate <= 0:
+            return True
+        now = time.monotonic()
+        site = self.sites.get((record.pathname, record.lineno))
+        if site is None:
+            site = self.sites[(record.pathname, record.lineno)] = [float(self.burst), now, 0]
+        tokens = min(self.burst, site[0] + (now - site[1]) * self.rate)
+        site[1] = now
+        if tokens < 1:
+            site[0] = tokens
+            site[2] += 1
+            self.suppressed += 1
+            return False
+        site[0] = tokens - 1
+        if site[2]:
+            record.suppressed = site[2]
+            site[2] = 0
+        return True
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueues records untouched and never blocks: a full queue drops the record.
+
+    The stock QueueHandler formats the message before enqueueing; here the
+    listener thread does it, so the caller only pays for building the record.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class DrainingListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Blocking: the queue may be full, and the thread is emptying it
+        self.queue.put(self._sentinel)
+
+class CountingHandler(logging.StreamHandler):
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.written = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        self.written += 1
+
+class LogWriter:
+    """Routes the root logger through a bounded queue to a writer thread.
+
+    Until ``configure`` is called, logging is whatever the process set up;
+    ``stop`` puts the handlers it replaced back. The listener thread is a
+    daemon, so ``configure`` also registers ``stop`` to run at interpreter
+    exit, and whatever is still queued is written out then. ``options`` holds the
+    settings, for worker processes to configure theirs alike.
+    """
+
+    def __init__(self):
+        self.handler: Optional[DeferredQueueHandler] = None
+        self.listener: Optional[DrainingListener] = None
+        self.output: Optional[CountingHandler] = None
+        self.rate_limit: Optional[RateLimitFilter] = None
+        self.queue_size = 0
+        self.options: Dict[str, Any] = {}
+        self.replaced: List[logging.Handler] = []
+        self._lock = threading.Lock()
+        self._at_exit = False
+
+    def configure(self, level: int = logging.INFO, json_lines: bool = False, queue_size: int = 10_000,
+                  rate: float = 10.0, burst: int = 20, stream: Optional[TextIO] = None,
+                  process: bool = False) -> None:
+        """Install the queue on the root logger; ``rate=0`` turns rate limiting off."""
+        with self._lock:
+            self._stop()
+            self.options = {"json_lines": json_lines, "queue_size": queue_size, "rate": rate, "burst": burst}
+            log_queue: queue.Queue = queue.Queue(queue_size)
+            self.queue_size = queue_size
+            self.output = CountingHandler(stream or sys.stderr)
+            self.output.setFormatter(JsonFormatter() if json_lines else KeyValueFormatter(process))
+            self.handler = DeferredQueueHandler(log_queue)
+            self.rate_limit = RateLimitFilter(rate, burst)
+            self.handler.addFilter(self.rate_limit)
+            root = logging.getLogger()
+            self.replaced = list(root.handlers)
+            for handler in self.replaced:
+                root.removeHandler(handler)
+            root.addHandler(self.handler)
+            root.setLevel(level)
+            self.listener = DrainingListener(log_queue, self.output)
+            self.listener.start()
+            if not self._at_exit:
+                atexit.register(self.stop)
+                self._at_exit = True
+
+    def _stop(self) -> None:
+        if self.listener is not None:
+            root = logging.getLogger()
+            root.removeHandler(self.handler)
+            self.listener.stop()
+            self.output.flush()
+            self.listener = None
+            for handler in self.replaced:
+                root.addHandler(handler)
+            self.replaced = []
+
+    def stop(self) -> None:
+        """Write out everything queued and detach from the root logger."""
+        with self._lock:
+            self._stop()
+
+    def get_status(self) -> Dict[str, Any]:
+        if self.handler is None:
+            return {"enabled": False}
+        return {
+            "enabled": self.listener is not None,
+            "queued": self.handler.queue.qsize(),
+            "queue_size": self.queue_size,
+            "written": self.output.written,
+            "dropped": self.handler.dropped,
+            "suppressed": self.rate_limit.suppressed,
+            "call_sites": len(self.rate_limit.sites)
+        }
+
+LOG_WRITER = LogWriter()
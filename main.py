@@ -1,10 +1,82 @@
-from fastapi import FastAPI
+"""HTTP API: health, metrics, diagnostics and webhook ingestion.
+
+Webhook events posted here are queued on this process's WebhookManager and
+handed to whatever handlers are registered on it. This app registers none:
+it authenticates and buffers events, and an embedding process that owns sync
+managers attaches a SyncRouter (``SyncRouter.attach(main.webhook_manager)``)
+to act on them. Without one, accepted events are counted and discarded.
+"""
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI(title="Zero Human Enterprise Grid", version="1.0.0")
+from fastapi.responses import JSONResponse, PlainTextResponse
+from webhook_sync import WebhookManager, WebhookEvent, verify_signature
+from monitoring import MonitoringSystem
+from metrics import REGISTRY
+from diagnostics import Diagnostics
+webhook_manager = WebhookManager(queue_size=int(os.getenv("WEBHOOK_QUEUE_SIZE", "10000")), ingest_workers=int(os.getenv("WEBHOOK_INGEST_WORKERS", "4")))
+monitoring = MonitoringSystem()
+monitoring.register_component("webhook_manager", webhook_manager, 0)
+logger = logging.getLogger(__name__)
+diagnostics = Diagnostics() if os.getenv("DIAGNOSTICS_ENABLED", "false").lower() == "true" else None
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not os.getenv("WEBHOOK_SECRET") and not _allow_unsigned():
+        logger.warning("WEBHOOK_SECRET is not set: /webhooks/events will reject every request")
+    if not webhook_manager.event_handlers:
+        logger.warning("No webhook handlers registered: accepted events will be discarded")
+    listener = asyncio.create_task(webhook_manager.run_webhook_listener())
+    monitor = asyncio.create_task(monitoring.run_monitoring(int(os.getenv("MONITORING_INTERVAL", "10"))))
+    probe = asyncio.create_task(diagnostics.run()) if diagnostics else None
+    yield
+    if probe:
+        diagnostics.stop()
+        probe.cancel()
+    webhook_manager.is_running = False
+    monitoring.is_running = False
+    listener.cancel()
+    monitor.cancel()
+def _allow_unsigned() -> bool:
+    return os.getenv("WEBHOOK_ALLOW_UNSIGNED", "false").lower() == "true"
+app = FastAPI(title="Zero Human Enterprise Grid", version="1.0.0", lifespan=lifespan)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 @app.get("/")
 def root():
     return {"system": "Zero Human Enterprise Grid", "version": "1.0.0", "status": "operational", "author": "Garrett Carrol", "organization": "Garcar Enterprise", "revenue_target": "$1.55M ARR", "capabilities": ["self-building-platform", "autonomous-monetization", "zero-human-operation", "AI-product-creation", "continuous-deployment"]}
 @app.get("/health")
-def health():
-    return {"status": "healthy", "system": "Zero Human Enterprise Grid"}
+async def health():
+    return {**monitoring.get_health(), "system": "Zero Human Enterprise Grid"}
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+@app.get("/diagnostics/loop")
+async def diagnostics_loop():
+    if diagnostics is None:
+        raise HTTPException(status_code=404, detail="diagnostics disabled; set DIAGNOSTICS_ENABLED=true")
+    return diagnostics.get_status()
+@app.get("/diagnostics/profile")
+async def diagnostics_profile(seconds: float = 5.0):
+    if diagnostics is None:
+        raise HTTPException(status_code=404, detail="diagnostics disabled; set DIAGNOSTICS_ENABLED=true")
+    return PlainTextResponse(await diagnostics.profile(min(max(seconds, 0.1), 60.0)))
+@app.post("/webhooks/events", status_code=202)
+async def ingest_webhook(request: Request):
+    body = await request.body()
+    secret = os.getenv("WEBHOOK_SECRET")
+    if not secret:
+        # Fail closed: unsigned ingestion is an explicit opt-in for local development
+        if not _allow_unsigned():
+            return JSONResponse({"error": "webhook secret not configured"}, status_code=503)
+    elif not verify_signature(secret, body, request.headers.get("X-Signature-256")):
+        return JSONResponse({"error": "invalid signature"}, status_code=401)
+    try:
+        event = WebhookEvent.from_dict(json.loads(body))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    if not webhook_manager.submit(event):
+        return JSONResponse({"error": "webhook queue full"}, status_code=429, headers={"Retry-After": "1"})
+    return {"accepted": True, "event_type": event.event_type.value, "queued": webhook_manager.ingest_queue.qsize()}
@@ -1,42 +1,117 @@
 """Mega Orchestrator - Master controller for all sync systems."""
 
 import asyncio
+import importlib
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 
-from sync_engine import AutonomousSyncEngine, CloudProvider, SyncConfig
-from database_sync import DatabaseSyncManager, DatabaseConfig, DatabaseType, SyncDirection
-from storage_sync import StorageSyncManager, StorageConfig, StorageType
-from cache_sync import CacheSyncManager, CacheConfig, CacheType
-from message_sync import MessageQueueSyncManager, MessageQueueConfig, MessageQueueType
-from search_sync import SearchIndexSyncManager, SearchEngineConfig, SearchEngineType
-from ml_pipeline_sync import MLPipelineSyncManager, MLPlatformConfig, MLPlatformType
-from graphql_sync import GraphQLSyncManager, GraphQLEndpointConfig
-from webhook_sync import WebhookManager
+from clock import Clock, SYSTEM_CLOCK
+from webhook_sync import WebhookManager, EventType
 from monitoring import MonitoringSystem
+from event_router import SyncRouter
+from metrics import REGISTRY
+from diagnostics import Diagnostics
+from tracing import TRACER
+from process_pool import ProcessPool, default_placement
+from cluster import ClusterMember
+from state_store import StateStore, capture_manager, restore_manager, staggered_delays
+from startup import CONNECT_GATE, READINESS
+from transport import TRANSPORT
+from payload_codec import CODECS
+from log_writer import LOG_WRITER
+from limits import LIMITERS
+from breakers import BREAKERS
+from scheduler import SCHEDULER, SchedulePolicy
+from pipeline import PropagationPipeline
+from verifier import ConsistencyVerifier
 
 logger = logging.getLogger(__name__)
 
 class MegaOrchestrator:
     """Master orchestrator for all sync systems."""
     
-    def __init__(self):
-        self.cloud_sync = AutonomousSyncEngine()
-        self.database_sync = DatabaseSyncManager()
-        self.storage_sync = StorageSyncManager()
-        self.cache_sync = CacheSyncManager()
-        self.message_sync = MessageQueueSyncManager()
-        self.search_sync = SearchIndexSyncManager()
-        self.ml_sync = MLPipelineSyncManager()
-        self.graphql_sync = GraphQLSyncManager()
+    # Event-routed subsystems keep polling only as a safety net, this many times less often
+    SAFETY_NET_POLL_FACTOR = 4
+    
+    # Sync subsystem attribute -> method that registers its connectors
+    SUBSYSTEM_INITIALIZERS = {
+        "cloud_sync": "initialize_cloud_providers",
+        "database_sync": "initialize_databases",
+        "storage_sync": "initialize_storage",
+        "cache_sync": "initialize_cache",
+        "message_sync": "initialize_message_queues",
+        "search_sync": "initialize_search_engines",
+        "ml_sync": "initialize_ml_platforms",
+        "graphql_sync": "initialize_graphql",
+    }
+    
+    # Sync subsystem attribute -> (module, manager class); modules are imported on first use
+    SUBSYSTEM_MODULES = {
+        "cloud_sync": ("sync_engine", "AutonomousSyncEngine"),
+        "database_sync": ("database_sync", "DatabaseSyncManager"),
+        "storage_sync": ("storage_sync", "StorageSyncManager"),
+        "cache_sync": ("cache_sync", "CacheSyncManager"),
+        "message_sync": ("message_sync", "MessageQueueSyncManager"),
+        "search_sync": ("search_sync", "SearchIndexSyncManager"),
+        "ml_sync": ("ml_pipeline_sync", "MLPipelineSyncManager"),
+        "graphql_sync": ("graphql_sync", "GraphQLSyncManager"),
+    }
+    
+    def __init__(self, enable_diagnostics: bool = False, worker_processes: int = 0,
+                 cluster: Optional[ClusterMember] = None, state_path: Optional[str] = None,
+                 subsystems: Optional[List[str]] = None, schedule: Optional[SchedulePolicy] = None,
+                 propagation: bool = True, verify_budget: float = 0.0, verify_interval: float = 30.0,
+                 clock: Clock = SYSTEM_CLOCK):
+        unknown = set(subsystems or []) - set(self.SUBSYSTEM_INITIALIZERS)
+        if unknown:
+            raise ValueError(f"Unknown subsystems: {sorted(unknown)}")
+        if cluster is not None and worker_processes > 0:
+            raise ValueError("Cluster mode cannot be combined with worker processes")
+        if state_path and worker_processes > 0:
+            raise ValueError("State checkpoints cannot be combined with worker processes")
+        # Only enabled subsystems are ever imported; managers are created on first access
+        self.subsystems = [name for name in self.SUBSYSTEM_INITIALIZERS if subsystems is None or name in subsystems]
+        # Managers, monitoring and propagation keep time on this clock
+        self.clock = clock
         self.webhooks = WebhookManager()
-        self.monitoring = MonitoringSystem()
+        self.monitoring = MonitoringSystem(clock=clock)
+        self.sync_router = SyncRouter()
+        self.diagnostics = Diagnostics() if enable_diagnostics else None
+        # With a schedule, sync_intervals are starting points that adapt to each subsystem's change rate
+        self.schedule = schedule
+        # Database changes stream into search and cache in-process; pooled managers live apart
+        self.propagation = PropagationPipeline(clock=clock) if (
+            propagation and worker_processes == 0 and "database_sync" in self.subsystems
+            and {"search_sync", "cache_sync"} & set(self.subsystems)
+        ) else None
+        # With worker_processes > 0 the sync managers run in a process pool instead of this loop
+        self.process_pool = ProcessPool(
+            default_placement(self.subsystems, worker_processes), self.sync_intervals(), schedule=schedule
+        ) if worker_processes > 0 else None
+        # In cluster mode managers only sync the partitions this node holds leases for
+        self.cluster = cluster
+        # Sampled replica checks need every endpoint of a replica set in this process
+        self.verifier = ConsistencyVerifier(verify_budget, verify_interval) if (
+            verify_budget > 0 and worker_processes == 0 and cluster is None
+        ) else None
+        # Checkpointed manager state lets a restart resume counters and the cycle schedule
+        self.state_store = StateStore(state_path) if state_path else None
         
-        self.start_time: datetime = datetime.utcnow()
+        self.start_time: datetime = clock.utcnow()
+    
+    def __getattr__(self, name: str) -> Any:
+        spec = MegaOrchestrator.SUBSYSTEM_MODULES.get(name)
+        if spec is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        module, cls = spec
+        manager = getattr(importlib.import_module(module), cls)(clock=self.clock)
+        setattr(self, name, manager)
+        return manager
     
     def initialize_cloud_providers(self) -> None:
         """Initialize cloud providers."""
+        from sync_engine import CloudProvider, SyncConfig
         providers = [
             ("AWS", CloudProvider.AWS),
             ("GCP", CloudProvider.GCP),
@@ -50,6 +125,7 @@ class MegaOrchestrator:
     
     def initialize_databases(self) -> None:
         """Initialize databases."""
+        from database_sync import DatabaseConfig, DatabaseType, SyncDirection
         databases = [
             ("PostgreSQL Primary", DatabaseType.POSTGRESQL),
             ("PostgreSQL Backup", DatabaseType.POSTGRESQL),
@@ -66,9 +142,12 @@ class MegaOrchestrator:
         self.database_sync.add_sync_pair("PostgreSQL Primary", "MongoDB", SyncDirection.SOURCE_TO_TARGET)
         self.database_sync.add_sync_pair("PostgreSQL Primary", "DynamoDB", SyncDirection.BIDIRECTIONAL)
         self.database_sync.add_sync_pair("PostgreSQL Primary", "Elasticsearch", SyncDirection.SOURCE_TO_TARGET)
+        # Pairs added with bulk_load=True checkpoint their range progress alongside manager state
+        self.database_sync.bulk_state = self.state_store
     
     def initialize_storage(self) -> None:
         """Initialize storage providers."""
+        from storage_sync import StorageConfig, StorageType
         storage_providers = [
             ("S3", StorageType.S3),
             ("GCS", StorageType.GCS),
@@ -81,6 +160,7 @@ class MegaOrchestrator:
     
     def initialize_cache(self) -> None:
         """Initialize cache systems."""
+        from cache_sync import CacheConfig, CacheType
         configs = [
             ("Redis Primary", CacheType.REDIS, "localhost", 6379),
             ("Redis Replica", CacheType.REDIS, "localhost", 6380),
@@ -91,6 +171,7 @@ class MegaOrchestrator:
     
     def initialize_message_queues(self) -> None:
         """Initialize message queues."""
+        from message_sync import MessageQueueConfig, MessageQueueType
         queues = [
             ("Kafka", MessageQueueType.KAFKA),
             ("RabbitMQ", MessageQueueType.RABBITMQ),
@@ -102,6 +183,7 @@ class MegaOrchestrator:
     
     def initialize_search_engines(self) -> None:
         """Initialize search engines."""
+        from search_sync import SearchEngineConfig, SearchEngineType
         engines = [
             ("Elasticsearch", SearchEngineType.ELASTICSEARCH),
             ("Algolia", SearchEngineType.ALGOLIA),
@@ -113,6 +195,7 @@ class MegaOrchestrator:
     
     def initialize_ml_platforms(self) -> None:
         """Initialize ML platforms."""
+        from ml_pipeline_sync import MLPlatformConfig, MLPlatformType
         platforms = [
             ("MLflow", MLPlatformType.MLFLOW),
             ("SageMaker", MLPlatformType.SAGEMAKER),
@@ -124,6 +207,7 @@ class MegaOrchestrator:
     
     def initialize_graphql(self) -> None:
         """Initialize GraphQL endpoints."""
+        from graphql_sync import GraphQLEndpointConfig
         endpoints = [
             ("Production", "https://api.example.com/graphql"),
             ("Backup", "https://api-backup.example.com/graphql"),
@@ -132,6 +216,110 @@ class MegaOrchestrator:
             config = GraphQLEndpointConfig(name, url, "token")
             self.graphql_sync.register_endpoint(config)
     
+    def scoped_sync_target(self, subsystem: str):
+        """The subsystem's sync_scope, or a forwarder to its workers in process-pool mode."""
+        if self.process_pool is not None:
+            return self.process_pool.scoped_sync(subsystem)
+        return getattr(self, subsystem).sync_scope
+    
+    def initialize_event_routes(self) -> None:
+        """Route webhook events to immediate scoped syncs."""
+        routes = [
+            (EventType.DATA_SYNC, "database_sync"),
+            (EventType.INDEX_UPDATE, "search_sync"),
+            (EventType.MODEL_TRAINED, "ml_sync"),
+            (EventType.DEPLOYMENT, "cloud_sync"),
+        ]
+        for event_type, target in routes:
+            if target in self.subsystems:
+                self.sync_router.add_route(event_type, target, self.scoped_sync_target(target))
+        self.sync_router.attach(self.webhooks)
+    
+    def initialize_propagation(self) -> None:
+        """Stream database change batches into search indexing, then cache invalidation."""
+        if self.propagation is None:
+            return
+        after = None
+        if "search_sync" in self.subsystems:
+            self.propagation.add_stage(
+                "search_sync", lambda batch: self.search_sync.index_changes(batch.records))
+            after = ["search_sync"]
+        if "cache_sync" in self.subsystems:
+            # Invalidate after indexing so a cache miss cannot refill from a stale index
+            self.propagation.add_stage(
+                "cache_sync", lambda batch: self.cache_sync.invalidate_keys([str(r["id"]) for r in batch.records]),
+                after=after)
+        self.database_sync.subscribe_changes(self.propagation.publish)
+    
+    def initialize_verification(self) -> None:
+        """Check each database pair's targets, and every bucket and index against the first."""
+        if self.verifier is None:
+            return
+        if "database_sync" in self.subsystems:
+            databases = self.database_sync.connectors
+            targets: Dict[str, List[str]] = {}
+            for source, target, _ in self.database_sync.sync_pairs:
+                targets.setdefault(source, []).append(target)
+            for source, names in targets.items():
+                self.verifier.add(f"database_sync/{source}", databases[source], [databases[n] for n in names])
+        for name in ("storage_sync", "search_sync"):
+            if name in self.subsystems:
+                reference, *replicas = getattr(self, name).connectors.values()
+                if replicas:
+                    self.verifier.add(f"{name}/{reference.config.name}", reference, replicas)
+    
+    def sync_intervals(self) -> Dict[str, int]:
+        """Polling interval per subsystem; event-routed ones poll only as a safety net."""
+        safety_net = self.SAFETY_NET_POLL_FACTOR
+        intervals = {
+            "cloud_sync": 60 * safety_net,
+            "database_sync": 30 * safety_net,
+            "storage_sync": 30,
+            "cache_sync": 20,
+            "message_sync": 15,
+            "search_sync": 25 * safety_net,
+            "ml_sync": 45 * safety_net,
+            "graphql_sync": 35,
+        }
+        if self.propagation is not None:
+            intervals["cache_sync"] *= safety_net
+        return {name: interval for name, interval in intervals.items() if name in self.subsystems}
+    
+    def initialize_monitoring(self, intervals: Dict[str, int]) -> None:
+        """Register every subsystem with the health monitor."""
+        # Pooled managers live in other processes; their state is reported by get_full_status
+        if self.process_pool is None:
+            for name, interval in intervals.items():
+                self.monitoring.register_component(name, getattr(self, name), interval)
+        self.monitoring.register_component("webhook_manager", self.webhooks, 0)
+    
+    def restore_state(self, intervals: Dict[str, int]) -> Dict[str, float]:
+        """Restore checkpointed managers; returns each one's first-cycle delay."""
+        if self.state_store is None:
+            return {}
+        saved = self.state_store.load()
+        last_syncs = {name: restore_manager(getattr(self, name), saved[name]) for name in intervals if name in saved}
+        delays = staggered_delays(last_syncs, intervals)
+        if saved:
+            logger.info(f"Restored state for {len(last_syncs)} subsystems; first cycles in "
+                        + ", ".join(f"{name} {delay:.0f}s" for name, delay in sorted(delays.items(), key=lambda d: d[1])))
+        return delays
+    
+    def checkpoint(self) -> None:
+        if self.state_store is None:
+            return
+        for name in self.subsystems:
+            self.state_store.put(name, capture_manager(getattr(self, name)))
+        self.state_store.commit()
+    
+    async def run_checkpoints(self, interval: float = 30.0) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.checkpoint()
+            except OSError as e:
+                logger.error(f"Checkpoint to {self.state_store.path} failed: {e}")
+    
     async def orchestrate_all_systems(self) -> None:
         """Orchestrate all sync systems in parallel."""
         logger.info("\n" + "#"*80)
@@ -140,46 +328,88 @@ class MegaOrchestrator:
         logger.info("#" + " "*78 + "#")
         logger.info("#"*80 + "\n")
         
-        # Initialize all systems
-        logger.info("Initializing all sync systems...\n")
-        self.initialize_cloud_providers()
-        self.initialize_databases()
-        self.initialize_storage()
-        self.initialize_cache()
-        self.initialize_message_queues()
-        self.initialize_search_engines()
-        self.initialize_ml_platforms()
-        self.initialize_graphql()
+        READINESS.reset()
+        SCHEDULER.configure(self.schedule)
+        intervals = self.sync_intervals()
+        if self.process_pool is None:
+            # Initialize all enabled systems
+            logger.info(f"Initializing sync systems: {', '.join(self.subsystems)}\n")
+            for name in self.subsystems:
+                getattr(self, self.SUBSYSTEM_INITIALIZERS[name])()
+            self.initialize_propagation()
+            self.initialize_verification()
+            delays = self.restore_state(intervals)
+            sync_runs = [getattr(self, name).run_continuous_sync(interval, delays.get(name, 0.0))
+                         for name, interval in intervals.items()]
+            if self.propagation is not None:
+                sync_runs.append(self.propagation.run())
+            if self.verifier is not None:
+                sync_runs.append(self.verifier.run())
+            if self.state_store is not None:
+                sync_runs.append(self.run_checkpoints())
+            if self.cluster is not None:
+                for name in intervals:
+                    self.cluster.register_manager(name, getattr(self, name))
+                sync_runs.append(self.cluster.run())
+        else:
+            logger.info(f"Running sync systems in {len(self.process_pool.workers)} worker processes...\n")
+            sync_runs = [self.process_pool.run()]
+        self.initialize_event_routes()
+        self.initialize_monitoring(intervals)
         
         # Run all systems in parallel
         try:
             await asyncio.gather(
-                self.cloud_sync.run_continuous_sync(60),
-                self.database_sync.run_continuous_sync(30),
-                self.storage_sync.run_continuous_sync(30),
-                self.cache_sync.run_continuous_sync(20),
-                self.message_sync.run_continuous_sync(15),
-                self.search_sync.run_continuous_sync(25),
-                self.ml_sync.run_continuous_sync(45),
-                self.graphql_sync.run_continuous_sync(35),
+                *sync_runs,
                 self.webhooks.run_webhook_listener(),
                 self.monitoring.run_monitoring(10),
+                *([self.diagnostics.run()] if self.diagnostics else []),
             )
         except KeyboardInterrupt:
             logger.info("\nOrchestrator interrupted.")
+        finally:
+            self.sync_router.stop()
+            CONNECT_GATE.stop()
+            TRACER.flush()
+            await TRANSPORT.aclose()
+            if self.state_store is not None:
+                self.checkpoint()
+                self.state_store.close()
     
     def get_full_status(self) -> Dict[str, Any]:
         """Get status of all systems."""
+        if self.process_pool is None:
+            subsystems = {name: getattr(self, name).get_status() if name in self.subsystems else None
+                          for name in self.SUBSYSTEM_INITIALIZERS}
+            connector_metrics = REGISTRY.snapshot()
+            pool = None
+        else:
+            # Refreshed by the pool's supervision loop; collecting here would block on the workers
+            pool = self.process_pool.status
+            subsystems = {name: pool["subsystems"].get(name, {}) if name in self.subsystems else None
+                          for name in self.SUBSYSTEM_INITIALIZERS}
+            connector_metrics = pool["connector_metrics"]
         return {
-            "uptime_seconds": (datetime.utcnow() - self.start_time).total_seconds(),
-            "cloud_sync": self.cloud_sync.get_status(),
-            "database_sync": self.database_sync.get_status(),
-            "storage_sync": self.storage_sync.get_status(),
-            "cache_sync": self.cache_sync.get_status(),
-            "message_sync": self.message_sync.get_status(),
-            "search_sync": self.search_sync.get_status(),
-            "ml_sync": self.ml_sync.get_status(),
-            "graphql_sync": self.graphql_sync.get_status(),
+            "uptime_seconds": (self.clock.utcnow() - self.start_time).total_seconds(),
+            **subsystems,
             "webhooks": self.webhooks.get_status(),
             "monitoring": self.monitoring.get_status(),
+            "health": self.monitoring.get_health(),
+            "event_router": self.sync_router.get_status(),
+            "connector_metrics": connector_metrics,
+            "tracing": TRACER.get_status(),
+            "diagnostics": self.diagnostics.get_status() if self.diagnostics else None,
+            "process_pool": {"workers": pool["workers"]} if pool else None,
+            "cluster": self.cluster.get_status() if self.cluster else None,
+            "state_store": self.state_store.stats() if self.state_store else None,
+            "readiness": READINESS.get_status(),
+            "startup": CONNECT_GATE.get_status(),
+            "transport": TRANSPORT.get_status(),
+            "codecs": CODECS.get_status() if self.process_pool is None else None,
+            "logging": LOG_WRITER.get_status(),
+            "limits": LIMITERS.get_status(),
+            "breakers": BREAKERS.get_status(),
+            "scheduler": SCHEDULER.get_status() if self.process_pool is None else None,
+            "propagation": self.propagation.get_status() if self.propagation else None,
+            "verification": self.verifier.get_status() if self.verifier else None,
         }
@@ -2,11 +2,21 @@
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from tracing import TRACER
+from startup import CONNECT_GATE, READINESS
+from scheduler import SCHEDULER
+from transport import BaseConnector
+from metrics import instrumented
+from log_writer import kv
+from simulation import SIMULATION
+from breakers import gather_isolated
+
 logger = logging.getLogger(__name__)
 
 class MessageQueueType(Enum):
@@ -20,71 +30,81 @@ class MessageQueueConfig:
     queue_type: MessageQueueType
     brokers: List[str]
 
-class MessageQueueConnector:
+class MessageQueueConnector(BaseConnector):
     def __init__(self, config: MessageQueueConfig):
-        self.config = config
-        self.connected = False
-        self.last_sync: Optional[datetime] = None
+        super().__init__(config)
         self.messages_processed = 0
     
-    async def connect(self) -> bool:
-        logger.info(f"[{self.config.name}] Connecting to {self.config.queue_type.value}...")
-        await asyncio.sleep(0.1)
-        self.connected = True
-        return True
+    @property
+    def target(self) -> str:
+        return self.config.queue_type.value
     
+    @instrumented("sync_messages")
     async def sync_messages(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
-        if not self.connected:
-            raise Exception("Not connected")
+        self.ensure_connected()
+        encoded = self.encode(messages)
         
-        logger.info(f"[{self.config.name}] Processing {len(messages)} messages...")
+        logger.debug(kv("sync_messages", connector=self.config.name, messages=len(messages), bytes=len(encoded.body)))
         await asyncio.sleep(0.1)
         
-        self.last_sync = datetime.utcnow()
+        self.last_sync = self.clock.utcnow()
         self.messages_processed += len(messages)
         
         return {
             "queue": self.config.name,
             "messages_processed": len(messages),
             "total_processed": self.messages_processed,
-            "timestamp": self.last_sync.isoformat()
+            "wire_bytes": len(encoded.body),
+            "timestamp": self.last_sync
         }
 
 class MessageQueueSyncManager:
-    def __init__(self):
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
         self.connectors: Dict[str, MessageQueueConnector] = {}
-        self.sync_history: List[Dict[str, Any]] = []
+        self.clock = clock
+        self.sync_history = HistoryStore(clock=clock)
+        self.polled = 0
         self.is_running = False
     
     def register_queue(self, config: MessageQueueConfig) -> None:
-        self.connectors[config.name] = MessageQueueConnector(config)
+        connector = self.connectors[config.name] = MessageQueueConnector(config)
+        connector.clock = self.clock
         logger.info(f"Registered queue: {config.name}")
     
-    async def run_continuous_sync(self, check_interval: int = 15) -> None:
+    async def run_continuous_sync(self, check_interval: int = 15, initial_delay: float = 0.0) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("MESSAGE QUEUE SYNC MANAGER STARTED")
         logger.info("="*80 + "\n")
         
-        for connector in self.connectors.values():
-            await connector.connect()
+        await CONNECT_GATE.connect_all("message_sync", self.connectors)
         
         try:
             iteration = 0
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Cycle {iteration}] Processing messages...")
-                
-                sample_messages = [{"id": i, "data": f"msg_{i}"} for i in range(5)]
+                with TRACER.span("message_sync.cycle", iteration=iteration):
+                    changed = SIMULATION.changes("message_sync", 5)
+                    sample_messages = [{"id": i, "data": f"msg_{i}"} for i in range(changed)]
                 
-                tasks = [c.sync_messages(sample_messages) for c in self.connectors.values()]
-                results = await asyncio.gather(*tasks)
+                    results, failures = await gather_isolated(
+                        {name: c.sync_messages(sample_messages) for name, c in self.connectors.items()})
                 
-                for result in results:
-                    self.sync_history.append(result)
-                    logger.info(f"✓ {result['queue']}: {result['messages_processed']} messages")
+                    for name, error in failures.items():
+                        self.sync_history.record(name, "sync_messages", 0, ok=False)
+                        logger.error(f"✗ {name}: {error}")
+                    for result in results:
+                        self.sync_history.record(result["queue"], "sync_messages", result["messages_processed"])
+                        logger.debug(kv("synced", connector=result["queue"], messages=result["messages_processed"]))
+                    logger.info(kv("cycle", subsystem="message_sync", iteration=iteration, ok=len(results), failed=len(failures),
+                                messages=sum(r["messages_processed"] for r in results)))
+                    self.polled += sum(r["messages_processed"] for r in results)
                 
-                await asyncio.sleep(check_interval)
+                READINESS.synced("message_sync")
+                await asyncio.sleep(SCHEDULER.next_interval(
+                    "message_sync", check_interval, self.polled, self.connectors))
         
         except KeyboardInterrupt:
             logger.info("Message sync stopped.")
@@ -96,5 +116,5 @@ class MessageQueueSyncManager:
         return {
             "running": self.is_running,
             "message_queues": list(self.connectors.keys()),
-            "total_messages_processed": sum(r.get("messages_processed", 0) for r in self.sync_history)
+            "total_messages_processed": self.sync_history.total("sync_messages")
         }
@@ -0,0 +1,222 @@
+"""Metrics - Per-connector latency histograms and counters in Prometheus format."""
+
+import asyncio
+import functools
+import logging
+import math
+from typing import Dict, List, Any, Callable, Optional, Tuple
+from dataclasses import dataclass, field
+
+from clock import Clock, SYSTEM_CLOCK
+from tracing import TRACER
+from limits import LIMITERS
+from breakers import BREAKERS
+from simulation import SIMULATION
+
+logger = logging.getLogger(__name__)
+
+# Log-bucketed layout: each power-of-two octave of seconds is split into
+# SUB_BUCKETS linear slots, giving ~1/SUB_BUCKETS relative error (HDR-style).
+MIN_EXPONENT = -20   # 2**-20 s ~= 1 us
+MAX_EXPONENT = 7     # 2**7 s = 128 s
+SUB_BUCKETS = 16
+BUCKET_COUNT = (MAX_EXPONENT - MIN_EXPONENT + 1) * SUB_BUCKETS
+
+# Prometheus "le" bounds sit on octave edges, so they are exact sums of fine buckets
+EXPORT_EXPONENTS = list(range(-17, MAX_EXPONENT + 1))
+
+def bucket_index(seconds: float) -> int:
+    if seconds <= 0:
+        return 0
+    mantissa, exponent = math.frexp(seconds)
+    if exponent < MIN_EXPONENT:
+        return 0
+    if exponent > MAX_EXPONENT:
+        return BUCKET_COUNT - 1
+    sub = int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+    return (exponent - MIN_EXPONENT) * SUB_BUCKETS + sub
+
+def bucket_upper_bound(index: int) -> float:
+    exponent, sub = divmod(index, SUB_BUCKETS)
+    return math.ldexp(0.5 + (sub + 1) / (2 * SUB_BUCKETS), exponent + MIN_EXPONENT)
+
+class LatencyHistogram:
+    """Fixed-size log-bucketed histogram; recording is a couple of list/int updates, no locks."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bucket_index(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bucket_upper_bound(index), self.max)
+        return self.max
+
+    def cumulative(self, exponent: int) -> int:
+        """Observations below 2**exponent seconds; an exact edge value lands in the next octave."""
+        last = (exponent - MIN_EXPONENT + 1) * SUB_BUCKETS
+        return sum(self.counts[:max(0, min(last, BUCKET_COUNT))])
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's observations, e.g. one recorded in a worker process."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+@dataclass
+class OperationMetrics:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    items: int = 0
+    bytes: int = 0
+    errors: int = 0
+
+Observer = Callable[[str, str, float, int, bool], None]
+
+class MetricsRegistry:
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
+        # Instrumented calls are timed on this clock
+        self.clock = clock
+        self.operations: Dict[Tuple[str, str], OperationMetrics] = {}
+        self.observers: List[Observer] = []
+
+    def subscribe(self, observer: Observer) -> None:
+        """Call observer(connector, operation, seconds, items, error) on every observation."""
+        self.observers.append(observer)
+
+    def get(self, connector: str, operation: str) -> OperationMetrics:
+        key = (connector, operation)
+        metrics = self.operations.get(key)
+        if metrics is None:
+            metrics = self.operations[key] = OperationMetrics()
+        return metrics
+
+    def observe(self, connector: str, operation: str, seconds: float,
+                items: int = 0, nbytes: int = 0, error: bool = False) -> None:
+        metrics = self.get(connector, operation)
+        metrics.latency.record(seconds)
+        metrics.items += items
+        metrics.bytes += nbytes
+        if error:
+            metrics.errors += 1
+        for observer in self.observers:
+            observer(connector, operation, seconds, items, error)
+
+    def merge(self, operations: Dict[Tuple[str, str], OperationMetrics]) -> None:
+        """Fold in another registry's operations without notifying observers."""
+        for key, other in operations.items():
+            metrics = self.get(*key)
+            metrics.latency.merge(other.latency)
+            metrics.items += other.items
+            metrics.bytes += other.bytes
+            metrics.errors += other.errors
+
+    def reset(self) -> None:
+        self.operations.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            f"{connector}.{operation}": {**m.latency.summary(), "items": m.items, "bytes": m.bytes, "errors": m.errors}
+            for (connector, operation), m in self.operations.items()
+        }
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP connector_operation_seconds Connector operation latency.",
+            "# TYPE connector_operation_seconds histogram",
+        ]
+        for (connector, operation), m in self.operations.items():
+            labels = f'connector="{_escape(connector)}",operation="{operation}"'
+            for exponent in EXPORT_EXPONENTS:
+                le = repr(math.ldexp(1.0, exponent))
+                lines.append(f'connector_operation_seconds_bucket{{{labels},le="{le}"}} {m.latency.cumulative(exponent)}')
+            lines.append(f'connector_operation_seconds_bucket{{{labels},le="+Inf"}} {m.latency.count}')
+            lines.append(f"connector_operation_seconds_sum{{{labels}}} {m.latency.total}")
+            lines.append(f"connector_operation_seconds_count{{{labels}}} {m.latency.count}")
+
+        for name, attr, help_text in (
+            ("connector_items_total", "items", "Items handled by connector operations."),
+            ("connector_bytes_total", "bytes", "Payload bytes handled by connector operations."),
+            ("connector_errors_total", "errors", "Failed connector operations."),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (connector, operation), m in self.operations.items():
+                labels = f'connector="{_escape(connector)}",operation="{operation}"'
+                lines.append(f"{name}{{{labels}}} {getattr(m, attr)}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+REGISTRY = MetricsRegistry()
+
+def _default_items(payload: Any) -> int:
+    return len(payload) if hasattr(payload, "__len__") else 1
+
+def instrumented(operation: str, items_of: Callable[[Any], int] = _default_items,
+                 bytes_of: Optional[Callable[[Any], int]] = None) -> Callable:
+    """Record latency, items, bytes and errors of a connector coroutine method.
+
+    The connector name is read from ``self.config.name`` and the payload is
+    the method's first positional argument. Calls go through the
+    connector's circuit breaker, which fails them fast while open, its
+    cluster fence, if any, and its limiter; recorded latency excludes time
+    spent waiting on the limiter.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(self, payload, *args, **kwargs):
+            items = items_of(payload)
+            breaker = BREAKERS.get(self.config.name)
+            with TRACER.span(operation, connector=self.config.name, items=items):
+                breaker.check()
+                if self.fence is not None:
+                    await self.fence.check()
+                async with LIMITERS.get(self.config.name).slot():
+                    started = REGISTRY.clock.monotonic()
+                    try:
+                        with breaker.guard():
+                            call = fn(self, payload, *args, **kwargs)
+                            if SIMULATION.active:
+                                call = SIMULATION.model_call(self.config.name, operation, items, call)
+                            result = await asyncio.wait_for(call, breaker.policy.call_timeout)
+                    except Exception:
+                        REGISTRY.observe(self.config.name, operation, REGISTRY.clock.monotonic() - started, error=True)
+                        raise
+                REGISTRY.observe(
+                    self.config.name, operation, REGISTRY.clock.monotonic() - started,
+                    items=items, nbytes=bytes_of(payload) if bytes_of else 0
+                )
+                return result
+        return wrapper
+    return decorator
+
+def file_bytes(files: List[Dict[str, Any]]) -> int:
+    return sum(f.get("size", 0) for f in files)
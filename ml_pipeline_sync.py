@@ -4,9 +4,19 @@ import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from tracing import TRACER
+from startup import CONNECT_GATE, READINESS
+from scheduler import SCHEDULER
+from transport import BaseConnector
+from metrics import instrumented
+from log_writer import kv
+from simulation import SIMULATION
+from breakers import gather_isolated
+
 logger = logging.getLogger(__name__)
 
 class MLPlatformType(Enum):
@@ -21,71 +31,94 @@ class MLPlatformConfig:
     endpoint: str
     credentials: Dict[str, str]
 
-class MLPlatformConnector:
+class MLPlatformConnector(BaseConnector):
     def __init__(self, config: MLPlatformConfig):
-        self.config = config
-        self.connected = False
-        self.last_sync: Optional[datetime] = None
+        super().__init__(config)
         self.models_synced = 0
     
-    async def connect(self) -> bool:
-        logger.info(f"[{self.config.name}] Connecting to {self.config.platform_type.value}...")
-        await asyncio.sleep(0.1)
-        self.connected = True
-        return True
+    @property
+    def target(self) -> str:
+        return self.config.platform_type.value
     
+    def base_url(self) -> Optional[str]:
+        return self.config.endpoint
+    
+    @instrumented("sync_models")
     async def sync_models(self, models: List[Dict[str, Any]]) -> Dict[str, Any]:
-        if not self.connected:
-            raise Exception("Not connected")
+        self.ensure_connected()
+        encoded = self.encode(models)
         
-        logger.info(f"[{self.config.name}] Syncing {len(models)} models...")
+        logger.debug(kv("sync_models", connector=self.config.name, models=len(models), bytes=len(encoded.body)))
         await asyncio.sleep(0.1)
         
-        self.last_sync = datetime.utcnow()
+        self.last_sync = self.clock.utcnow()
         self.models_synced += len(models)
         
         return {
             "ml_platform": self.config.name,
             "models_synced": len(models),
             "total_models": self.models_synced,
-            "timestamp": self.last_sync.isoformat()
+            "wire_bytes": len(encoded.body),
+            "timestamp": self.last_sync
         }
 
 class MLPipelineSyncManager:
-    def __init__(self):
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
         self.connectors: Dict[str, MLPlatformConnector] = {}
-        self.sync_history: List[Dict[str, Any]] = []
+        self.clock = clock
+        self.sync_history = HistoryStore(clock=clock)
+        self.polled = 0
         self.is_running = False
     
     def register_platform(self, config: MLPlatformConfig) -> None:
-        self.connectors[config.name] = MLPlatformConnector(config)
+        connector = self.connectors[config.name] = MLPlatformConnector(config)
+        connector.clock = self.clock
         logger.info(f"Registered ML platform: {config.name}")
     
-    async def run_continuous_sync(self, check_interval: int = 45) -> None:
+    async def _sync_models(self, connectors: List[MLPlatformConnector], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results, failures = await gather_isolated({c.config.name: c.sync_models(items) for c in connectors})
+        
+        for name, error in failures.items():
+            self.sync_history.record(name, "sync_models", 0, ok=False)
+            logger.error(f"✗ {name}: {error}")
+        for result in results:
+            self.sync_history.record(result["ml_platform"], "sync_models", result["models_synced"])
+            logger.debug(kv("synced", connector=result["ml_platform"], models=result["models_synced"]))
+        return results
+    
+    async def sync_scope(self, source: Optional[str] = None, keys: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Sync now, limited to the named connector and to keys when given."""
+        connectors = [self.connectors[source]] if source in self.connectors else list(self.connectors.values())
+        items = [{"name": str(k)} for k in keys] if keys else [{"name": f"model_{i}", "version": i+1} for i in range(3)]
+        logger.info(f"[Scoped] Syncing {len(items)} models to {len(connectors)} ML platforms")
+        return await self._sync_models(connectors, items)
+    
+    async def run_continuous_sync(self, check_interval: int = 45, initial_delay: float = 0.0) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("ML PIPELINE SYNC MANAGER STARTED")
         logger.info("="*80 + "\n")
         
-        for connector in self.connectors.values():
-            await connector.connect()
+        await CONNECT_GATE.connect_all("ml_sync", self.connectors)
         
         try:
             iteration = 0
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Cycle {iteration}] Syncing ML models...")
-                
-                sample_models = [{"name": f"model_{i}", "version": i+1} for i in range(3)]
-                
-                tasks = [c.sync_models(sample_models) for c in self.connectors.values()]
-                results = await asyncio.gather(*tasks)
+                with TRACER.span("ml_sync.cycle", iteration=iteration):
+                    changed = SIMULATION.changes("ml_sync", 3)
+                    sample_models = [{"name": f"model_{i}", "version": i+1} for i in range(changed)]
                 
-                for result in results:
-                    self.sync_history.append(result)
-                    logger.info(f"✓ {result['ml_platform']}: {result['models_synced']} models")
+                    results = await self._sync_models(list(self.connectors.values()), sample_models)
+                    logger.info(kv("cycle", subsystem="ml_sync", iteration=iteration, ok=len(results),
+                                failed=len(self.connectors) - len(results), models=sum(r["models_synced"] for r in results)))
+                    self.polled += sum(r["models_synced"] for r in results)
                 
-                await asyncio.sleep(check_interval)
+                READINESS.synced("ml_sync")
+                await asyncio.sleep(SCHEDULER.next_interval(
+                    "ml_sync", check_interval, self.polled, self.connectors))
         
         except KeyboardInterrupt:
             logger.info("ML sync stopped.")
@@ -97,5 +130,5 @@ class MLPipelineSyncManager:
         return {
             "running": self.is_running,
             "ml_platforms": list(self.connectors.keys()),
-            "total_models_synced": sum(r.get("models_synced", 0) for r in self.sync_history)
+            "total_models_synced": self.sync_history.total("sync_models")
         }
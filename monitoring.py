@@ -2,11 +2,18 @@
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import time
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from metrics import REGISTRY
+from anomaly import AnomalyDetector, DETECTOR
+from timeseries import TimeSeriesStore
+
 logger = logging.getLogger(__name__)
 
 class HealthStatus(Enum):
@@ -14,6 +21,8 @@ class HealthStatus(Enum):
     DEGRADED = "degraded"
     UNHEALTHY = "unhealthy"
 
+SEVERITY = {HealthStatus.HEALTHY: 0, HealthStatus.DEGRADED: 1, HealthStatus.UNHEALTHY: 2}
+
 @dataclass
 class HealthCheck:
     component: str
@@ -21,57 +30,245 @@ class HealthCheck:
     timestamp: datetime
     details: Dict[str, Any]
 
+@dataclass
+class HealthThresholds:
+    """Limits for DEGRADED/UNHEALTHY; staleness is in multiples of the expected interval."""
+    stale_degraded: float = 2.0
+    stale_unhealthy: float = 5.0
+    error_rate_degraded: float = 0.05
+    error_rate_unhealthy: float = 0.5
+    queue_degraded: int = 1000
+    queue_unhealthy: int = 5000
+    throughput_degraded: float = 0.1    # fraction of the component's own throughput baseline
+    baseline_alpha: float = 0.05
+    error_window: int = 50
+
+@dataclass
+class MonitoredComponent:
+    name: str
+    manager: Any
+    interval: float
+    thresholds: HealthThresholds = field(default_factory=HealthThresholds)
+    registered_at: float = field(default_factory=time.time)
+    throughput_baseline: Optional[float] = None
+
 class MonitoringSystem:
-    def __init__(self):
-        self.health_checks: List[HealthCheck] = []
+    DEFAULT_COMPONENTS = [
+        "cloud_sync", "database_sync", "storage_sync", "cache_sync",
+        "message_sync", "search_sync", "ml_sync", "graphql_sync",
+        "webhook_manager"
+    ]
+
+    def __init__(self, history_capacity: int = 10000, check_timeout: float = 2.0,
+                 detector: Optional[AnomalyDetector] = None, clock: Clock = SYSTEM_CLOCK):
+        self.clock = clock
+        self.health_checks = HistoryStore(history_capacity, clock=clock)
         self.is_running = False
         self.last_check: Optional[datetime] = None
-    
+        self.check_timeout = check_timeout
+        self.components: Dict[str, MonitoredComponent] = {}
+        self.latest: Dict[str, HealthCheck] = {}
+        self.timeseries = TimeSeriesStore(clock=clock)
+        self._connector_totals: Dict[str, Dict[str, float]] = {}
+        self.detector = detector or DETECTOR
+
+    def register_component(self, name: str, manager: Any, interval: float,
+                           thresholds: Optional[HealthThresholds] = None) -> None:
+        self.components[name] = MonitoredComponent(name, manager, interval, thresholds or HealthThresholds(),
+                                                    self.clock.time())
+        logger.info(f"Monitoring component: {name} (expected interval {interval}s)")
+
+    @staticmethod
+    def collect_metrics(manager: Any, window: int = 50, throughput_window: float = 300.0,
+                        clock: Clock = SYSTEM_CLOCK) -> Dict[str, Any]:
+        """Read the signals a manager exposes: connector last_sync, history, queue depth."""
+        now = clock.time()
+        metrics: Dict[str, Any] = {"running": getattr(manager, "is_running", None)}
+
+        connectors = getattr(manager, "connectors", None) or getattr(manager, "providers", None) or {}
+        metrics["connectors"] = list(connectors)
+        syncs = [c.last_sync for c in connectors.values() if getattr(c, "last_sync", None)]
+        metrics["last_sync_age"] = (clock.utcnow() - max(syncs)).total_seconds() if syncs else None
+
+        history = getattr(manager, "sync_history", None)
+        if history is None:
+            history = getattr(manager, "event_history", None)
+        if isinstance(history, HistoryStore):
+            recent = history.recent(limit=window)
+            metrics["error_rate"] = (sum(1 for r in recent if not r.ok) / len(recent)) if recent else 0.0
+            if throughput_window > 0:
+                items = sum(r.count for r in recent if r.timestamp >= now - throughput_window)
+                metrics["throughput"] = items / throughput_window
+
+        queue = getattr(manager, "ingest_queue", None)
+        metrics["queue_depth"] = queue.qsize() if queue is not None else 0
+        return metrics
+
+    def evaluate(self, component: MonitoredComponent, metrics: Dict[str, Any]) -> HealthStatus:
+        t = component.thresholds
+        status = HealthStatus.HEALTHY
+
+        def worsen(candidate: HealthStatus) -> None:
+            nonlocal status
+            if SEVERITY[candidate] > SEVERITY[status]:
+                status = candidate
+
+        if metrics.get("running") is False and metrics.get("last_sync_age") is not None:
+            # Synced before but its loop has exited
+            worsen(HealthStatus.UNHEALTHY)
+
+        if component.interval > 0:
+            age = metrics.get("last_sync_age")
+            if age is None:
+                age = self.clock.time() - component.registered_at
+            stale = age / component.interval
+            if stale > t.stale_unhealthy:
+                worsen(HealthStatus.UNHEALTHY)
+            elif stale > t.stale_degraded:
+                worsen(HealthStatus.DEGRADED)
+
+        error_rate = metrics.get("error_rate", 0.0)
+        if error_rate >= t.error_rate_unhealthy:
+            worsen(HealthStatus.UNHEALTHY)
+        elif error_rate >= t.error_rate_degraded:
+            worsen(HealthStatus.DEGRADED)
+
+        depth = metrics.get("queue_depth", 0)
+        if depth >= t.queue_unhealthy:
+            worsen(HealthStatus.UNHEALTHY)
+        elif depth >= t.queue_degraded:
+            worsen(HealthStatus.DEGRADED)
+
+        throughput = metrics.get("throughput")
+        if throughput is not None and metrics.get("last_sync_age") is not None:
+            baseline = component.throughput_baseline
+            if baseline and throughput < baseline * t.throughput_degraded:
+                worsen(HealthStatus.DEGRADED)
+            # A slow average, so a lasting change of pace becomes the new normal
+            component.throughput_baseline = throughput if baseline is None else (
+                baseline + t.baseline_alpha * (throughput - baseline))
+
+        if metrics.get("anomalies"):
+            worsen(HealthStatus.DEGRADED)
+        return status
+
     async def check_component_health(self, component_name: str) -> HealthStatus:
-        await asyncio.sleep(0.1)
-        return HealthStatus.HEALTHY
-    
+        return (await self._probe(component_name)).status
+
+    async def _probe(self, component_name: str) -> HealthCheck:
+        component = self.components.get(component_name)
+        if component is None:
+            # Nothing registered to measure, so there is no evidence of a problem
+            check = HealthCheck(component_name, HealthStatus.HEALTHY, self.clock.utcnow(), {"registered": False})
+        else:
+            try:
+                # On the loop: the counters read here are the loop's, and reading them takes microseconds
+                status, metrics = self._measure(component)
+                check = HealthCheck(component_name, status, self.clock.utcnow(), metrics)
+            except Exception as e:
+                check = HealthCheck(component_name, HealthStatus.UNHEALTHY, self.clock.utcnow(), {"error": str(e)})
+        self.latest[component_name] = check
+        return check
+
+    def _measure(self, component: MonitoredComponent) -> Tuple[HealthStatus, Dict[str, Any]]:
+        metrics = self.collect_metrics(
+            component.manager, component.thresholds.error_window,
+            component.interval * component.thresholds.stale_unhealthy, self.clock
+        )
+        metrics["anomalies"] = self.detector.anomalous_connectors(metrics["connectors"])
+        return self.evaluate(component, metrics), metrics
+
+    async def run_checks(self) -> List[HealthCheck]:
+        """Probe every component concurrently, each under check_timeout."""
+        names = list(self.components) or self.DEFAULT_COMPONENTS
+
+        async def guarded(name: str) -> HealthCheck:
+            try:
+                return await asyncio.wait_for(self._probe(name), self.check_timeout)
+            except asyncio.TimeoutError:
+                check = HealthCheck(name, HealthStatus.UNHEALTHY, self.clock.utcnow(), {"error": "health check timed out"})
+                self.latest[name] = check
+                return check
+
+        checks = await asyncio.gather(*(guarded(name) for name in names))
+        now = self.clock.time()
+        for check in checks:
+            self.health_checks.record(check.component, check.status.value, ok=check.status == HealthStatus.HEALTHY)
+            self._record_series(check, now)
+        self._record_connector_series(now)
+        self.last_check = self.clock.utcnow()
+        return checks
+
+    def _record_series(self, check: HealthCheck, now: float) -> None:
+        self.timeseries.record(f"{check.component}.severity", SEVERITY[check.status], now)
+        for metric in ("error_rate", "throughput", "queue_depth", "last_sync_age"):
+            value = check.details.get(metric)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.timeseries.record(f"{check.component}.{metric}", value, now)
+
+    def _record_connector_series(self, now: float) -> None:
+        """Per-connector call/error/item deltas since the previous probe."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for (connector, _), m in REGISTRY.operations.items():
+            t = totals.setdefault(connector, {"calls": 0, "errors": 0, "items": 0})
+            t["calls"] += m.latency.count
+            t["errors"] += m.errors
+            t["items"] += m.items
+        for connector, t in totals.items():
+            previous = self._connector_totals.get(connector, {})
+            for metric, value in t.items():
+                self.timeseries.record(f"{connector}.{metric}", max(0, value - previous.get(metric, 0)), now)
+        self._connector_totals = totals
+
+    def error_rate(self, connector: str, seconds: float) -> Optional[float]:
+        """Fraction of failed calls for a connector over the last ``seconds``."""
+        start = self.clock.time() - seconds
+        calls = self.timeseries.aggregate(f"{connector}.calls", start, agg="sum")
+        if not calls:
+            return None
+        return (self.timeseries.aggregate(f"{connector}.errors", start, agg="sum") or 0.0) / calls
+
     async def run_monitoring(self, check_interval: int = 10) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("MONITORING SYSTEM STARTED")
         logger.info("="*80 + "\n")
-        
-        components = [
-            "cloud_sync", "database_sync", "storage_sync", "cache_sync",
-            "message_sync", "search_sync", "ml_sync", "graphql_sync",
-            "webhook_manager"
-        ]
-        
+
         try:
             iteration = 0
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Health Check {iteration}] Checking {len(components)} components...")
-                
-                for component in components:
-                    status = await self.check_component_health(component)
-                    check = HealthCheck(
-                        component=component,
-                        status=status,
-                        timestamp=datetime.utcnow(),
-                        details={"status": status.value}
-                    )
-                    self.health_checks.append(check)
-                    logger.info(f"✓ {component}: {status.value}")
-                
-                self.last_check = datetime.utcnow()
+                checks = await self.run_checks()
+                logger.info(f"[Health Check {iteration}] Checked {len(checks)} components")
+                for check in checks:
+                    if check.status != HealthStatus.HEALTHY:
+                        logger.warning(f"✗ {check.component}: {check.status.value} {check.details}")
+
                 await asyncio.sleep(check_interval)
-        
+
         except KeyboardInterrupt:
             logger.info("Monitoring stopped.")
         finally:
             self.is_running = False
             logger.info("Monitoring System Stopped")
-    
+
+    def get_health(self) -> Dict[str, Any]:
+        """Cached result of the last probe; never triggers a check."""
+        overall = HealthStatus.HEALTHY
+        for check in self.latest.values():
+            if SEVERITY[check.status] > SEVERITY[overall]:
+                overall = check.status
+        return {
+            "status": overall.value,
+            "last_check": self.last_check.isoformat() if self.last_check else None,
+            "components": {name: check.status.value for name, check in self.latest.items()}
+        }
+
     def get_status(self) -> Dict[str, Any]:
         return {
             "running": self.is_running,
-            "total_checks": len(self.health_checks),
+            "total_checks": self.health_checks.total_records,
+            "timeseries": self.timeseries.stats(),
+            "anomalies": self.detector.anomalous_connectors(),
             "last_check": self.last_check.isoformat() if self.last_check else None
         }
@@ -0,0 +1,148 @@
+"""Pipeline - Streams change batches between sync subsystems as linked stages."""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, List, Any, Awaitable, Callable, Optional
+from dataclasses import dataclass, field
+
+from clock import Clock, SYSTEM_CLOCK
+from metrics import LatencyHistogram
+from tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ChangeBatch:
+    """Records one upstream sync changed, passed between stages in memory."""
+    source: str
+    records: List[Dict[str, Any]]
+    seq: int
+    created: float = field(default_factory=time.monotonic)
+
+StageHandler = Callable[[ChangeBatch], Awaitable[Any]]
+
+class Stage:
+    def __init__(self, name: str, handler: StageHandler, capacity: int):
+        self.name = name
+        self.handler = handler
+        self.capacity = capacity
+        self.queue: asyncio.Queue = asyncio.Queue(capacity)
+        self.downstream: List["Stage"] = []
+        self.upstream: List["Stage"] = []
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.records = 0
+        self.busy_seconds = 0.0
+        self.freshness = LatencyHistogram()
+
+    def get_status(self) -> Dict[str, Any]:
+        status = {
+            "after": [s.name for s in self.upstream],
+            "queued": self.queue.qsize(),
+            "capacity": self.capacity,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "records": self.records,
+            "busy_seconds": round(self.busy_seconds, 3)
+        }
+        if not self.downstream and self.freshness.count:
+            status["freshness_p50"] = round(self.freshness.percentile(50), 4)
+            status["freshness_p99"] = round(self.freshness.percentile(99), 4)
+        return status
+
+class PropagationPipeline:
+    """A DAG of stages fed with the change batches an upstream sync publishes.
+
+    Each stage reads from a bounded queue and hands its batch to every stage
+    declared ``after`` it, so a batch fetched once flows through all of them.
+    A full queue blocks the stage (and ultimately the publisher) feeding it:
+    a slow sink throttles the sync upstream instead of buffering without end.
+    The publisher waits at most ``publish_timeout`` seconds per root stage;
+    past that the batch is dropped for that stage and counted, so a stuck
+    sink cannot stall the sync that publishes to it.
+    A stage that fails is logged and counted; its batch still moves on, since
+    downstream stages act on the upstream change rather than on its result.
+    """
+
+    def __init__(self, name: str = "propagation", capacity: int = 4, publish_timeout: float = 30.0,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.name = name
+        self.clock = clock
+        self.capacity = capacity
+        self.publish_timeout = publish_timeout
+        self.stages: Dict[str, Stage] = {}
+        self._seq = itertools.count(1)
+        self.published = 0
+
+    def add_stage(self, name: str, handler: StageHandler, after: Optional[List[str]] = None,
+                  capacity: Optional[int] = None) -> Stage:
+        """Declare a stage; ``after`` names stages added earlier, so the graph stays acyclic."""
+        if name in self.stages:
+            raise ValueError(f"Stage {name} already exists")
+        missing = [s for s in after or [] if s not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} follows unknown stages: {missing}")
+        stage = self.stages[name] = Stage(name, handler, capacity or self.capacity)
+        for upstream in after or []:
+            self.stages[upstream].downstream.append(stage)
+            stage.upstream.append(self.stages[upstream])
+        logger.info(f"[Pipeline] {self.name}: {' + '.join(after or ['publish'])} -> {name}")
+        return stage
+
+    async def publish(self, source: str, records: List[Dict[str, Any]]) -> None:
+        """Hand a change batch to the root stages; waits while they are full, up to publish_timeout."""
+        batch = ChangeBatch(source, records, next(self._seq), self.clock.monotonic())
+        self.published += 1
+        for stage in self.stages.values():
+            if not stage.upstream:
+                try:
+                    await asyncio.wait_for(stage.queue.put(batch), self.publish_timeout)
+                except asyncio.TimeoutError:
+                    stage.dropped += 1
+                    logger.warning(f"[Pipeline] {stage.name} full for {self.publish_timeout}s; "
+                                   f"dropped batch {batch.seq} from {source} ({len(records)} records)")
+
+    async def _work(self, stage: Stage) -> None:
+        while True:
+            batch = await stage.queue.get()
+            started = self.clock.monotonic()
+            try:
+                with TRACER.span(f"{stage.name}.propagate", source=batch.source, records=len(batch.records)):
+                    await stage.handler(batch)
+                stage.processed += 1
+                stage.records += len(batch.records)
+            except Exception as e:
+                stage.failed += 1
+                logger.error(f"[Pipeline] {stage.name} failed on batch {batch.seq} from {batch.source}: {e}")
+            finally:
+                stage.busy_seconds += self.clock.monotonic() - started
+            for downstream in stage.downstream:
+                await downstream.queue.put(batch)
+            if not stage.downstream:
+                stage.freshness.record(self.clock.monotonic() - batch.created)
+            stage.queue.task_done()
+
+    async def run(self) -> None:
+        workers = [asyncio.create_task(self._work(stage)) for stage in self.stages.values()]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def drain(self) -> None:
+        """Wait until every published batch has cleared every stage."""
+        # Stages were added upstream-first, so one pass in order sees each batch through
+        for stage in self.stages.values():
+            await stage.queue.join()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "published": self.published,
+            "stages": {name: stage.get_status() for name, stage in self.stages.items()}
+        }
@@ -0,0 +1,406 @@
+"""Process Pool - Run sync managers or shards of their connectors in worker processes."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import time
+from typing import Dict, List, Any, Optional, Set
+from dataclasses import dataclass, field, replace
+from multiprocessing import shared_memory
+
+from metrics import MetricsRegistry, REGISTRY
+from scheduler import SCHEDULER, SchedulePolicy
+from log_writer import LOG_WRITER
+
+logger = logging.getLogger(__name__)
+
+# Messages at least this large travel through shared memory; the pipe only carries the segment name
+BULK_THRESHOLD = 64 * 1024
+
+_INLINE, _SHARED = b"I", b"S"
+
+def send_message(conn, message: Any, segment: Optional[str] = None) -> None:
+    """Pickle message onto the pipe, through shared memory named ``segment`` when it is large.
+
+    The receiver unlinks the segment. Without a name the message always
+    goes inline: only a segment the receiving side named, and so can
+    reclaim if the message is never read, is ever created.
+    """
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    if segment is None or len(data) < BULK_THRESHOLD:
+        conn.send_bytes(_INLINE + data)
+        return
+    shm = shared_memory.SharedMemory(name=segment, create=True, size=len(data))
+    try:
+        shm.buf[:len(data)] = data
+        conn.send_bytes(_SHARED + pickle.dumps((shm.name, len(data))))
+    except BaseException:
+        shm.unlink()
+        raise
+    finally:
+        shm.close()
+
+def recv_message(conn) -> Any:
+    """The next message; None when its segment was already reclaimed by the side that named it."""
+    raw = conn.recv_bytes()
+    kind, body = raw[:1], raw[1:]
+    if kind == _INLINE:
+        return pickle.loads(body)
+    name, size = pickle.loads(body)
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return None
+    try:
+        data = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+        shm.unlink()
+    return pickle.loads(data)
+
+def unlink_segment(name: str) -> bool:
+    """Free a segment whose message will not be read; False if it is already gone or was never made."""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    shm.close()
+    shm.unlink()
+    return True
+
+@dataclass
+class WorkerSpec:
+    """Subsystems one worker runs; with shard_count > 1 it owns every shard_count-th connector."""
+    subsystems: List[str]
+    shard_index: int = 0
+    shard_count: int = 1
+
+    @property
+    def name(self) -> str:
+        shard = f"[{self.shard_index}/{self.shard_count}]" if self.shard_count > 1 else ""
+        return "+".join(self.subsystems) + shard
+
+@dataclass
+class WorkerHandle:
+    spec: WorkerSpec
+    process: Optional[multiprocessing.process.BaseProcess] = None
+    conn: Any = None
+    restarts: int = 0
+    reader: Optional[asyncio.AbstractEventLoop] = None
+    waiters: Dict[int, asyncio.Future] = field(default_factory=dict)
+    segments: Dict[int, str] = field(default_factory=dict)     # request id -> segment its reply may use
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+def default_placement(subsystems: List[str], workers: Optional[int] = None) -> List[WorkerSpec]:
+    """One worker per core: group subsystems when cores are scarce, shard them when plentiful."""
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers <= len(subsystems):
+        return [WorkerSpec(subsystems[i::workers]) for i in range(workers)]
+    specs = []
+    for i, name in enumerate(subsystems):
+        shards = workers // len(subsystems) + (1 if i < workers % len(subsystems) else 0)
+        specs.extend(WorkerSpec([name], k, shards) for k in range(shards))
+    return specs
+
+def connector_map(manager: Any) -> Dict[str, Any]:
+    return manager.providers if hasattr(manager, "providers") else manager.connectors
+
+def shard_manager(manager: Any, index: int, count: int) -> None:
+    """Keep only this shard's connectors; managers with sync pairs are sharded by pair."""
+    if count <= 1:
+        return
+    pairs = getattr(manager, "sync_pairs", None)
+    if pairs:
+        manager.sync_pairs = [p for i, p in enumerate(pairs) if i % count == index]
+        used = {name for pair in manager.sync_pairs for name in pair[:2]}
+        manager.connectors = {n: c for n, c in manager.connectors.items() if n in used}
+        return
+    owned = {n: c for i, (n, c) in enumerate(connector_map(manager).items()) if i % count == index}
+    if hasattr(manager, "providers"):
+        manager.providers = owned
+    else:
+        manager.connectors = owned
+
+def merge_status(into: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine shard statuses: counters add, flags OR, lists union, dicts recurse."""
+    for key, value in other.items():
+        current = into.get(key)
+        if key not in into:
+            into[key] = value
+        elif isinstance(value, bool):
+            into[key] = bool(current) or value
+        elif isinstance(value, (int, float)) and isinstance(current, (int, float)):
+            into[key] = current + value
+        elif isinstance(value, list) and isinstance(current, list):
+            into[key] = current + [v for v in value if v not in current]
+        elif isinstance(value, dict) and isinstance(current, dict):
+            merge_status(current, value)
+    return into
+
+def worker_main(spec: WorkerSpec, intervals: Dict[str, int], conn, log_level: int = logging.INFO,
+                schedule: Optional[SchedulePolicy] = None, log_options: Optional[Dict[str, Any]] = None) -> None:
+    """Worker process entry point: its own event loop running the assigned managers."""
+    # Ctrl-C reaches the whole process group; the parent shuts workers down over the pipe
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    LOG_WRITER.configure(level=log_level, process=True, **(log_options or {}))
+    SCHEDULER.configure(schedule)
+    try:
+        asyncio.run(_serve(spec, intervals, conn))
+    finally:
+        conn.close()
+        LOG_WRITER.stop()
+
+async def _serve(spec: WorkerSpec, intervals: Dict[str, int], conn) -> None:
+    # Imported here: the orchestrator imports this module for its process-pool mode
+    from mega_orchestrator import MegaOrchestrator
+
+    orchestrator = MegaOrchestrator(subsystems=spec.subsystems)
+    managers: Dict[str, Any] = {}
+    for name in spec.subsystems:
+        getattr(orchestrator, MegaOrchestrator.SUBSYSTEM_INITIALIZERS[name])()
+        manager = getattr(orchestrator, name)
+        shard_manager(manager, spec.shard_index, spec.shard_count)
+        managers[name] = manager
+    logger.info(f"Worker {spec.name} started (pid {os.getpid()})")
+
+    tasks = [asyncio.create_task(m.run_continuous_sync(intervals[name])) for name, m in managers.items()]
+    scoped: Set[asyncio.Task] = set()
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue()
+    loop.add_reader(conn.fileno(), _read_control, conn, inbox)
+    try:
+        while True:
+            message = await inbox.get()
+            if message is None:
+                logger.warning(f"Worker {spec.name} lost its control pipe")
+                break
+
+            command = message.get("cmd")
+            if command == "stop":
+                break
+            if command == "status":
+                send_message(conn, {
+                    "id": message["id"],
+                    "pid": os.getpid(),
+                    "status": {name: m.get_status() for name, m in managers.items()},
+                    "metrics": REGISTRY.operations
+                }, message.get("segment"))
+            elif command == "sync_scope":
+                manager = managers.get(message["subsystem"])
+                source = message["source"]
+                # A shard only answers for sources it owns; the other shards cover the rest
+                if manager is None or (spec.shard_count > 1 and source not in connector_map(manager)):
+                    continue
+                task = asyncio.create_task(_scoped_sync(manager, message["subsystem"], source, message["keys"]))
+                scoped.add(task)
+                task.add_done_callback(scoped.discard)
+    finally:
+        if not conn.closed:
+            loop.remove_reader(conn.fileno())
+        for manager in managers.values():
+            manager.is_running = False
+        for task in (*tasks, *scoped):
+            task.cancel()
+        await asyncio.gather(*tasks, *scoped, return_exceptions=True)
+        logger.info(f"Worker {spec.name} stopped")
+
+def _read_control(conn, inbox: asyncio.Queue) -> None:
+    """Reader callback: queue every complete control message; None once the pipe is gone."""
+    try:
+        while conn.poll():
+            inbox.put_nowait(recv_message(conn))
+    except (EOFError, OSError):
+        asyncio.get_running_loop().remove_reader(conn.fileno())
+        inbox.put_nowait(None)
+
+async def _scoped_sync(manager: Any, subsystem: str, source: str, keys: Optional[List[Any]]) -> None:
+    try:
+        await manager.sync_scope(source, keys)
+    except Exception as e:
+        logger.error(f"[Worker] {subsystem} scoped sync failed: {e}")
+
+class ProcessPool:
+    """Runs sync managers in worker processes, one event loop per process.
+
+    Control messages and status travel over a pipe per worker; messages of
+    ``BULK_THRESHOLD`` bytes or more (large status or histogram snapshots)
+    are written to a shared-memory segment and only its name is piped.
+    Workers that die are restarted by ``run``, which also refreshes
+    ``status``. Replies are read by event-loop readers as they arrive.
+    The pool names every segment a reply may use and unlinks the ones
+    still outstanding when a request times out or is cancelled, and when
+    a worker stops or dies, so an unread reply never outlives the pool.
+    """
+
+    def __init__(self, placement: List[WorkerSpec], intervals: Dict[str, int],
+                 status_timeout: float = 2.0, start_method: str = "spawn",
+                 schedule: Optional[SchedulePolicy] = None):
+        self.placement = placement
+        self.intervals = intervals
+        # Each worker schedules its own managers, so each gets an equal share of the polling budget
+        self.schedule = replace(schedule, budget=schedule.budget / len(placement)) if schedule else None
+        self.status_timeout = status_timeout
+        self.context = multiprocessing.get_context(start_method)
+        self.workers: List[WorkerHandle] = [WorkerHandle(spec) for spec in placement]
+        self.is_running = False
+        self._request_id = 0
+        self.status: Dict[str, Any] = {"subsystems": {}, "connector_metrics": {}, "workers": []}
+
+    def _spawn(self, worker: WorkerHandle) -> None:
+        parent_conn, child_conn = self.context.Pipe()
+        worker.process = self.context.Process(
+            target=worker_main,
+            args=(worker.spec, self.intervals, child_conn, logging.getLogger().getEffectiveLevel(), self.schedule,
+                  LOG_WRITER.options),
+            name=f"sync-{worker.spec.name}",
+            daemon=True
+        )
+        worker.process.start()
+        child_conn.close()
+        worker.conn = parent_conn
+
+    def start(self) -> None:
+        for worker in self.workers:
+            self._spawn(worker)
+        self.is_running = True
+        logger.info(f"Process pool started {len(self.workers)} workers: {[w.spec.name for w in self.workers]}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self.is_running = False
+        for worker in self.workers:
+            self._unwatch(worker)
+            if worker.alive:
+                try:
+                    send_message(worker.conn, {"cmd": "stop"})
+                except OSError:
+                    pass
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                logger.warning(f"Worker {worker.spec.name} did not stop, terminating")
+                worker.process.terminate()
+                worker.process.join(1.0)
+            worker.conn.close()
+            self._release_segments(worker)
+
+    async def run(self, check_interval: float = 5.0) -> None:
+        self.start()
+        try:
+            while self.is_running:
+                await asyncio.sleep(check_interval)
+                for worker in self.workers:
+                    if self.is_running and not worker.alive:
+                        worker.restarts += 1
+                        logger.error(f"Worker {worker.spec.name} exited "
+                                     f"(code {worker.process.exitcode}), restarting")
+                        self._unwatch(worker)
+                        worker.conn.close()
+                        self._release_segments(worker)
+                        self._spawn(worker)
+                if self.is_running:
+                    self.status = await self.collect_status()
+        finally:
+            self.stop()
+
+    def subsystems(self) -> List[str]:
+        return list(dict.fromkeys(name for spec in self.placement for name in spec.subsystems))
+
+    def scoped_sync(self, subsystem: str):
+        """A SyncRouter target that forwards scoped syncs to the workers running ``subsystem``."""
+        async def forward(source: Optional[str], keys: Optional[List[Any]]) -> None:
+            for worker in self.workers:
+                if subsystem in worker.spec.subsystems and worker.alive:
+                    send_message(worker.conn, {"cmd": "sync_scope", "subsystem": subsystem,
+                                               "source": source, "keys": keys})
+        return forward
+
+    def _watch(self, worker: WorkerHandle) -> None:
+        if worker.reader is None:
+            worker.reader = asyncio.get_running_loop()
+            worker.reader.add_reader(worker.conn.fileno(), self._read_replies, worker)
+
+    def _unwatch(self, worker: WorkerHandle) -> None:
+        if worker.reader is not None:
+            if not worker.reader.is_closed() and not worker.conn.closed:
+                worker.reader.remove_reader(worker.conn.fileno())
+            worker.reader = None
+        for waiter in worker.waiters.values():
+            if not waiter.done():
+                waiter.set_result(None)
+        worker.waiters.clear()
+
+    def _release_segments(self, worker: WorkerHandle, request_id: Optional[int] = None) -> None:
+        """Unlink segments for replies that will not be read: one request's, or all of them."""
+        ids = list(worker.segments) if request_id is None else [request_id]
+        for rid in ids:
+            name = worker.segments.pop(rid, None)
+            if name is not None and unlink_segment(name):
+                logger.debug(f"[Pool] freed unread reply segment {name} from {worker.spec.name}")
+
+    def _read_replies(self, worker: WorkerHandle) -> None:
+        try:
+            while worker.conn.poll():
+                reply = recv_message(worker.conn)
+                if reply is None:
+                    # Its request was given up on and the segment already freed
+                    continue
+                worker.segments.pop(reply.get("id"), None)
+                waiter = worker.waiters.pop(reply.get("id"), None)
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(reply)
+        except (EOFError, OSError):
+            self._unwatch(worker)
+
+    async def collect_status(self) -> Dict[str, Any]:
+        """Ask every worker at once, then merge shard statuses and connector histograms."""
+        self._request_id += 1
+        loop = asyncio.get_running_loop()
+        waiters: Dict[int, asyncio.Future] = {}
+        request_id = self._request_id
+        for i, worker in enumerate(self.workers):
+            if worker.alive:
+                segment = worker.segments[request_id] = f"psync_{os.getpid()}_{i}_{request_id}"
+                try:
+                    self._watch(worker)
+                    waiter = worker.waiters[request_id] = loop.create_future()
+                    send_message(worker.conn, {"cmd": "status", "id": request_id, "segment": segment})
+                    waiters[i] = waiter
+                except OSError:
+                    worker.waiters.pop(request_id, None)
+                    worker.segments.pop(request_id, None)
+        try:
+            if waiters:
+                await asyncio.wait(waiters.values(), timeout=self.status_timeout)
+        finally:
+            # Timed out or cancelled: a reply still on its way finds its segment gone and is dropped
+            for worker in self.workers:
+                self._release_segments(worker, request_id)
+
+        subsystems: Dict[str, Dict[str, Any]] = {}
+        metrics = MetricsRegistry()
+        workers = []
+        for i, worker in enumerate(self.workers):
+            waiter = waiters.get(i)
+            reply = waiter.result() if waiter is not None and waiter.done() else None
+            worker.waiters.pop(request_id, None)
+            if reply is not None:
+                for name, status in reply["status"].items():
+                    merge_status(subsystems.setdefault(name, {}), status)
+                metrics.merge(reply["metrics"])
+            workers.append({
+                "name": worker.spec.name,
+                "pid": worker.process.pid if worker.process else None,
+                "alive": worker.alive,
+                "responded": reply is not None,
+                "restarts": worker.restarts
+            })
+        return {"subsystems": subsystems, "connector_metrics": metrics.snapshot(), "workers": workers}
@@ -3,24 +3,64 @@
 
 import asyncio
 import logging
+import os
+import socket
 import sys
 from dotenv import load_dotenv
 from mega_orchestrator import MegaOrchestrator
+from tracing import TRACER
+from cluster import ClusterMember, SQLiteCoordinator
+from limits import LIMITERS, parse_rate_limits
+from scheduler import SchedulePolicy
+from log_writer import LOG_WRITER
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 def main():
     """Main entry point."""
     load_dotenv()
     
+    LOG_WRITER.configure(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+        json_lines=os.getenv("LOG_FORMAT", "text").lower() == "json",
+        queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        rate=float(os.getenv("LOG_RATE_LIMIT", "10")),
+        burst=int(os.getenv("LOG_BURST", "20"))
+    )
+    
     logger.info("Starting Mega Autonomous Sync System...\n")
     
-    orchestrator = MegaOrchestrator()
+    TRACER.configure(
+        sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0.1")),
+        export_path=os.getenv("TRACE_EXPORT_PATH") or None
+    )
+    
+    for name, (rate, burst) in parse_rate_limits(os.getenv("RATE_LIMITS", "")).items():
+        LIMITERS.set_rate(name, rate, burst)
+    
+    cluster = None
+    if os.getenv("CLUSTER_DB_PATH"):
+        cluster = ClusterMember(
+            os.getenv("CLUSTER_NODE_ID") or f"{socket.gethostname()}-{os.getpid()}",
+            SQLiteCoordinator(os.getenv("CLUSTER_DB_PATH")),
+            lease_ttl=float(os.getenv("CLUSTER_LEASE_TTL", "15"))
+        )
+    
+    orchestrator = MegaOrchestrator(
+        enable_diagnostics=os.getenv("DIAGNOSTICS_ENABLED", "false").lower() == "true",
+        worker_processes=int(os.getenv("WORKER_PROCESSES", "0")),
+        cluster=cluster,
+        state_path=os.getenv("STATE_PATH") or None,
+        subsystems=[name.strip() for name in os.getenv("SUBSYSTEMS", "").split(",") if name.strip()] or None,
+        schedule=SchedulePolicy(
+            min_factor=float(os.getenv("INTERVAL_MIN_FACTOR", "0.25")),
+            max_factor=float(os.getenv("INTERVAL_MAX_FACTOR", "8")),
+            budget=float(os.getenv("POLL_BUDGET", "0"))
+        ) if os.getenv("ADAPTIVE_INTERVALS", "false").lower() == "true" else None,
+        propagation=os.getenv("PROPAGATION_ENABLED", "true").lower() == "true",
+        verify_budget=float(os.getenv("VERIFY_BUDGET", "0")),
+        verify_interval=float(os.getenv("VERIFY_INTERVAL", "30"))
+    )
     
     try:
         asyncio.run(orchestrator.orchestrate_all_systems())
@@ -29,6 +69,10 @@ def main():
         status = orchestrator.get_full_status()
         logger.info(f"Final Status: {status}")
         sys.exit(0)
+    finally:
+        # Any exit, not just Ctrl-C: the writer thread is a daemon and dies with queued lines
+        TRACER.flush()
+        LOG_WRITER.stop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,118 @@
+"""Scheduler - Adaptive per-subsystem sync intervals under a global polling budget."""
+
+import logging
+from typing import Dict, Any, Iterable, Optional
+from dataclasses import dataclass
+
+from anomaly import DETECTOR
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SchedulePolicy:
+    min_factor: float = 0.25    # shortest interval, as a fraction of the configured one
+    max_factor: float = 8.0     # longest interval, as a multiple of the configured one
+    backoff: float = 2.0        # an idle cycle multiplies the interval by this
+    target_items: int = 50      # work per cycle the interval is steered towards
+    max_step: float = 2.0       # at most this much tighter or looser per busy cycle
+    budget: float = 0.0         # connector calls per second across all subsystems; 0 = unbounded
+
+class AdaptiveInterval:
+    """One subsystem's interval, steered by how much each cycle found to sync.
+
+    Idle cycles back off exponentially; busy ones scale the interval by
+    ``target_items / found`` so a growing backlog is polled more often.
+    """
+
+    def __init__(self, base: float, policy: SchedulePolicy):
+        self.base = base
+        self.policy = policy
+        self.min_interval = base * policy.min_factor
+        self.max_interval = base * policy.max_factor
+        self.interval = float(base)
+        self.effective = float(base)
+        self.cost = 1
+        self.last_total: Optional[int] = None
+        self.last_found = 0
+        self.idle_cycles = 0
+
+    def update(self, total: int) -> float:
+        found = total - self.last_total if self.last_total is not None else total
+        self.last_total = total
+        self.last_found = found
+        policy = self.policy
+        if found <= 0:
+            self.idle_cycles += 1
+            self.interval *= policy.backoff
+        else:
+            self.idle_cycles = 0
+            step = min(policy.max_step, max(1 / policy.max_step, policy.target_items / found))
+            self.interval *= step
+        self.interval = min(self.max_interval, max(self.min_interval, self.interval))
+        return self.interval
+
+class AdaptiveScheduler:
+    """Picks each subsystem's next sleep from its last cycle, within a shared budget.
+
+    Each subsystem costs roughly one call per connector per cycle. When the
+    intervals wanted add up to more calls per second than the budget, every
+    interval is stretched by the same factor; subsystems idling at their
+    maximum cost little, which leaves the budget to the busy ones.
+    Until ``configure`` is called, managers keep their configured interval.
+    """
+
+    def __init__(self):
+        self.policy: Optional[SchedulePolicy] = None
+        self.jobs: Dict[str, AdaptiveInterval] = {}
+
+    def configure(self, policy: Optional[SchedulePolicy]) -> None:
+        self.policy = policy
+        self.jobs.clear()
+
+    def demand(self, exclude: Optional[str] = None) -> float:
+        """Connector calls per second at the current intervals."""
+        return sum(job.cost / job.effective for name, job in self.jobs.items() if name != exclude)
+
+    def next_interval(self, name: str, check_interval: float, synced_total: int,
+                      connectors: Iterable[str] = ()) -> float:
+        """Seconds until ``name`` syncs again, given its running total of synced items.
+
+        The total counts only what the subsystem's own poll cycles found;
+        writes pushed into it by propagation or scoped syncs are not source
+        changes and must not make it poll faster.
+        """
+        if self.policy is None:
+            return check_interval
+        job = self.jobs.get(name)
+        if job is None:
+            job = self.jobs[name] = AdaptiveInterval(check_interval, self.policy)
+        connectors = list(connectors)
+        job.cost = max(1, len(connectors))
+
+        interval = job.update(synced_total)
+        if self.policy.budget > 0:
+            demand = self.demand(exclude=name) + job.cost / interval
+            if demand > self.policy.budget:
+                interval *= demand / self.policy.budget
+        # Connectors flagged anomalous are given room to recover
+        interval *= max((DETECTOR.backoff_factor(c) for c in connectors), default=1.0)
+        job.effective = min(job.max_interval, interval)
+        return job.effective
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.policy is not None,
+            "budget": self.policy.budget if self.policy else None,
+            "demand": round(self.demand(), 3),
+            "subsystems": {
+                name: {
+                    "configured": job.base,
+                    "interval": round(job.effective, 3),
+                    "last_found": job.last_found,
+                    "idle_cycles": job.idle_cycles
+                }
+                for name, job in self.jobs.items()
+            }
+        }
+
+SCHEDULER = AdaptiveScheduler()
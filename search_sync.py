@@ -4,9 +4,20 @@ import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from tracing import TRACER
+from startup import CONNECT_GATE, READINESS
+from scheduler import SCHEDULER
+from transport import BaseConnector
+from metrics import instrumented
+from log_writer import kv
+from simulation import SIMULATION
+from breakers import gather_isolated
+from verifier import digest
+
 logger = logging.getLogger(__name__)
 
 class SearchEngineType(Enum):
@@ -21,71 +32,116 @@ class SearchEngineConfig:
     endpoint: str
     api_key: str
 
-class SearchEngineConnector:
+class SearchEngineConnector(BaseConnector):
     def __init__(self, config: SearchEngineConfig):
-        self.config = config
-        self.connected = False
-        self.last_sync: Optional[datetime] = None
+        super().__init__(config)
         self.documents_indexed = 0
+        self.documents: Dict[Any, Dict[str, Any]] = {}
     
-    async def connect(self) -> bool:
-        logger.info(f"[{self.config.name}] Connecting to {self.config.engine_type.value}...")
-        await asyncio.sleep(0.1)
-        self.connected = True
-        return True
+    @property
+    def target(self) -> str:
+        return self.config.engine_type.value
+    
+    def base_url(self) -> Optional[str]:
+        return self.config.endpoint
     
+    @instrumented("index_documents")
     async def index_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        if not self.connected:
-            raise Exception("Not connected")
+        self.ensure_connected()
+        encoded = self.encode(documents)
         
-        logger.info(f"[{self.config.name}] Indexing {len(documents)} documents...")
+        logger.debug(kv("index_documents", connector=self.config.name, documents=len(documents), bytes=len(encoded.body)))
         await asyncio.sleep(0.1)
         
-        self.last_sync = datetime.utcnow()
+        self.last_sync = self.clock.utcnow()
         self.documents_indexed += len(documents)
+        for document in documents:
+            self.documents[document["id"]] = document
         
         return {
             "search_engine": self.config.name,
             "documents_indexed": len(documents),
             "total_indexed": self.documents_indexed,
-            "timestamp": self.last_sync.isoformat()
+            "wire_bytes": len(encoded.body),
+            "timestamp": self.last_sync
         }
+    
+    async def replica_keys(self) -> List[Any]:
+        return list(self.documents)
+    
+    @instrumented("read_digests")
+    async def read_digests(self, keys: List[Any]) -> Dict[Any, Optional[int]]:
+        """Checksums of the documents at keys (multi-get); None where a document is missing."""
+        self.ensure_connected()
+        await asyncio.sleep(0.01)
+        return {key: digest(self.documents[key]) if key in self.documents else None for key in keys}
+    
+    async def repair_from(self, source: "SearchEngineConnector", keys: List[Any]) -> int:
+        documents = [source.documents[key] for key in keys if key in source.documents]
+        await self.index_documents(documents)
+        return len(documents)
 
 class SearchIndexSyncManager:
-    def __init__(self):
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
         self.connectors: Dict[str, SearchEngineConnector] = {}
-        self.sync_history: List[Dict[str, Any]] = []
+        self.clock = clock
+        self.sync_history = HistoryStore(clock=clock)
+        self.polled = 0
         self.is_running = False
     
     def register_search_engine(self, config: SearchEngineConfig) -> None:
-        self.connectors[config.name] = SearchEngineConnector(config)
+        connector = self.connectors[config.name] = SearchEngineConnector(config)
+        connector.clock = self.clock
         logger.info(f"Registered search engine: {config.name}")
     
-    async def run_continuous_sync(self, check_interval: int = 25) -> None:
+    async def _index_documents(self, connectors: List[SearchEngineConnector], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results, failures = await gather_isolated({c.config.name: c.index_documents(items) for c in connectors})
+        
+        for name, error in failures.items():
+            self.sync_history.record(name, "index_documents", 0, ok=False)
+            logger.error(f"✗ {name}: {error}")
+        for result in results:
+            self.sync_history.record(result["search_engine"], "index_documents", result["documents_indexed"])
+            logger.debug(kv("synced", connector=result["search_engine"], documents=result["documents_indexed"]))
+        return results
+    
+    async def index_changes(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Index records another subsystem already fetched, in every search engine."""
+        return await self._index_documents(list(self.connectors.values()), records)
+    
+    async def sync_scope(self, source: Optional[str] = None, keys: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Sync now, limited to the named connector and to keys when given."""
+        connectors = [self.connectors[source]] if source in self.connectors else list(self.connectors.values())
+        items = [{"id": k} for k in keys] if keys else [{"id": i, "title": f"Doc {i}", "content": f"Content {i}"} for i in range(8)]
+        logger.info(f"[Scoped] Syncing {len(items)} documents into {len(connectors)} search engines")
+        return await self._index_documents(connectors, items)
+    
+    async def run_continuous_sync(self, check_interval: int = 25, initial_delay: float = 0.0) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("SEARCH INDEX SYNC MANAGER STARTED")
         logger.info("="*80 + "\n")
         
-        for connector in self.connectors.values():
-            await connector.connect()
+        await CONNECT_GATE.connect_all("search_sync", self.connectors)
         
         try:
             iteration = 0
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Cycle {iteration}] Indexing documents...")
-                
-                sample_docs = [{"id": i, "title": f"Doc {i}", "content": f"Content {i}"} for i in range(8)]
-                
-                tasks = [c.index_documents(sample_docs) for c in self.connectors.values()]
-                results = await asyncio.gather(*tasks)
+                with TRACER.span("search_sync.cycle", iteration=iteration):
+                    changed = SIMULATION.changes("search_sync", 8)
+                    sample_docs = [{"id": i, "title": f"Doc {i}", "content": f"Content {i}"} for i in range(changed)]
                 
-                for result in results:
-                    self.sync_history.append(result)
-                    logger.info(f"✓ {result['search_engine']}: {result['documents_indexed']} docs")
+                    results = await self._index_documents(list(self.connectors.values()), sample_docs)
+                    logger.info(kv("cycle", subsystem="search_sync", iteration=iteration, ok=len(results),
+                                failed=len(self.connectors) - len(results), documents=sum(r["documents_indexed"] for r in results)))
+                    self.polled += sum(r["documents_indexed"] for r in results)
                 
-                await asyncio.sleep(check_interval)
+                READINESS.synced("search_sync")
+                await asyncio.sleep(SCHEDULER.next_interval(
+                    "search_sync", check_interval, self.polled, self.connectors))
         
         except KeyboardInterrupt:
             logger.info("Search sync stopped.")
@@ -97,5 +153,5 @@ class SearchIndexSyncManager:
         return {
             "running": self.is_running,
             "search_engines": list(self.connectors.keys()),
-            "total_documents_indexed": sum(r.get("documents_indexed", 0) for r in self.sync_history)
+            "total_documents_indexed": self.sync_history.total("index_documents")
         }
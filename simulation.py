@@ -0,0 +1,333 @@
+"""Simulation - Runs the orchestrator on a virtual clock against modelled connectors."""
+
+import asyncio
+import contextlib
+import fnmatch
+import logging
+import math
+import random
+import selectors
+import time
+from typing import Dict, List, Any, Awaitable, Callable, Iterator, Optional, Tuple, Union
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from clock import Clock, SYSTEM_CLOCK
+from limits import ThrottledError
+
+logger = logging.getLogger(__name__)
+
+_wall_clock = time.perf_counter
+
+_EPOCH = datetime(1970, 1, 1)
+
+class VirtualClock(Clock):
+    """Seconds since the simulation started; only moves when the loop has nothing to run."""
+
+    def __init__(self, wall_start: float = 1_700_000_000.0):
+        self.now = 0.0
+        self.wall_start = wall_start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.wall_start + self.now
+
+    def time_ns(self) -> int:
+        return round(self.time() * 1e9)
+
+    def utcnow(self) -> datetime:
+        return _EPOCH + timedelta(seconds=self.time())
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+class VirtualSelector(selectors.DefaultSelector):
+    """Polls real descriptors without blocking, then jumps the clock to the next timer.
+
+    While executor jobs are running the clock holds still: the loop waits
+    for real until one reports back, as it would have had the job taken
+    no virtual time at all.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        super().__init__()
+        self.clock = clock
+        self.executor_jobs = 0
+
+    def select(self, timeout: Optional[float] = None) -> List[Tuple[selectors.SelectorKey, int]]:
+        ready = super().select(0)
+        if ready or timeout == 0:
+            return ready
+        if timeout is None or self.executor_jobs:
+            # Only another thread can wake the loop
+            return super().select(None)
+        self.clock.advance(timeout)
+        return []
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock: VirtualClock):
+        self.selector = VirtualSelector(clock)
+        super().__init__(self.selector)
+        self.clock = clock
+
+    def time(self) -> float:
+        return self.clock.monotonic()
+
+    def run_in_executor(self, executor: Any, func: Callable, *args: Any) -> asyncio.Future:
+        future = super().run_in_executor(executor, func, *args)
+        self.selector.executor_jobs += 1
+        future.add_done_callback(self._executor_done)
+        return future
+
+    def _executor_done(self, future: asyncio.Future) -> None:
+        self.selector.executor_jobs -= 1
+
+@contextlib.contextmanager
+def use_clock(clock: Clock) -> Iterator[None]:
+    """Run limiters, breakers, metrics, the tracer, startup readiness and the simulator on ``clock``.
+
+    The ``time`` module is left alone, so the log writer, executor threads
+    and libraries keep real time. Limiters and breakers created inside
+    keep the clock they were made with; managers, monitoring and pipelines
+    take theirs from the orchestrator.
+    """
+    from breakers import BREAKERS
+    from limits import LIMITERS
+    from metrics import REGISTRY
+    from startup import CONNECT_GATE, READINESS
+    from tracing import TRACER
+    components = (BREAKERS, LIMITERS, REGISTRY, TRACER, CONNECT_GATE, READINESS, SIMULATION)
+    saved = [component.clock for component in components]
+    for component in components:
+        component.clock = clock
+    try:
+        yield
+    finally:
+        for component, previous in zip(components, saved):
+            component.clock = previous
+
+class SimulatedFailure(ConnectionError):
+    """A connector call failed by injection."""
+
+@dataclass
+class ConnectorModel:
+    """How one connector (or a ``fnmatch`` pattern of them) behaves.
+
+    Latency is lognormal with the given median and 99th percentile, plus
+    ``per_item`` seconds per item, on top of the connector's own stand-in
+    delay. During an outage window, in virtual seconds, every call fails.
+    """
+    latency_median: float = 0.05
+    latency_p99: float = 0.5
+    per_item: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    outages: List[Tuple[float, float]] = field(default_factory=list)
+
+    def latency(self, rng: random.Random, items: int) -> float:
+        if self.latency_median <= 0:
+            return self.per_item * items
+        # The 99th percentile of a normal sits 2.326 standard deviations above the median
+        sigma = math.log(max(self.latency_p99, self.latency_median) / self.latency_median) / 2.326
+        return rng.lognormvariate(math.log(self.latency_median), sigma) + self.per_item * items
+
+ChangeRate = Union[float, Callable[[float], float]]
+
+def poisson(rng: random.Random, mean: float) -> int:
+    if mean <= 0:
+        return 0
+    if mean > 30:
+        return max(0, round(rng.gauss(mean, math.sqrt(mean))))
+    # Knuth: multiply uniforms until the product drops below e^-mean
+    limit, count, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+class Simulator:
+    """Connector behaviour and upstream change rates while a simulation runs.
+
+    Inactive, it changes nothing: ``changes`` returns the manager's own
+    batch size and connector calls are not intercepted. ``change_rates``
+    maps a subsystem to changes per virtual second (or a function of the
+    virtual time); each cycle syncs the Poisson-distributed number of
+    changes that arrived since its previous cycle.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.clock: Clock = SYSTEM_CLOCK
+        self.configure()
+
+    def configure(self, seed: int = 0, models: Optional[Dict[str, ConnectorModel]] = None,
+                  change_rates: Optional[Dict[str, ChangeRate]] = None) -> None:
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.models = models or {}
+        self.change_rates = change_rates or {}
+        self.last_draw: Dict[str, float] = {}
+        self.cycles: Dict[str, int] = {}
+        self.changes_generated: Dict[str, int] = {}
+        self.calls = 0
+        self.items = 0
+        self.failures = 0
+        self.throttles = 0
+
+    def model(self, connector: str) -> ConnectorModel:
+        model = self.models.get(connector)
+        if model is None:
+            model = next((m for pattern, m in self.models.items() if fnmatch.fnmatchcase(connector, pattern)), None)
+        return model or ConnectorModel()
+
+    def changes(self, subsystem: str, default: int) -> int:
+        """Items the subsystem's cycle found; its own default outside a simulation."""
+        if not self.active:
+            return default
+        now = self.clock.monotonic()
+        self.cycles[subsystem] = self.cycles.get(subsystem, 0) + 1
+        rate = self.change_rates.get(subsystem)
+        if rate is None:
+            return default
+        elapsed = now - self.last_draw.get(subsystem, 0.0)
+        self.last_draw[subsystem] = now
+        count = poisson(self.rng, (rate(now) if callable(rate) else rate) * elapsed)
+        self.changes_generated[subsystem] = self.changes_generated.get(subsystem, 0) + count
+        return count
+
+    async def model_call(self, connector: str, operation: str, items: int, call: Awaitable) -> Any:
+        model = self.model(connector)
+        self.calls += 1
+        self.items += items
+        try:
+            await asyncio.sleep(model.latency(self.rng, items))
+            now = self.clock.monotonic()
+            draw = self.rng.random()
+            if any(start <= now < end for start, end in model.outages) or draw < model.error_rate:
+                self.failures += 1
+                raise SimulatedFailure(f"{connector}.{operation}: injected failure")
+            if draw < model.error_rate + model.throttle_rate:
+                self.throttles += 1
+                raise ThrottledError(f"{connector}.{operation}: injected throttle")
+        except BaseException:
+            # Failed or cancelled before reaching the connector
+            call.close()
+            raise
+        return await call
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "seed": self.seed,
+            "cycles": dict(self.cycles),
+            "changes": dict(self.changes_generated),
+            "calls": self.calls,
+            "items": self.items,
+            "failures": self.failures,
+            "throttles": self.throttles
+        }
+
+SIMULATION = Simulator()
+
+def _reset_globals() -> None:
+    # Imported here: these pull in the connector stack, which imports this module
+    from anomaly import DETECTOR
+    from breakers import BREAKERS
+    from limits import LIMITERS
+    from metrics import REGISTRY
+    from payload_codec import CODECS
+    from scheduler import SCHEDULER
+    REGISTRY.reset()
+    BREAKERS.reset()
+    LIMITERS.reset()
+    DETECTOR.reset()
+    CODECS.reset()
+    SCHEDULER.configure(None)
+
+def simulate(duration: float, seed: int = 0, models: Optional[Dict[str, ConnectorModel]] = None,
+             change_rates: Optional[Dict[str, ChangeRate]] = None, **orchestrator_options: Any) -> Dict[str, Any]:
+    """Run a MegaOrchestrator for ``duration`` virtual seconds and report what happened.
+
+    ``orchestrator_options`` go to MegaOrchestrator (subsystems, schedule,
+    propagation, verify_budget, ...); process pools and clusters need real
+    time and are not supported. The same seed and options give the same
+    cycles, calls and failures. Connector registries and the scheduler are
+    reset before and after the run, and the global ``random`` state is
+    seeded for the run and restored after.
+    """
+    from mega_orchestrator import MegaOrchestrator
+    if orchestrator_options.get("worker_processes") or orchestrator_options.get("cluster"):
+        raise ValueError("Simulation runs in one process on one loop")
+
+    clock = VirtualClock()
+    loop = VirtualEventLoop(clock)
+    random_state = random.getstate()
+    random.seed(seed)
+    SIMULATION.configure(seed, models, change_rates)
+    _reset_globals()
+    started = _wall_clock()
+    try:
+        with use_clock(clock):
+            SIMULATION.active = True
+            orchestrator = MegaOrchestrator(clock=clock, **orchestrator_options)
+            status = loop.run_until_complete(_run_for(orchestrator, duration))
+            _cancel_remaining(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        SIMULATION.active = False
+        random.setstate(random_state)
+        loop.close()
+        _reset_globals()
+    wall = _wall_clock() - started
+    report = SIMULATION.report()
+    cycles = sum(report["cycles"].values())
+    report.update(
+        virtual_seconds=round(clock.now, 3),
+        wall_seconds=round(wall, 3),
+        cycles_per_second=round(cycles / wall, 1) if wall else None,
+        status=status
+    )
+    logger.info(f"[Simulation] seed {seed}: {clock.now:.0f} virtual s in {wall:.2f} wall s, "
+                f"{cycles} cycles, {report['calls']} calls, {report['failures']} injected failures")
+    return report
+
+async def _run_for(orchestrator: Any, duration: float) -> Dict[str, Any]:
+    task = asyncio.create_task(orchestrator.orchestrate_all_systems())
+    await asyncio.sleep(duration)
+    if task.done():
+        task.result()
+    status = orchestrator.get_full_status()
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    return status
+
+def _cancel_remaining(loop: asyncio.AbstractEventLoop) -> None:
+    tasks = asyncio.all_tasks(loop)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+if __name__ == "__main__":
+    import argparse
+    from scheduler import SchedulePolicy
+    # Connectors report to the importable module's SIMULATION, not to this __main__ copy
+    from simulation import ConnectorModel, simulate
+
+    parser = argparse.ArgumentParser(description="Compare fixed and adaptive sync intervals on a virtual clock")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    models = {"*": ConnectorModel(latency_median=0.08, latency_p99=1.5, per_item=0.0005, error_rate=args.error_rate)}
+    rates = {"database_sync": 0.5, "storage_sync": 0.05, "cache_sync": 2.0, "message_sync": 1.0,
+             "search_sync": 0.2, "cloud_sync": 0.01, "ml_sync": 0.005, "graphql_sync": 0.002}
+    for label, schedule in (("fixed", None), ("adaptive", SchedulePolicy())):
+        result = simulate(args.hours * 3600, seed=args.seed, models=models, change_rates=rates, schedule=schedule)
+        print(f"{label:9} cycles {sum(result['cycles'].values()):>6}  calls {result['calls']:>6}  "
+              f"items {result['items']:>8}  failures {result['failures']:>4}  "
+              f"wall {result['wall_seconds']:.2f}s ({result['cycles_per_second']} cycles/s)")
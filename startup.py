@@ -0,0 +1,163 @@
+"""Startup - Concurrent connector connection with retries, and a readiness timeline."""
+
+import asyncio
+import logging
+import random
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
+
+from clock import Clock, SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ConnectPolicy:
+    concurrency: int = 16       # connect() calls in flight across all managers
+    timeout: float = 10.0       # per attempt
+    attempts: int = 3
+    backoff: float = 0.5        # first retry delay, doubled per attempt
+    max_backoff: float = 8.0
+    reconnect_backoff: float = 60.0     # ceiling for background reconnect delays
+
+class ReadinessTimeline:
+    """When each subsystem finished connecting and completed its first sync, relative to start."""
+
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
+        self.clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        self.started_at = self.clock.monotonic()
+        self.subsystems: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, subsystem: str) -> Dict[str, Any]:
+        entry = self.subsystems.get(subsystem)
+        if entry is None:
+            entry = self.subsystems[subsystem] = {
+                "connected_at": None, "connect_seconds": None, "connected": 0, "failed": [], "first_sync_at": None
+            }
+        return entry
+
+    def connected(self, subsystem: str, seconds: float, connected: int, failed: List[str]) -> None:
+        entry = self._entry(subsystem)
+        entry.update(connected_at=round(self.clock.monotonic() - self.started_at, 3),
+                     connect_seconds=round(seconds, 3), connected=connected, failed=failed)
+
+    def synced(self, subsystem: str) -> None:
+        entry = self._entry(subsystem)
+        if entry["first_sync_at"] is None:
+            entry["first_sync_at"] = round(self.clock.monotonic() - self.started_at, 3)
+            logger.info(f"[Readiness] {subsystem} first sync after {entry['first_sync_at']}s")
+
+    def get_status(self) -> Dict[str, Any]:
+        first_syncs = [e["first_sync_at"] for e in self.subsystems.values()]
+        return {
+            "uptime": round(self.clock.monotonic() - self.started_at, 3),
+            "ready": bool(first_syncs) and None not in first_syncs,
+            "time_to_ready": max(first_syncs) if first_syncs and None not in first_syncs else None,
+            "subsystems": {name: dict(entry) for name, entry in self.subsystems.items()}
+        }
+
+class ConnectGate:
+    """Connects a manager's connectors concurrently under one global limit.
+
+    Each attempt is bounded by the policy timeout; failed attempts are
+    retried with jittered exponential backoff. Startup then costs about the
+    slowest connector instead of the sum of all of them. A connector that
+    still fails does not hold its manager back: it is taken out of the
+    manager's map, so cycles run without it, and reconnected in the
+    background until it is back.
+    """
+
+    def __init__(self, policy: Optional[ConnectPolicy] = None, readiness: Optional[ReadinessTimeline] = None,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.policy = policy or ConnectPolicy()
+        self.clock = clock
+        self.readiness = readiness
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.attempts = 0
+        self.retries = 0
+        self._reconnecting: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def _limit(self) -> asyncio.Semaphore:
+        # Semaphores bind to the loop they are first used on; rebuild per loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.policy.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def connect(self, name: str, connector: Any) -> None:
+        policy = self.policy
+        delay = policy.backoff
+        for attempt in range(1, policy.attempts + 1):
+            self.attempts += 1
+            try:
+                async with self._limit():
+                    await asyncio.wait_for(connector.connect(), policy.timeout)
+                return
+            except Exception as e:
+                if attempt == policy.attempts:
+                    logger.error(f"Connect to {name} failed after {attempt} attempts: {e!r}")
+                    raise
+                self.retries += 1
+                wait = delay * random.uniform(0.5, 1.0)
+                logger.warning(f"Connect to {name} failed (attempt {attempt}/{policy.attempts}): {e!r}; "
+                               f"retrying in {wait:.2f}s")
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, policy.max_backoff)
+
+    async def connect_all(self, subsystem: str, connectors: Dict[str, Any]) -> List[str]:
+        """Connect the manager's ``connectors`` map in place; returns the names left out of it."""
+        started = self.clock.monotonic()
+        pending = dict(connectors)
+        results = await asyncio.gather(*(self.connect(name, c) for name, c in pending.items()),
+                                       return_exceptions=True)
+        failed = [name for name, result in zip(pending, results) if isinstance(result, BaseException)]
+        if self.readiness is not None:
+            self.readiness.connected(subsystem, self.clock.monotonic() - started, len(pending) - len(failed), failed)
+        if failed:
+            logger.error(f"{subsystem}: continuing without {', '.join(failed)}; reconnecting in the background")
+        for name in failed:
+            connectors.pop(name, None)
+            key = (subsystem, name)
+            if key not in self._reconnecting:
+                task = asyncio.create_task(self._reconnect(subsystem, name, pending[name], connectors))
+                self._reconnecting[key] = task
+                task.add_done_callback(lambda _, key=key: self._reconnecting.pop(key, None))
+        return failed
+
+    async def _reconnect(self, subsystem: str, name: str, connector: Any, connectors: Dict[str, Any]) -> None:
+        policy = self.policy
+        delay = policy.backoff
+        while True:
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, policy.reconnect_backoff)
+            self.attempts += 1
+            try:
+                async with self._limit():
+                    await asyncio.wait_for(connector.connect(), policy.timeout)
+            except Exception as e:
+                logger.debug(f"Reconnect to {name} failed: {e!r}")
+                continue
+            connectors[name] = connector
+            logger.info(f"Reconnected to {name}; {subsystem} syncs it again")
+            return
+
+    def stop(self) -> None:
+        for task in self._reconnecting.values():
+            task.cancel()
+        self._reconnecting.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.policy.concurrency,
+            "timeout": self.policy.timeout,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "reconnecting": sorted(f"{subsystem}/{name}" for subsystem, name in self._reconnecting)
+        }
+
+READINESS = ReadinessTimeline()
+CONNECT_GATE = ConnectGate(readiness=READINESS)
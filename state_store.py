@@ -0,0 +1,287 @@
+"""State Store - Append-only checkpoints of resumable manager state."""
+
+import logging
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+from history_store import HistoryStore
+
+logger = logging.getLogger(__name__)
+
+# Tagged binary encoding: one type byte, then a varint, fixed 8-byte double or length-prefixed body
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _DICT, _DATETIME = range(10)
+_DOUBLE = struct.Struct("<d")
+_FRAME = struct.Struct("<II")   # payload length, crc32
+
+# Connectors keep naive UTC datetimes
+_EPOCH = datetime(1970, 1, 1)
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+def _encode(value: Any, out: bytearray) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True or value is False:
+        out.append(_TRUE if value else _FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        _write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))  # zigzag
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        raw = value.encode("utf-8")
+        out.append(_STR)
+        _write_varint(out, len(raw))
+        out += raw
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(_BYTES)
+        _write_varint(out, len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    elif isinstance(value, datetime) and value.tzinfo is None:
+        # Naive UTC, as microseconds since the epoch
+        delta = value - _EPOCH
+        micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+        out.append(_DATETIME)
+        _write_varint(out, (micros << 1) if micros >= 0 else ((-micros << 1) - 1))
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__}")
+
+def _decode(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _NONE:
+        return None, pos
+    if tag in (_FALSE, _TRUE):
+        return tag == _TRUE, pos
+    if tag == _INT:
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+    if tag in (_STR, _BYTES):
+        size, pos = _read_varint(data, pos)
+        raw = bytes(data[pos:pos + size])
+        return (raw.decode("utf-8") if tag == _STR else raw), pos + size
+    if tag == _LIST:
+        size, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(size):
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == _DICT:
+        size, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(size):
+            key, pos = _decode(data, pos)
+            result[key], pos = _decode(data, pos)
+        return result, pos
+    if tag == _DATETIME:
+        n, pos = _read_varint(data, pos)
+        micros = (n >> 1) if not n & 1 else -((n + 1) >> 1)
+        return _EPOCH + timedelta(microseconds=micros), pos
+    raise ValueError(f"unknown type tag {tag}")
+
+def encode(value: Any) -> bytes:
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+def decode(data: bytes) -> Any:
+    value, pos = _decode(data, 0)
+    if pos != len(data):
+        raise ValueError(f"{len(data) - pos} trailing bytes")
+    return value
+
+class StateStore:
+    """Latest state per key, kept as an append-only log of CRC-checked frames.
+
+    Every ``put`` appends one frame; ``load`` replays the log and keeps the
+    last frame per key, truncating a torn tail left by a crash. Once the log
+    holds ``compact_ratio`` times more frames than live keys it is rewritten
+    with one frame per key and atomically swapped in.
+    """
+
+    def __init__(self, path: str, compact_ratio: int = 8, min_compact_frames: int = 64, fsync: bool = True):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.min_compact_frames = min_compact_frames
+        self.fsync = fsync
+        self.state: Dict[str, Any] = {}
+        self.frames = 0
+        self.compactions = 0
+        self.truncated_bytes = 0
+        self._file = None
+
+    def load(self) -> Dict[str, Any]:
+        self.state.clear()
+        self.frames = 0
+        good = 0
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        while good + _FRAME.size <= len(data):
+            size, crc = _FRAME.unpack_from(data, good)
+            start, end = good + _FRAME.size, good + _FRAME.size + size
+            payload = data[start:end]
+            if end > len(data) or zlib.crc32(payload) != crc:
+                break
+            key, state = decode(payload)
+            self.state[key] = state
+            self.frames += 1
+            good = end
+        if good < len(data):
+            self.truncated_bytes = len(data) - good
+            logger.warning(f"State log {self.path}: dropping {self.truncated_bytes} bytes of torn tail")
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+        return self.state
+
+    def _append(self, f, key: str, state: Any) -> None:
+        payload = encode([key, state])
+        f.write(_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+
+    def put(self, key: str, state: Any) -> None:
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._append(self._file, key, state)
+        self.state[key] = state
+        self.frames += 1
+
+    def commit(self) -> None:
+        """Make appended frames durable, compacting when the log has grown enough."""
+        if self._file is not None:
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        if self.frames >= max(self.min_compact_frames, self.compact_ratio * len(self.state)):
+            self.compact()
+
+    def compact(self) -> None:
+        tmp = f"{self.path}.compact"
+        with open(tmp, "wb") as f:
+            for key, state in self.state.items():
+                self._append(f, key, state)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(tmp, self.path)
+        self.frames = len(self.state)
+        self.compactions += 1
+
+    def discard(self, key: str) -> None:
+        """Forget a key; the log is rewritten without it."""
+        if self.state.pop(key, None) is not None:
+            self.compact()
+
+    def close(self) -> None:
+        self.commit()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        return {
+            "path": self.path,
+            "keys": len(self.state),
+            "frames": self.frames,
+            "bytes": size,
+            "compactions": self.compactions,
+            "truncated_bytes": self.truncated_bytes
+        }
+
+def _connectors(manager: Any) -> Dict[str, Any]:
+    return getattr(manager, "providers", None) or getattr(manager, "connectors", None) or {}
+
+def capture_manager(manager: Any) -> Dict[str, Any]:
+    """A manager's resumable state: connector counters and last_sync, history totals,
+    and whatever the manager's own ``checkpoint`` returns."""
+    connectors = {}
+    for name, connector in _connectors(manager).items():
+        counters = {k: v for k, v in vars(connector).items() if type(v) is int}
+        last_sync = (connector.last_sync - _EPOCH).total_seconds() if connector.last_sync else None
+        connectors[name] = {"last_sync": last_sync, "counters": counters}
+    history = getattr(manager, "sync_history", None)
+    return {
+        "connectors": connectors,
+        "history": history.checkpoint() if isinstance(history, HistoryStore) else None,
+        "manager": manager.checkpoint() if hasattr(manager, "checkpoint") else None
+    }
+
+def restore_manager(manager: Any, state: Dict[str, Any]) -> Optional[float]:
+    """Apply captured state to matching connectors; returns the latest restored sync time."""
+    latest = None
+    for name, saved in state.get("connectors", {}).items():
+        connector = _connectors(manager).get(name)
+        if connector is None:
+            continue
+        for attr, value in saved["counters"].items():
+            if type(getattr(connector, attr, None)) is int:
+                setattr(connector, attr, value)
+        if saved["last_sync"] is not None:
+            connector.last_sync = _EPOCH + timedelta(seconds=saved["last_sync"])
+            latest = max(latest or 0.0, saved["last_sync"])
+    history = getattr(manager, "sync_history", None)
+    if state.get("history") and isinstance(history, HistoryStore) and not len(history):
+        history.restore(state["history"])
+    if state.get("manager") and hasattr(manager, "restore"):
+        manager.restore(state["manager"])
+    return latest
+
+def staggered_delays(last_syncs: Dict[str, Optional[float]], intervals: Dict[str, float],
+                     step: float = 1.0, now: Optional[float] = None) -> Dict[str, float]:
+    """First-cycle delay per job: wait until its saved next-due time, spacing overdue jobs ``step`` apart."""
+    now = time.time() if now is None else now
+    delays = {}
+    overdue: List[Tuple[float, str]] = []
+    for name, interval in intervals.items():
+        last = last_syncs.get(name)
+        if last is None:
+            continue
+        due = last + interval
+        if due > now:
+            delays[name] = min(due - now, interval)
+        else:
+            overdue.append((due, name))
+    for i, (_, name) in enumerate(sorted(overdue)):
+        delays[name] = i * step
+    return delays
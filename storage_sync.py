@@ -4,9 +4,20 @@ import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from tracing import TRACER
+from startup import CONNECT_GATE, READINESS
+from scheduler import SCHEDULER
+from transport import BaseConnector
+from metrics import instrumented, file_bytes
+from log_writer import kv
+from simulation import SIMULATION
+from breakers import gather_isolated
+from verifier import digest
+
 logger = logging.getLogger(__name__)
 
 class StorageType(Enum):
@@ -23,71 +34,102 @@ class StorageConfig:
     bucket: str
     credentials: Dict[str, str]
 
-class StorageConnector:
+class StorageConnector(BaseConnector):
     def __init__(self, config: StorageConfig):
-        self.config = config
-        self.connected = False
-        self.last_sync: Optional[datetime] = None
+        super().__init__(config)
         self.sync_count = 0
+        self.objects: Dict[str, Dict[str, Any]] = {}
     
-    async def connect(self) -> bool:
-        logger.info(f"[{self.config.name}] Connecting to {self.config.storage_type.value}...")
-        await asyncio.sleep(0.1)
-        self.connected = True
-        return True
+    @property
+    def target(self) -> str:
+        return self.config.storage_type.value
     
+    def base_url(self) -> Optional[str]:
+        return self.config.endpoint
+    
+    @instrumented("sync_files", bytes_of=file_bytes)
     async def sync_files(self, source_files: List[Dict[str, Any]]) -> Dict[str, Any]:
-        if not self.connected:
-            raise Exception("Not connected")
+        self.ensure_connected()
+        encoded = self.encode(source_files)
         
-        logger.info(f"[{self.config.name}] Syncing {len(source_files)} files...")
+        logger.debug(kv("sync_files", connector=self.config.name, files=len(source_files), bytes=len(encoded.body)))
         await asyncio.sleep(0.1)
         
-        self.last_sync = datetime.utcnow()
+        self.last_sync = self.clock.utcnow()
         self.sync_count += len(source_files)
+        for f in source_files:
+            self.objects[f.get("name") or f.get("path")] = f
         
         return {
             "storage": self.config.name,
             "files_synced": len(source_files),
             "total_synced": self.sync_count,
-            "timestamp": self.last_sync.isoformat()
+            "wire_bytes": len(encoded.body),
+            "timestamp": self.last_sync
         }
+    
+    async def replica_keys(self) -> List[str]:
+        return list(self.objects)
+    
+    @instrumented("read_digests")
+    async def read_digests(self, keys: List[str]) -> Dict[str, Optional[int]]:
+        """Checksums of the objects at keys (HEAD requests); None where an object is missing."""
+        self.ensure_connected()
+        await asyncio.sleep(0.01)
+        return {key: digest(self.objects[key]) if key in self.objects else None for key in keys}
+    
+    async def repair_from(self, source: "StorageConnector", keys: List[str]) -> int:
+        files = [source.objects[key] for key in keys if key in source.objects]
+        await self.sync_files(files)
+        return len(files)
 
 class StorageSyncManager:
-    def __init__(self):
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
         self.connectors: Dict[str, StorageConnector] = {}
-        self.sync_history: List[Dict[str, Any]] = []
+        self.clock = clock
+        self.sync_history = HistoryStore(clock=clock)
+        self.polled = 0
         self.is_running = False
     
     def register_storage(self, config: StorageConfig) -> None:
-        self.connectors[config.name] = StorageConnector(config)
+        connector = self.connectors[config.name] = StorageConnector(config)
+        connector.clock = self.clock
         logger.info(f"Registered storage: {config.name}")
     
-    async def run_continuous_sync(self, check_interval: int = 30) -> None:
+    async def run_continuous_sync(self, check_interval: int = 30, initial_delay: float = 0.0) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("STORAGE SYNC MANAGER STARTED")
         logger.info("="*80 + "\n")
         
-        for connector in self.connectors.values():
-            await connector.connect()
+        await CONNECT_GATE.connect_all("storage_sync", self.connectors)
         
         try:
             iteration = 0
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Cycle {iteration}] Syncing storage...")
-                
-                sample_files = [{"name": f"file_{i}.bin", "size": 1024 * (i+1)} for i in range(3)]
+                with TRACER.span("storage_sync.cycle", iteration=iteration):
+                    changed = SIMULATION.changes("storage_sync", 3)
+                    sample_files = [{"name": f"file_{i}.bin", "size": 1024 * (i+1)} for i in range(changed)]
                 
-                tasks = [c.sync_files(sample_files) for c in self.connectors.values()]
-                results = await asyncio.gather(*tasks)
+                    results, failures = await gather_isolated(
+                        {name: c.sync_files(sample_files) for name, c in self.connectors.items()})
                 
-                for result in results:
-                    self.sync_history.append(result)
-                    logger.info(f"✓ {result['storage']}: {result['files_synced']} files")
+                    for name, error in failures.items():
+                        self.sync_history.record(name, "sync_files", 0, ok=False)
+                        logger.error(f"✗ {name}: {error}")
+                    for result in results:
+                        self.sync_history.record(result["storage"], "sync_files", result["files_synced"])
+                        logger.debug(kv("synced", connector=result["storage"], files=result["files_synced"]))
+                    logger.info(kv("cycle", subsystem="storage_sync", iteration=iteration, ok=len(results), failed=len(failures),
+                                files=sum(r["files_synced"] for r in results)))
+                    self.polled += sum(r["files_synced"] for r in results)
                 
-                await asyncio.sleep(check_interval)
+                READINESS.synced("storage_sync")
+                await asyncio.sleep(SCHEDULER.next_interval(
+                    "storage_sync", check_interval, self.polled, self.connectors))
         
         except KeyboardInterrupt:
             logger.info("Storage sync stopped.")
@@ -99,5 +141,5 @@ class StorageSyncManager:
         return {
             "running": self.is_running,
             "storage_providers": list(self.connectors.keys()),
-            "total_files_synced": sum(r.get("files_synced", 0) for r in self.sync_history)
+            "total_files_synced": self.sync_history.total("sync_files")
         }
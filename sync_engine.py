@@ -4,9 +4,19 @@ import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 
+from clock import Clock, SYSTEM_CLOCK
+from history_store import HistoryStore
+from tracing import TRACER
+from startup import CONNECT_GATE, READINESS
+from scheduler import SCHEDULER
+from transport import BaseConnector
+from metrics import instrumented, file_bytes
+from log_writer import kv
+from simulation import SIMULATION
+from breakers import gather_isolated
+
 logger = logging.getLogger(__name__)
 
 class CloudProvider(Enum):
@@ -25,54 +35,76 @@ class SyncConfig:
     endpoint: str
     credentials_key: str
 
-class CloudConnector:
+class CloudConnector(BaseConnector):
     """Base cloud connector."""
     
     def __init__(self, config: SyncConfig):
-        self.config = config
-        self.connected = False
-        self.last_sync: Optional[datetime] = None
+        super().__init__(config)
         self.deployments = 0
     
-    async def connect(self) -> bool:
-        """Connect to cloud provider."""
-        logger.info(f"[{self.config.name}] Connecting to {self.config.provider.value}...")
-        await asyncio.sleep(0.1)
-        self.connected = True
-        return True
+    @property
+    def target(self) -> str:
+        return self.config.provider.value
     
+    def base_url(self) -> Optional[str]:
+        return self.config.endpoint
+    
+    @instrumented("deploy", bytes_of=file_bytes)
     async def deploy(self, files: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Deploy files to cloud."""
-        if not self.connected:
-            raise Exception("Not connected")
+        self.ensure_connected()
+        encoded = self.encode(files)
         
-        logger.info(f"[{self.config.name}] Deploying {len(files)} files...")
+        logger.debug(kv("deploy", connector=self.config.name, files=len(files), bytes=len(encoded.body)))
         await asyncio.sleep(0.1)
         
-        self.last_sync = datetime.utcnow()
+        self.last_sync = self.clock.utcnow()
         self.deployments += len(files)
         
         return {
             "provider": self.config.name,
             "files_deployed": len(files),
             "total_deployments": self.deployments,
-            "timestamp": self.last_sync.isoformat()
+            "wire_bytes": len(encoded.body),
+            "timestamp": self.last_sync
         }
 
 class AutonomousSyncEngine:
     """Autonomous sync engine for cloud providers."""
     
-    def __init__(self):
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
         self.providers: Dict[str, CloudConnector] = {}
-        self.sync_history: List[Dict[str, Any]] = []
+        self.clock = clock
+        self.sync_history = HistoryStore(clock=clock)
+        self.polled = 0
         self.is_running = False
     
     def register_provider(self, config: SyncConfig) -> None:
         """Register cloud provider."""
-        self.providers[config.name] = CloudConnector(config)
+        connector = self.providers[config.name] = CloudConnector(config)
+        connector.clock = self.clock
         logger.info(f"Registered provider: {config.name}")
     
-    async def run_continuous_sync(self, check_interval: int = 60) -> None:
+    async def _deploy(self, connectors: List[CloudConnector], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deploy items to the given connectors and record the results."""
+        results, failures = await gather_isolated({c.config.name: c.deploy(items) for c in connectors})
+        
+        for name, error in failures.items():
+            self.sync_history.record(name, "deploy", 0, ok=False)
+            logger.error(f"✗ {name}: {error}")
+        for result in results:
+            self.sync_history.record(result["provider"], "deploy", result["files_deployed"])
+            logger.debug(kv("synced", connector=result["provider"], files=result["files_deployed"]))
+        return results
+    
+    async def sync_scope(self, source: Optional[str] = None, keys: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Sync now, limited to the named connector and to keys when given."""
+        connectors = [self.providers[source]] if source in self.providers else list(self.providers.values())
+        items = [{"name": str(k)} for k in keys] if keys else [{"name": f"file_{i}.bin", "size": 1024} for i in range(3)]
+        logger.info(f"[Scoped] Syncing {len(items)} files to {len(connectors)} clouds")
+        return await self._deploy(connectors, items)
+    
+    async def run_continuous_sync(self, check_interval: int = 60, initial_delay: float = 0.0) -> None:
         """Run continuous cloud sync."""
         self.is_running = True
         logger.info("\n" + "="*80)
@@ -80,25 +112,26 @@ class AutonomousSyncEngine:
         logger.info(f"Providers: {list(self.providers.keys())}")
         logger.info("="*80 + "\n")
         
-        for connector in self.providers.values():
-            await connector.connect()
+        await CONNECT_GATE.connect_all("cloud_sync", self.providers)
         
         try:
             iteration = 0
+            if initial_delay > 0:
+                await asyncio.sleep(initial_delay)
             while self.is_running:
                 iteration += 1
-                logger.info(f"[Cycle {iteration}] Deploying to {len(self.providers)} clouds...")
-                
-                sample_files = [{"name": f"file_{i}.bin", "size": 1024} for i in range(3)]
-                
-                tasks = [c.deploy(sample_files) for c in self.providers.values()]
-                results = await asyncio.gather(*tasks)
+                with TRACER.span("cloud_sync.cycle", iteration=iteration):
+                    changed = SIMULATION.changes("cloud_sync", 3)
+                    sample_files = [{"name": f"file_{i}.bin", "size": 1024} for i in range(changed)]
                 
-                for result in results:
-                    self.sync_history.append(result)
-                    logger.info(f"✓ {result['provider']}: {result['files_deployed']} files")
+                    results = await self._deploy(list(self.providers.values()), sample_files)
+                    logger.info(kv("cycle", subsystem="sync_engine", iteration=iteration, ok=len(results),
+                                failed=len(self.providers) - len(results), files=sum(r["files_deployed"] for r in results)))
+                    self.polled += sum(r["files_deployed"] for r in results)
                 
-                await asyncio.sleep(check_interval)
+                READINESS.synced("cloud_sync")
+                await asyncio.sleep(SCHEDULER.next_interval(
+                    "cloud_sync", check_interval, self.polled, self.providers))
         
         except KeyboardInterrupt:
             logger.info("Cloud sync stopped.")
@@ -110,5 +143,5 @@ class AutonomousSyncEngine:
         return {
             "running": self.is_running,
             "providers": list(self.providers.keys()),
-            "total_syncs": len(self.sync_history)
+            "total_syncs": self.sync_history.total_records
         }
@@ -0,0 +1,61 @@
+"""Tests for streaming anomaly detection."""
+
+import pytest
+
+from anomaly import AnomalyDetector, AnomalyConfig, Ewma
+from monitoring import MonitoringSystem, HealthStatus
+from storage_sync import StorageSyncManager, StorageConfig, StorageType
+
+
+def test_ewma_tracks_mean_and_variance():
+    stats = Ewma(alpha=0.5)
+    for value in (10, 10, 10, 10):
+        stats.update(value)
+    assert stats.mean == 10 and stats.var == 0
+    stats.update(20)
+    assert stats.mean == 15
+    assert stats.zscore(15) == 0
+
+
+def test_latency_spike_flags_with_hysteresis():
+    detector = AnomalyDetector(AnomalyConfig(clear_after=2))
+    for i in range(10):
+        detector.observe("S3", "sync_files", 0.1 + 0.001 * (i % 2), items=3)
+    assert not detector.is_anomalous("S3")
+
+    detector.observe("S3", "sync_files", 1.0, items=3)
+    assert detector.is_anomalous("S3")
+    assert detector.backoff_factor("S3") == 2.0
+
+    detector.observe("S3", "sync_files", 0.1, items=3)
+    assert detector.is_anomalous("S3")
+    detector.observe("S3", "sync_files", 0.1, items=3)
+    assert not detector.is_anomalous("S3")
+    assert detector.backoff_factor("S3") == 1.0
+
+
+def test_throughput_collapse_and_rebaseline():
+    detector = AnomalyDetector(AnomalyConfig(rebaseline_after=3))
+    for i in range(10):
+        detector.observe("Kafka", "sync_messages", 0.1, items=100 + i % 3)
+    detector.observe("Kafka", "sync_messages", 0.1, items=2)
+    assert detector.anomalous_connectors() == ["Kafka"]
+    assert "throughput_collapse" in detector.get_status()["Kafka.sync_messages"]["reasons"]
+
+    for _ in range(2):
+        detector.observe("Kafka", "sync_messages", 0.1, items=2)
+    assert detector.get_status()["Kafka.sync_messages"]["items_mean"] == pytest.approx(2)
+
+
+@pytest.mark.asyncio
+async def test_anomaly_degrades_component_health():
+    detector = AnomalyDetector()
+    mon = MonitoringSystem(detector=detector)
+    mgr = StorageSyncManager()
+    mgr.register_storage(StorageConfig("S3", StorageType.S3, "s3", "bucket", {}))
+    mon.register_component("storage_sync", mgr, interval=30)
+
+    for _ in range(10):
+        detector.observe("S3", "sync_files", 0.1, items=3)
+    detector.observe("S3", "sync_files", 2.0, items=3)
+    assert await mon.check_component_health("storage_sync") == HealthStatus.DEGRADED
@@ -0,0 +1,62 @@
+"""Tests for the FastAPI application routes."""
+
+import hashlib
+import hmac
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+from webhook_sync import WebhookManager
+
+
+def _client(monkeypatch, queue_size=100):
+    monkeypatch.setattr(main, "webhook_manager", WebhookManager(queue_size=queue_size))
+    return TestClient(main.app)
+
+
+def test_health():
+    client = TestClient(main.app)
+    assert client.get("/health").json()["status"] == "healthy"
+
+
+def test_metrics_endpoint():
+    main.REGISTRY.observe("AWS", "deploy", 0.01, items=3)
+    response = TestClient(main.app).get("/metrics")
+    assert response.status_code == 200
+    assert 'connector_operation_seconds_count{connector="AWS",operation="deploy"}' in response.text
+
+
+def test_webhook_ingest_accepts_signed_event(monkeypatch):
+    monkeypatch.setenv("WEBHOOK_SECRET", "s3cret")
+    client = _client(monkeypatch)
+    body = json.dumps({"event_type": "deployment", "source": "ci", "data": {"sha": "abc"}}).encode()
+    signature = "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+
+    response = client.post("/webhooks/events", content=body, headers={"X-Signature-256": signature})
+    assert response.status_code == 202
+    assert main.webhook_manager.events_accepted == 1
+
+    response = client.post("/webhooks/events", content=body, headers={"X-Signature-256": "sha256=bad"})
+    assert response.status_code == 401
+
+
+def test_webhook_ingest_fails_closed_without_secret(monkeypatch):
+    monkeypatch.delenv("WEBHOOK_SECRET", raising=False)
+    monkeypatch.delenv("WEBHOOK_ALLOW_UNSIGNED", raising=False)
+    client = _client(monkeypatch)
+
+    response = client.post("/webhooks/events", json={"event_type": "data_sync", "source": "db"})
+    assert response.status_code == 503
+    assert main.webhook_manager.events_accepted == 0
+
+
+def test_webhook_ingest_validation_and_overflow(monkeypatch):
+    monkeypatch.delenv("WEBHOOK_SECRET", raising=False)
+    monkeypatch.setenv("WEBHOOK_ALLOW_UNSIGNED", "true")
+    client = _client(monkeypatch, queue_size=1)
+
+    assert client.post("/webhooks/events", json={"event_type": "nope", "source": "x"}).status_code == 400
+    payload = {"event_type": "data_sync", "source": "db"}
+    assert client.post("/webhooks/events", json=payload).status_code == 202
+    assert client.post("/webhooks/events", json=payload).status_code == 429
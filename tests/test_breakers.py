@@ -0,0 +1,119 @@
+"""Tests for per-connector circuit breakers and failure-isolated fan-out."""
+
+import asyncio
+import time
+
+import pytest
+
+from breakers import (
+    BreakerPolicy, BreakerState, CircuitBreaker, CircuitOpenError, BREAKERS, gather_isolated
+)
+from limits import ThrottledError
+from ml_pipeline_sync import MLPipelineSyncManager, MLPlatformConfig, MLPlatformType
+
+
+def fail(breaker: CircuitBreaker, error: Exception = None) -> None:
+    with pytest.raises(Exception):
+        with breaker.guard():
+            raise error or OSError("connection reset")
+
+
+def succeed(breaker: CircuitBreaker) -> None:
+    with breaker.guard():
+        pass
+
+
+def test_trips_on_error_rate_and_fails_fast():
+    breaker = CircuitBreaker("api", BreakerPolicy(min_calls=4, error_rate=0.5, base_backoff=10))
+    succeed(breaker)
+    succeed(breaker)
+    fail(breaker)
+    assert breaker.state is BreakerState.CLOSED
+    fail(breaker)
+
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.trips == 1
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.check()
+    assert 9 < exc.value.retry_in <= 10
+    assert breaker.rejected == 1
+
+
+def test_trips_on_slow_calls():
+    breaker = CircuitBreaker("slow", BreakerPolicy(min_calls=3, slow_call=0.01, slow_rate=0.6))
+    for _ in range(3):
+        with breaker.guard():
+            time.sleep(0.02)
+    assert breaker.state is BreakerState.OPEN
+
+
+def test_throttling_does_not_trip():
+    breaker = CircuitBreaker("throttled", BreakerPolicy(min_calls=2))
+    for _ in range(5):
+        fail(breaker, ThrottledError(retry_after=1))
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.get_status()["window_calls"] == 0
+
+
+def test_half_open_admits_one_probe_then_closes():
+    breaker = CircuitBreaker("probe", BreakerPolicy(min_calls=1, base_backoff=0.01))
+    fail(breaker)
+    assert breaker.state is BreakerState.OPEN
+    time.sleep(0.02)
+
+    with breaker.guard():
+        assert breaker.state is BreakerState.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            with breaker.guard():
+                pass
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.backoff == 0.0
+
+
+def test_failed_probe_reopens_with_decorrelated_backoff():
+    policy = BreakerPolicy(min_calls=1, base_backoff=0.01, max_backoff=0.05)
+    breaker = CircuitBreaker("flapping", policy)
+    fail(breaker)
+    backoffs = [breaker.backoff]
+    for _ in range(6):
+        time.sleep(breaker.retry_in() + 0.001)
+        fail(breaker)
+        assert breaker.state is BreakerState.OPEN
+        backoffs.append(breaker.backoff)
+
+    assert backoffs[0] == pytest.approx(0.01)
+    assert all(policy.base_backoff <= b <= policy.max_backoff for b in backoffs)
+    assert breaker.trips == 7
+
+
+@pytest.mark.asyncio
+async def test_gather_isolated_keeps_siblings_running():
+    async def ok(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    async def broken():
+        raise OSError("down")
+
+    results, failures = await gather_isolated({"a": ok(1), "b": broken(), "c": ok(3)})
+    assert results == [1, 3]
+    assert list(failures) == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_dead_connector_fails_fast_without_stopping_the_cycle():
+    manager = MLPipelineSyncManager()
+    for name in ("BreakerLive", "BreakerDead"):
+        manager.register_platform(MLPlatformConfig(name, MLPlatformType.MLFLOW, "https://ml.local", {}))
+    await manager.connectors["BreakerLive"].connect()
+
+    for _ in range(BREAKERS.policy.min_calls):
+        results = await manager._sync_models(list(manager.connectors.values()), [{"name": "m"}])
+        assert [r["ml_platform"] for r in results] == ["BreakerLive"]
+    assert BREAKERS.get("BreakerDead").state is BreakerState.OPEN
+
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        await manager.connectors["BreakerDead"].sync_models([{"name": "m"}])
+    assert time.monotonic() - started < 0.01
+    assert manager.sync_history.total_errors == BREAKERS.policy.min_calls
@@ -0,0 +1,191 @@
+"""Tests for range-partitioned bulk loads of new sync targets."""
+
+from collections import deque
+
+import pytest
+
+from bulk_load import BulkLoad, split_ranges
+from verifier import digest
+from database_sync import (ChangeLogTruncated, DatabaseSyncManager, DatabaseConfig, DatabaseConnector,
+                           DatabaseType, SyncDirection)
+from state_store import StateStore, capture_manager, restore_manager
+
+
+async def connected(name: str, db_type: DatabaseType, rows: int = 0) -> DatabaseConnector:
+    connector = DatabaseConnector(DatabaseConfig(name, db_type, f"{db_type.value}://localhost", estimated_rows=rows))
+    await connector.connect()
+    return connector
+
+
+def test_split_ranges_covers_key_space_evenly():
+    ranges = split_ranges(0, 10, 3)
+    assert [(r.start, r.end) for r in ranges] == [(0, 4), (4, 7), (7, 10)]
+    assert [(r.start, r.end) for r in split_ranges(0, 2, 8)] == [(0, 1), (1, 2)]
+    assert [(r.start, r.end) for r in split_ranges(5, 5, 4)] == [(5, 5)]
+
+
+@pytest.mark.asyncio
+async def test_copies_every_range_from_the_snapshot_watermark():
+    source = await connected("BulkPG", DatabaseType.POSTGRESQL, rows=10_000)
+    target = await connected("BulkMongo", DatabaseType.MONGODB)
+    await source.sync_data([{"id": 1}, {"id": 2}])
+
+    load = BulkLoad(source, target, ranges=8, workers=4, batch_size=500)
+    watermark = await load.run()
+
+    assert watermark == 2
+    assert target.rows_ingested == 10_000
+    status = load.get_status()
+    assert status["ranges_done"] == status["ranges_total"] == 8
+    assert status["rows_copied"] == 10_000
+    assert status["finished"] is True
+
+
+@pytest.mark.asyncio
+async def test_interrupted_load_resumes_at_range_level(tmp_path):
+    path = str(tmp_path / "state.log")
+    source = await connected("ResumePG", DatabaseType.POSTGRESQL, rows=4_000)
+    target = await connected("ResumeDynamo", DatabaseType.DYNAMODB)
+
+    calls = 0
+    original = target.bulk_ingest
+
+    async def flaky(records):
+        nonlocal calls
+        calls += 1
+        if calls == 6:
+            raise OSError("connection reset")
+        return await original(records)
+
+    target.bulk_ingest = flaky
+    first = BulkLoad(source, target, ranges=4, workers=1, batch_size=500, state=StateStore(path, fsync=False))
+    with pytest.raises(OSError):
+        await first.run()
+    assert first.get_status()["ranges_done"] == 2
+
+    source.log_position = 99    # writes landed meanwhile; the resumed load keeps the original watermark
+    store = StateStore(path, fsync=False)
+    store.load()
+    second = BulkLoad(source, target, ranges=4, workers=2, batch_size=500, state=store)
+    assert await second.run() == 0
+    assert second.resumed is True
+    assert second.copied == 4_000
+    # Two ranges were redone at most: the completed ones were skipped
+    assert target.rows_ingested == 2_000 + 500 + 2_000
+    assert second.key not in store.state
+
+
+@pytest.mark.asyncio
+async def test_new_pair_joins_incremental_sync_after_bulk_load():
+    manager = DatabaseSyncManager()
+    manager.register_database(DatabaseConfig("PairPG", DatabaseType.POSTGRESQL, "pg://", estimated_rows=2_000))
+    manager.register_database(DatabaseConfig("PairMongo", DatabaseType.MONGODB, "mongo://"))
+    for connector in manager.connectors.values():
+        await connector.connect()
+
+    manager.add_sync_pair("PairPG", "PairMongo", SyncDirection.SOURCE_TO_TARGET, bulk_load=True)
+    assert manager.sync_pairs == []
+    await manager._bootstrap_pending()
+
+    assert manager.sync_pairs == [("PairPG", "PairMongo", SyncDirection.SOURCE_TO_TARGET)]
+    assert manager.watermarks == {"PairPG->PairMongo": 0}
+    assert manager.sync_history.total("bulk_load") == 2_000
+    assert manager.get_status()["bulk_loads"]["PairPG->PairMongo"]["finished"] is True
+
+
+@pytest.mark.asyncio
+async def test_changes_after_the_snapshot_are_replayed_before_incremental_sync():
+    manager = DatabaseSyncManager()
+    manager.register_database(DatabaseConfig("ReplayPG", DatabaseType.POSTGRESQL, "pg://", estimated_rows=20_000))
+    manager.register_database(DatabaseConfig("ReplayMongo", DatabaseType.MONGODB, "mongo://"))
+    for connector in manager.connectors.values():
+        await connector.connect()
+    source, target = manager.connectors["ReplayPG"], manager.connectors["ReplayMongo"]
+    await source.sync_data([{"id": 1, "data": "before"}])
+
+    original = target.bulk_ingest
+    written = []
+
+    async def ingest(records):
+        # Written while the ranges are still copying, after the snapshot was taken
+        if not written:
+            written.append(True)
+            await source.sync_data([{"id": 7, "data": "after"}, {"id": 20_001, "data": "new"}])
+        return await original(records)
+
+    target.bulk_ingest = ingest
+    position = await manager.bootstrap_pair("ReplayPG", "ReplayMongo", SyncDirection.SOURCE_TO_TARGET, batch_size=500)
+
+    assert manager.bulk_loads["ReplayPG->ReplayMongo"].watermark == 1
+    assert position == 3
+    assert manager.watermarks == {"ReplayPG->ReplayMongo": 3}
+    assert target.rows[7] == digest({"id": 7, "data": "after"})
+    assert target.rows[20_001] == digest({"id": 20_001, "data": "new"})
+    assert manager.sync_history.total("replay") == 2
+
+    await manager._sync_pairs(manager.sync_pairs, [{"id": 8, "data": "incremental"}])
+    assert manager.watermarks == {"ReplayPG->ReplayMongo": 4}
+    assert target.rows[8] == digest({"id": 8, "data": "incremental"})
+
+
+async def bootstrapped(prefix: str) -> DatabaseSyncManager:
+    manager = DatabaseSyncManager()
+    manager.register_database(DatabaseConfig(f"{prefix}PG", DatabaseType.POSTGRESQL, "pg://", estimated_rows=1_000))
+    manager.register_database(DatabaseConfig(f"{prefix}Mongo", DatabaseType.MONGODB, "mongo://"))
+    for connector in manager.connectors.values():
+        await connector.connect()
+    manager.add_sync_pair(f"{prefix}PG", f"{prefix}Mongo", SyncDirection.SOURCE_TO_TARGET, bulk_load=True)
+    await manager._bootstrap_pending()
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_read_changes_starts_at_the_watermark_offset():
+    source = await connected("OffsetPG", DatabaseType.POSTGRESQL)
+    source.change_log = deque(maxlen=4)
+    await source.sync_data([{"id": i} for i in range(6)])
+
+    assert await source.read_changes(2, limit=2) == ([{"id": 2}, {"id": 3}], 4)
+    assert await source.read_changes(4) == ([{"id": 4}, {"id": 5}], 6)
+    assert await source.read_changes(6) == ([], 6)
+    with pytest.raises(ChangeLogTruncated):
+        await source.read_changes(1)
+
+
+@pytest.mark.asyncio
+async def test_pair_behind_the_change_log_is_bulk_loaded_again():
+    manager = await bootstrapped("Gap")
+    source, target = manager.connectors["GapPG"], manager.connectors["GapMongo"]
+    source.change_log = deque(maxlen=4)
+    await source.sync_data([{"id": i, "data": "lost"} for i in range(10)])
+
+    await manager._sync_pairs(manager.sync_pairs, [{"id": 1}])
+    assert manager.sync_pairs == [] and "GapPG->GapMongo" not in manager.watermarks
+    assert manager.pending_pairs == [("GapPG", "GapMongo", SyncDirection.SOURCE_TO_TARGET)]
+
+    await manager._bootstrap_pending()
+    assert manager.watermarks == {"GapPG->GapMongo": 11}
+    assert target.rows_ingested == 2_000
+
+
+@pytest.mark.asyncio
+async def test_watermarks_and_bulk_pairs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "state.log")
+    manager = await bootstrapped("Restart")
+    await manager._sync_pairs(manager.sync_pairs, [{"id": 1}, {"id": 2}])
+    manager.add_sync_pair("RestartPG", "RestartES", SyncDirection.SOURCE_TO_TARGET, bulk_load=True)
+    store = StateStore(path, fsync=False)
+    store.put("database_sync", capture_manager(manager))
+    store.close()
+
+    # The restarted process configures its pairs again before restoring
+    restarted = DatabaseSyncManager()
+    restarted.register_database(DatabaseConfig("RestartPG", DatabaseType.POSTGRESQL, "pg://"))
+    restarted.register_database(DatabaseConfig("RestartMongo", DatabaseType.MONGODB, "mongo://"))
+    restarted.add_sync_pair("RestartPG", "RestartMongo", SyncDirection.SOURCE_TO_TARGET, bulk_load=True)
+    store = StateStore(path, fsync=False)
+    restore_manager(restarted, store.load()["database_sync"])
+
+    assert restarted.sync_pairs == [("RestartPG", "RestartMongo", SyncDirection.SOURCE_TO_TARGET)]
+    assert restarted.watermarks == {"RestartPG->RestartMongo": 2}
+    assert restarted.pending_pairs == [("RestartPG", "RestartES", SyncDirection.SOURCE_TO_TARGET)]
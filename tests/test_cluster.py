@@ -0,0 +1,129 @@
+"""Tests for lease-based connector partitioning across orchestrator nodes."""
+
+import time
+
+import pytest
+
+from cluster import ClusterMember, SQLiteCoordinator, StaleLeaseError, rendezvous_owner
+from storage_sync import StorageSyncManager, StorageConfig, StorageType
+from database_sync import DatabaseSyncManager, DatabaseConfig, DatabaseType, SyncDirection
+
+
+def storage_manager(count: int = 12) -> StorageSyncManager:
+    manager = StorageSyncManager()
+    for i in range(count):
+        manager.register_storage(StorageConfig(f"bucket-{i}", StorageType.S3, "s3.com", f"bucket-{i}", {}))
+    return manager
+
+
+def test_rendezvous_moves_only_the_joining_nodes_share():
+    partitions = [f"storage_sync/bucket-{i}" for i in range(200)]
+    before = {p: rendezvous_owner(p, ["a", "b"]) for p in partitions}
+    after = {p: rendezvous_owner(p, ["a", "b", "c"]) for p in partitions}
+
+    moved = [p for p in partitions if before[p] != after[p]]
+    assert moved and all(after[p] == "c" for p in moved)
+    assert 40 < len(moved) < 100
+
+
+def test_leases_are_exclusive_and_fenced(tmp_path):
+    backend = SQLiteCoordinator(str(tmp_path / "cluster.db"))
+    assert backend.acquire("a", ["p"], ttl=0.05) == {"p": 1}
+    assert backend.acquire("b", ["p"], ttl=10) == {}
+    assert backend.acquire("a", ["p"], ttl=0.05) == {"p": 1}
+
+    time.sleep(0.1)
+    assert backend.acquire("b", ["p"], ttl=10) == {"p": 2}
+    assert not backend.validate("p", 1)
+    assert backend.validate("p", 2)
+
+    backend.release("b", ["p"])
+    assert backend.leases() == {}
+
+
+@pytest.mark.asyncio
+async def test_nodes_split_connectors_without_overlap(tmp_path):
+    path = str(tmp_path / "cluster.db")
+    a = ClusterMember("node-a", SQLiteCoordinator(path))
+    b = ClusterMember("node-b", SQLiteCoordinator(path))
+    manager_a, manager_b = storage_manager(), storage_manager()
+    a.register_manager("storage_sync", manager_a)
+    b.register_manager("storage_sync", manager_b)
+    assert manager_a.connectors == {}
+
+    await a.rebalance()
+    assert len(manager_a.connectors) == 12
+    assert all(c.connected for c in manager_a.connectors.values())
+
+    # b joins but must wait until a hands its share over
+    await b.rebalance()
+    assert manager_b.connectors == {}
+    await a.rebalance()
+    await b.rebalance()
+
+    owned_a, owned_b = set(manager_a.connectors), set(manager_b.connectors)
+    assert owned_a and owned_b
+    assert owned_a.isdisjoint(owned_b)
+    assert owned_a | owned_b == {f"bucket-{i}" for i in range(12)}
+    assert all([await b.check_fence(f"storage_sync/{name}") for name in owned_b])
+
+    b.backend.leave("node-b")
+    await a.rebalance()
+    assert len(manager_a.connectors) == 12
+
+
+@pytest.mark.asyncio
+async def test_database_pairs_are_partitioned(tmp_path):
+    manager = DatabaseSyncManager()
+    for name in ("Primary", "Backup", "Mongo"):
+        manager.register_database(DatabaseConfig(name, DatabaseType.POSTGRESQL, "postgresql://localhost"))
+    manager.add_sync_pair("Primary", "Backup", SyncDirection.BIDIRECTIONAL)
+    manager.add_sync_pair("Primary", "Mongo", SyncDirection.SOURCE_TO_TARGET)
+
+    member = ClusterMember("solo", SQLiteCoordinator(str(tmp_path / "cluster.db")))
+    member.register_manager("database_sync", manager)
+    assert set(member.partitions) == {"database_sync/Primary->Backup", "database_sync/Primary->Mongo"}
+    assert manager.sync_pairs == []
+
+    await member.rebalance()
+    assert len(manager.sync_pairs) == 2
+    assert set(manager.connectors) == {"Primary", "Backup", "Mongo"}
+
+
+@pytest.mark.asyncio
+async def test_writes_under_a_superseded_token_are_rejected(tmp_path):
+    path = str(tmp_path / "cluster.db")
+    member = ClusterMember("node-a", SQLiteCoordinator(path), lease_ttl=10)
+    manager = storage_manager(1)
+    member.register_manager("storage_sync", manager)
+    await member.rebalance()
+    connector = manager.connectors["bucket-0"]
+    assert (await connector.sync_files([{"name": "a.bin", "size": 1}]))["files_synced"] == 1
+
+    # Another node takes the partition over while this one still believes it holds the lease
+    other = SQLiteCoordinator(path)
+    other.release("node-a", ["storage_sync/bucket-0"])
+    assert other.acquire("node-b", ["storage_sync/bucket-0"], ttl=10) == {"storage_sync/bucket-0": 2}
+
+    with pytest.raises(StaleLeaseError):
+        await connector.sync_files([{"name": "a.bin", "size": 1}])
+    assert not await member.check_fence("storage_sync/bucket-0")
+
+
+@pytest.mark.asyncio
+async def test_database_pair_writes_are_fenced(tmp_path):
+    path = str(tmp_path / "cluster.db")
+    manager = DatabaseSyncManager()
+    for name in ("Primary", "Backup"):
+        manager.register_database(DatabaseConfig(name, DatabaseType.POSTGRESQL, "postgresql://localhost"))
+    manager.add_sync_pair("Primary", "Backup", SyncDirection.SOURCE_TO_TARGET)
+    member = ClusterMember("node-a", SQLiteCoordinator(path), lease_ttl=10)
+    member.register_manager("database_sync", manager)
+    await member.rebalance()
+    assert len(await manager.sync_scope()) == 1
+
+    other = SQLiteCoordinator(path)
+    other.release("node-a", ["database_sync/Primary->Backup"])
+    other.acquire("node-b", ["database_sync/Primary->Backup"], ttl=10)
+    assert await manager.sync_scope() == []
+    assert manager.sync_history.recent(limit=1)[0].ok is False
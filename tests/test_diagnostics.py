@@ -0,0 +1,50 @@
+"""Tests for event-loop diagnostics."""
+
+import asyncio
+import time
+
+import pytest
+
+from diagnostics import Diagnostics
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_lag_probe_and_stall_capture():
+    diag = Diagnostics(lag_interval=0.02, slow_threshold=0.05)
+    task = asyncio.create_task(diag.run())
+    await asyncio.sleep(0.1)
+    busy_wait(0.2)
+    await asyncio.sleep(0.1)
+    diag.stop()
+    await task
+
+    status = diag.get_status()
+    assert status["loop_lag"]["count"] >= 3
+    assert status["loop_lag"]["max_ms"] >= 100
+    assert len(diag.slow_callbacks) == 1
+    assert any("busy_wait" in frame for frame in diag.slow_callbacks[0].stack)
+
+
+@pytest.mark.asyncio
+async def test_profiler_emits_collapsed_stacks():
+    diag = Diagnostics(sample_hz=200)
+
+    async def hog():
+        await asyncio.sleep(0.01)
+        busy_wait(0.15)
+
+    hog_task = asyncio.create_task(hog())
+    collapsed = await diag.profile(0.3)
+    await hog_task
+
+    lines = collapsed.strip().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+    assert "busy_wait" in collapsed
@@ -0,0 +1,74 @@
+"""Tests for routing webhook events to scoped syncs."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from database_sync import DatabaseSyncManager, DatabaseConfig, DatabaseType, SyncDirection
+from event_router import SyncRouter
+from webhook_sync import WebhookManager, WebhookEvent, EventType
+
+
+@pytest.mark.asyncio
+async def test_data_sync_event_triggers_scoped_database_sync():
+    mgr = DatabaseSyncManager()
+    for name in ("pg", "mongo", "dynamo"):
+        mgr.register_database(DatabaseConfig(name, DatabaseType.POSTGRESQL, f"{name}://localhost"))
+    mgr.add_sync_pair("pg", "mongo", SyncDirection.SOURCE_TO_TARGET)
+    mgr.add_sync_pair("dynamo", "mongo", SyncDirection.SOURCE_TO_TARGET)
+    for connector in mgr.connectors.values():
+        await connector.connect()
+
+    webhooks = WebhookManager()
+    router = SyncRouter(min_interval=0)
+    router.add_route(EventType.DATA_SYNC, "database_sync", mgr.sync_scope)
+    router.attach(webhooks)
+
+    await webhooks.emit_event(WebhookEvent(EventType.DATA_SYNC, "pg", datetime.utcnow(), {"keys": [1, 2, 3]}))
+    await router.drain()
+
+    assert [r.source for r in mgr.sync_history] == ["pg->mongo"]
+    assert mgr.sync_history.total("sync_data") == 3
+
+
+@pytest.mark.asyncio
+async def test_router_rate_limits_and_merges_requests():
+    calls = []
+
+    async def sync(source, keys):
+        calls.append((source, keys))
+
+    webhooks = WebhookManager()
+    router = SyncRouter(min_interval=0.1)
+    router.add_route(EventType.INDEX_UPDATE, "search_sync", sync)
+    router.attach(webhooks)
+
+    for key in range(5):
+        await webhooks.emit_event(WebhookEvent(EventType.INDEX_UPDATE, "ES", datetime.utcnow(), {"keys": [key]}))
+        await asyncio.sleep(0)
+    await router.drain()
+
+    assert calls[0] == ("ES", [0])
+    assert calls[1] == ("ES", [1, 2, 3, 4])
+    assert router.get_status()["requests_merged"] == 3
+
+
+@pytest.mark.asyncio
+async def test_router_prunes_finished_slots():
+    async def sync(source, keys):
+        pass
+
+    router = SyncRouter(min_interval=0.05)
+    router.add_route(EventType.DATA_SYNC, "database_sync", sync)
+    route = router.routes[EventType.DATA_SYNC][0]
+    for i in range(20):
+        router.request(route, f"src{i}", [i])
+    await router.drain()
+    assert router._workers == {}
+    assert len(router._last_run) == 20
+
+    await asyncio.sleep(0.06)
+    router.request(route, "late", None)
+    await router.drain()
+    assert list(router._last_run) == [("database_sync", "late")]
@@ -0,0 +1,68 @@
+"""Tests for the bounded history store."""
+
+from history_store import HistoryStore
+
+
+def test_ring_buffer_is_bounded_with_running_totals():
+    store = HistoryStore(capacity=5)
+    for i in range(12):
+        store.record(f"src{i % 2}", "sync_files", count=3, ok=i != 4)
+
+    assert len(store) == 5
+    assert [r.seq for r in store] == [7, 8, 9, 10, 11]
+    assert store.total_records == 12
+    assert store.total_errors == 1
+    assert store.total("sync_files") == 36
+    assert store.total(source="src0") == 18
+
+
+def test_recent_uses_indexes():
+    store = HistoryStore(capacity=100)
+    for i in range(30):
+        store.record("Kafka" if i % 3 == 0 else "SQS", "ok" if i % 2 else "err")
+
+    kafka = store.recent(limit=4, source="Kafka")
+    assert [r.seq for r in kafka] == [27, 24, 21, 18]
+    assert all(r.kind == "ok" for r in store.recent(limit=50, source="Kafka", kind="ok"))
+    assert len(store.recent(limit=100, kind="err")) == 15
+
+
+def test_evicted_records_spill_to_segments(tmp_path):
+    store = HistoryStore(capacity=4, spill_dir=str(tmp_path), segment_records=3, max_segments=2)
+    for i in range(20):
+        store.record("S3", "sync_files", payload={"i": i})
+    store.flush()
+
+    segments = sorted(tmp_path.iterdir())
+    assert len(segments) == 2
+    last = HistoryStore.read_segment(str(segments[-1]))
+    assert last[-1].seq == 15
+    assert last[-1].payload == {"i": 15}
+
+
+def test_index_entries_leave_with_their_last_record_and_keys_are_capped():
+    store = HistoryStore(capacity=4, max_keys=3)
+    for i in range(10):
+        store.record(f"hook{i}", "webhook", count=2)
+
+    assert sorted(store._by_source) == ["hook6", "hook7", "hook8", "hook9"]
+    assert list(store._by_kind) == ["webhook"]
+    assert len(store._count_by_source) == 4
+    assert store.total(source="hook0") == 2
+    assert store.total(source="(other)") == 14
+    assert store.total() == 20
+
+
+def test_total_filters_on_kind_and_source_together():
+    store = HistoryStore(capacity=10)
+    store.record("Kafka", "sync_messages", count=5)
+    store.record("SQS", "sync_messages", count=7)
+    store.record("Kafka", "ack", count=1)
+
+    assert store.total(kind="sync_messages", source="Kafka") == 5
+    assert store.total(kind="sync_messages") == 12
+    assert store.total(kind="ack", source="SQS") == 0
+
+    restored = HistoryStore()
+    restored.restore(store.checkpoint())
+    assert restored.total(kind="sync_messages", source="SQS") == 7
@@ -0,0 +1,126 @@
+"""Tests for per-endpoint token buckets and adaptive concurrency limits."""
+
+import asyncio
+import time
+
+import pytest
+
+from limits import (
+    AdaptiveLimit, EndpointLimiter, LimiterRegistry, ThrottledError, TokenBucket,
+    LIMITERS, parse_rate_limits, throttle_signal
+)
+from storage_sync import StorageConnector, StorageConfig, StorageType
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_calls_after_burst():
+    bucket = TokenBucket(rate=50, burst=5)
+    started = time.monotonic()
+    for _ in range(15):
+        await bucket.acquire()
+    elapsed = time.monotonic() - started
+
+    # 5 from the burst, the other 10 at 50/s
+    assert 0.18 <= elapsed < 0.4
+    assert bucket.waited > 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_the_bucket():
+    limiter = EndpointLimiter("Algolia", AdaptiveLimit(initial=4), TokenBucket(rate=1000, burst=10))
+    with pytest.raises(ThrottledError):
+        async with limiter.slot():
+            raise ThrottledError(retry_after=0.15)
+    assert limiter.concurrency.limit == 2
+    assert limiter.concurrency.throttles == 1
+
+    started = time.monotonic()
+    async with limiter.slot():
+        pass
+    assert time.monotonic() - started >= 0.14
+
+
+def test_throttle_signal_reads_http_429():
+    class Response:
+        status_code = 429
+        headers = {"Retry-After": "3"}
+
+    class HTTPError(Exception):
+        response = Response()
+
+    assert throttle_signal(HTTPError()) == (True, 3.0)
+    assert throttle_signal(ValueError()) == (False, None)
+
+
+def test_aimd_grows_on_fast_calls_and_backs_off_when_queueing():
+    limit = AdaptiveLimit(initial=4, max_limit=16)
+    for _ in range(40):
+        limit.in_flight += 1
+        limit.release(0.01)
+    grown = limit.limit
+    assert grown > 8
+
+    limit.in_flight += 1
+    limit.release(0.05)  # 5x the floor: the endpoint is queueing
+    assert limit.limit == pytest.approx(grown * 0.9)
+
+    for _ in range(100):
+        limit.in_flight += 1
+        limit.release(0.001)
+    assert limit.limit == 16
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_holds_under_gather():
+    limiter = EndpointLimiter("Vercel", AdaptiveLimit(initial=3, max_limit=3))
+    in_flight = peak = 0
+
+    async def call():
+        nonlocal in_flight, peak
+        async with limiter.slot():
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(call() for _ in range(20)))
+    assert peak == 3
+    assert limiter.calls == 20
+    assert limiter.get_status()["in_flight"] == 0
+    assert limiter.get_status()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_passes_its_slot_on():
+    limit = AdaptiveLimit(initial=1)
+    await limit.acquire()
+    first = asyncio.create_task(limit.acquire())
+    second = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    limit.release(0.01)
+    first.cancel()
+    await asyncio.wait_for(second, 1)
+    assert limit.in_flight == 1
+
+
+def test_registry_applies_configured_rates():
+    registry = LimiterRegistry()
+    for name, (rate, burst) in parse_rate_limits("Algolia=10:20, Vercel=2").items():
+        registry.set_rate(name, rate, burst)
+
+    assert registry.get("Algolia").bucket.burst == 20
+    assert registry.get("Vercel").bucket.rate == 2
+    assert registry.get("Redis").bucket is None
+    assert registry.get_status()["Algolia"]["rate"] == 10
+
+
+@pytest.mark.asyncio
+async def test_connector_calls_go_through_their_limiter():
+    connector = StorageConnector(StorageConfig("LimitedS3", StorageType.S3, "s3", "bucket", {}))
+    await connector.connect()
+    await asyncio.gather(*(connector.sync_files([{"name": "a", "size": 1}]) for _ in range(3)))
+
+    status = LIMITERS.get_status()["LimitedS3"]
+    assert status["calls"] == 3
+    assert status["in_flight"] == 0
+    assert status["latency_floor_ms"] >= 100
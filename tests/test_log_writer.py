@@ -0,0 +1,85 @@
+"""Tests for queued, rate-limited structured logging."""
+
+import io
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import textwrap
+
+from log_writer import DeferredQueueHandler, LogWriter, RateLimitFilter, kv
+
+
+class Counted:
+    renders = 0
+
+    def __str__(self) -> str:
+        Counted.renders += 1
+        return "counted"
+
+
+def record(msg, level: int = logging.INFO, lineno: int = 10) -> logging.LogRecord:
+    return logging.LogRecord("test", level, "site.py", lineno, msg, None, None)
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    log_queue: queue.Queue = queue.Queue(2)
+    handler = DeferredQueueHandler(log_queue)
+    for _ in range(5):
+        handler.handle(record(kv("synced", value=Counted())))
+    assert Counted.renders == 0
+    assert log_queue.qsize() == 2 and handler.dropped == 3
+    assert str(log_queue.get_nowait().msg) == "synced value=counted"
+
+
+def test_rate_limit_is_per_call_site_and_reports_suppressed():
+    limit = RateLimitFilter(rate=1.0, burst=3)
+    passed = [limit.filter(record("item")) for _ in range(10)]
+    assert passed.count(True) == 3
+    assert limit.filter(record("other site", lineno=20))
+    assert limit.filter(record("failure", level=logging.ERROR))
+
+    limit.sites[("site.py", 10)][1] -= 5.0
+    resumed = record("item")
+    assert limit.filter(resumed)
+    assert resumed.suppressed == 7 and limit.suppressed == 7
+
+
+def test_writer_emits_json_lines_and_restores_handlers():
+    root = logging.getLogger()
+    before = list(root.handlers)
+    level = root.level
+    stream = io.StringIO()
+    writer = LogWriter()
+    writer.configure(json_lines=True, rate=0, stream=stream)
+    try:
+        logging.getLogger("cache_sync").info(kv("cycle", subsystem="cache_sync", ok=3, failed=0))
+        logging.getLogger("cache_sync").info("plain %s", "line")
+        logging.getLogger("cache_sync").debug(kv("synced", connector="Redis"))
+    finally:
+        writer.stop()
+        root.setLevel(level)
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[0]["event"] == "cycle" and lines[0]["ok"] == 3 and lines[0]["logger"] == "cache_sync"
+    assert lines[1]["message"] == "plain line"
+    assert len(lines) == 2
+    assert root.handlers == before
+    status = writer.get_status()
+    assert status["written"] == 2 and status["dropped"] == 0 and not status["enabled"]
+
+
+def test_queued_lines_are_written_when_the_process_exits_without_stop():
+    script = textwrap.dedent("""
+        import logging, sys
+        from log_writer import LOG_WRITER
+        LOG_WRITER.configure(rate=0, stream=sys.stdout)
+        for i in range(2000):
+            logging.getLogger("exit").info("line %d", i)
+        sys.exit(0)
+    """)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    done = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, timeout=30)
+    assert done.returncode == 0
+    assert done.stdout.count(" - exit - INFO - line ") == 2000
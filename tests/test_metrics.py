@@ -0,0 +1,65 @@
+"""Tests for connector latency histograms and Prometheus export."""
+
+import pytest
+
+from metrics import LatencyHistogram, MetricsRegistry, REGISTRY
+from storage_sync import StorageConnector, StorageConfig, StorageType
+
+
+def test_histogram_percentiles_are_within_bucket_error():
+    hist = LatencyHistogram()
+    for ms in range(1, 1001):
+        hist.record(ms / 1000)
+
+    assert hist.count == 1000
+    assert hist.percentile(50) == pytest.approx(0.5, rel=1 / 16)
+    assert hist.percentile(99) == pytest.approx(0.99, rel=1 / 16)
+    assert hist.percentile(100) == pytest.approx(1.0)
+    assert hist.cumulative(-1) == 499
+
+
+def test_registry_merge_keeps_exact_percentiles():
+    a, b = MetricsRegistry(), MetricsRegistry()
+    for ms in range(1, 501):
+        a.observe("S3", "sync_files", ms / 1000, items=1)
+    for ms in range(501, 1001):
+        b.observe("S3", "sync_files", ms / 1000, items=1, error=ms == 1000)
+
+    merged = MetricsRegistry()
+    merged.merge(a.operations)
+    merged.merge(b.operations)
+    metrics = merged.get("S3", "sync_files")
+    assert metrics.latency.count == 1000
+    assert metrics.items == 1000
+    assert metrics.errors == 1
+    assert metrics.latency.percentile(50) == pytest.approx(0.5, rel=1 / 16)
+    assert metrics.latency.max == pytest.approx(1.0)
+
+
+def test_prometheus_rendering():
+    registry = MetricsRegistry()
+    registry.observe("S3", "sync_files", 0.002, items=3, nbytes=6144)
+    registry.observe("S3", "sync_files", 0.3, error=True)
+    text = registry.render_prometheus()
+
+    assert '# TYPE connector_operation_seconds histogram' in text
+    assert 'connector_operation_seconds_bucket{connector="S3",operation="sync_files",le="+Inf"} 2' in text
+    assert 'connector_operation_seconds_bucket{connector="S3",operation="sync_files",le="0.00390625"} 1' in text
+    assert 'connector_items_total{connector="S3",operation="sync_files"} 3' in text
+    assert 'connector_bytes_total{connector="S3",operation="sync_files"} 6144' in text
+    assert 'connector_errors_total{connector="S3",operation="sync_files"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_connector_calls_are_instrumented():
+    connector = StorageConnector(StorageConfig("MetricsS3", StorageType.S3, "s3", "bucket", {}))
+    with pytest.raises(Exception):
+        await connector.sync_files([])
+    await connector.connect()
+    await connector.sync_files([{"name": "a", "size": 10}, {"name": "b", "size": 20}])
+
+    metrics = REGISTRY.get("MetricsS3", "sync_files")
+    assert metrics.latency.count == 2
+    assert metrics.errors == 1
+    assert metrics.items == 2
+    assert metrics.bytes == 30
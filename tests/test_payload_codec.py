@@ -0,0 +1,121 @@
+"""Tests for payload codecs and adaptive compression."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+import payload_codec
+from payload_codec import (
+    AdaptiveCompression, CodecRegistry, EndpointCodec, BINARY, CANDIDATES, JSON, RECORDS,
+    benchmark, decode, encode_json, record_fields
+)
+from graphql_sync import GraphQLConnector, GraphQLEndpointConfig
+from message_sync import MessageQueueConfig, MessageQueueConnector, MessageQueueType
+
+
+def batch(n: int = 500):
+    return [{"id": i, "data": f"record_{i}", "version": i % 7, "updated": datetime(2024, 1, 1, 12, 0, i % 60)}
+            for i in range(n)]
+
+
+def test_record_batches_go_columnar_and_round_trip():
+    codec = EndpointCodec("pg", compression=AdaptiveCompression(min_size=1 << 30))
+    records = batch()
+    encoded = codec.encode(records)
+    assert encoded.content_type == RECORDS
+    assert decode(encoded.body, encoded.content_type, encoded.content_encoding) == records
+    assert len(encoded.body) < len(encode_json(records)) / 2
+
+
+def test_binary_and_json_fallbacks():
+    codec = EndpointCodec("api")
+    assert codec.serialize({"a": [1, 2.5, None]})[0] == BINARY
+    assert record_fields([{"a": 1}, {"b": 2}]) is None
+    # Types the tagged encoding cannot carry go out as JSON
+    content_type, body = codec.serialize({"at": datetime(2024, 1, 1, tzinfo=timezone.utc)})
+    assert content_type == JSON
+    assert decode(body, content_type) == {"at": "2024-01-01T00:00:00+00:00"}
+    assert EndpointCodec("gql", wire_format="json").serialize({"a": 1})[0] == JSON
+
+
+@pytest.mark.parametrize("orjson", [True, False])
+def test_bytes_round_trip_through_json(monkeypatch, orjson):
+    if orjson and not payload_codec.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(payload_codec, "ORJSON_AVAILABLE", orjson)
+    value = {"blob": b"\x00\xff\xe9raw", "rows": [{"key": b"k1"}], "name": "plain"}
+    body = EndpointCodec("gql", wire_format="json").serialize(value)[1]
+    assert decode(body, JSON) == value
+    # Plain strings under the marker key stay what they were
+    assert decode(encode_json({"$bytes": 1, "x": 2}), JSON) == {"$bytes": 1, "x": 2}
+
+
+def test_small_payloads_are_not_compressed():
+    compression = AdaptiveCompression(min_size=1024)
+    assert compression.compress(b"x" * 100) == ("identity", b"x" * 100)
+    assert compression.payloads == 0
+
+
+def test_compression_follows_link_speed():
+    data = encode_json(batch(2000))
+    slow = AdaptiveCompression(link_bps=100_000, probe_every=1)
+    fast = AdaptiveCompression(link_bps=1e9, probe_every=1)
+    name, body = slow.compress(data)
+    assert name != "identity" and len(body) < len(data) / 4
+    assert fast.compress(data)[0] == "identity"
+
+    # Measured transfers move the estimate, and with it the choice
+    for _ in range(30):
+        fast.observe_link(len(data), len(data) / 100_000)
+    assert fast.link_bps < 200_000
+    assert fast.compress(data)[0] != "identity"
+
+
+def test_probes_compress_a_bounded_prefix_with_http_content_codings(monkeypatch):
+    assert {name for name, _ in CANDIDATES} <= {"identity", "deflate", "br", "zstd"}
+    sizes = []
+    for name, (compress, decompress) in list(payload_codec.COMPRESSORS.items()):
+        monkeypatch.setitem(payload_codec.COMPRESSORS, name, (
+            lambda data, level, compress=compress: sizes.append(len(data)) or compress(data, level), decompress))
+    data = encode_json(batch(5000))
+    compression = AdaptiveCompression(link_bps=100_000, probe_size=4096)
+    name, body = compression.compress(data)
+    # Every candidate saw the prefix; only the winner saw the whole payload
+    assert sizes == [4096] * len(CANDIDATES) + [len(data)]
+    assert name != "identity" and len(body) < len(data) / 4
+
+
+def test_compressed_payload_round_trips_and_sets_headers():
+    codec = EndpointCodec("slow", compression=AdaptiveCompression(link_bps=50_000))
+    records = batch()
+    encoded = codec.encode(records)
+    assert encoded.headers["Content-Type"] == RECORDS
+    assert encoded.headers["Content-Encoding"] == encoded.content_encoding != "identity"
+    assert decode(encoded.body, encoded.content_type, encoded.content_encoding) == records
+    status = codec.get_status()
+    assert status["payloads"] == 1 and status["wire_bytes"] < status["raw_bytes"]
+
+
+@pytest.mark.asyncio
+async def test_connectors_encode_through_their_endpoint_codec():
+    queue = MessageQueueConnector(MessageQueueConfig("CodecQueue", MessageQueueType.KAFKA, ["kafka:9092"]))
+    graphql = GraphQLConnector(GraphQLEndpointConfig("CodecGraphQL", "https://gql.example.com", "token"))
+    await queue.connect()
+    await graphql.connect()
+    result = await queue.sync_messages([{"id": i, "body": "x" * 40} for i in range(50)])
+    assert result["wire_bytes"] > 0
+    # Results carry the datetime itself; the wire encodings render it
+    assert isinstance(result["timestamp"], datetime)
+    await graphql.sync_schema({"types": ["Query"]})
+    assert queue.codec.get_status()["formats"] == {RECORDS: 1}
+    assert graphql.codec.get_status()["formats"] == {JSON: 1}
+
+
+def test_registry_and_benchmark():
+    registry = CodecRegistry()
+    assert registry.get("a") is registry.get("a")
+    assert registry.get_status()["a"]["payloads"] == 0
+    results = benchmark(batch(200), rounds=2)
+    assert {"json", "tagged", "records"} <= set(results)
+    assert results["records"]["bytes"] < results["json"]["bytes"]
+    assert all(row["encode_bps"] > 0 and row["decode_bps"] > 0 for row in results.values())
@@ -0,0 +1,152 @@
+"""Tests for the database -> search -> cache propagation pipeline."""
+
+import asyncio
+import time
+
+import pytest
+
+from database_sync import DatabaseSyncManager, DatabaseConfig, DatabaseType, SyncDirection
+from pipeline import PropagationPipeline
+from mega_orchestrator import MegaOrchestrator
+from startup import CONNECT_GATE
+
+
+@pytest.mark.asyncio
+async def test_batches_flow_through_linked_stages_in_memory():
+    seen = []
+
+    async def record(batch):
+        seen.append((len(seen), batch.records))
+
+    pipeline = PropagationPipeline()
+    pipeline.add_stage("search", record)
+    pipeline.add_stage("cache", record, after=["search"])
+    runner = asyncio.create_task(pipeline.run())
+
+    records = [{"id": 1}, {"id": 2}]
+    await pipeline.publish("PostgreSQL Primary", records)
+    await pipeline.drain()
+    runner.cancel()
+
+    assert len(seen) == 2
+    assert all(batch is records for _, batch in seen)
+    status = pipeline.get_status()
+    assert status["stages"]["cache"]["after"] == ["search"]
+    assert status["stages"]["cache"]["freshness_p50"] < 0.1
+    assert "freshness_p50" not in status["stages"]["search"]
+
+
+@pytest.mark.asyncio
+async def test_full_stage_pushes_back_on_publisher():
+    async def slow(batch):
+        await asyncio.sleep(0.05)
+
+    pipeline = PropagationPipeline(capacity=1)
+    pipeline.add_stage("slow", slow)
+    runner = asyncio.create_task(pipeline.run())
+
+    started = time.monotonic()
+    for i in range(5):
+        await pipeline.publish("db", [{"id": i}])
+    # Only one batch fits in the queue and one is in hand; the rest waited on the sink
+    assert time.monotonic() - started >= 0.1
+    assert pipeline.stages["slow"].queue.qsize() <= 1
+    await pipeline.drain()
+    runner.cancel()
+    assert pipeline.stages["slow"].processed == 5
+
+
+@pytest.mark.asyncio
+async def test_publish_drops_batch_when_stage_stays_full():
+    async def stuck(batch):
+        await asyncio.sleep(3600)
+
+    pipeline = PropagationPipeline(capacity=1, publish_timeout=0.05)
+    pipeline.add_stage("stuck", stuck)
+    runner = asyncio.create_task(pipeline.run())
+    for i in range(3):
+        await asyncio.wait_for(pipeline.publish("db", [{"id": i}]), 1.0)
+    runner.cancel()
+    # One batch in hand, one queued, the third timed out
+    assert pipeline.stages["stuck"].dropped == 1
+    assert pipeline.get_status()["stages"]["stuck"]["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_subscriber_does_not_fail_the_sync():
+    mgr = DatabaseSyncManager()
+    for name in ("pg", "mongo"):
+        mgr.register_database(DatabaseConfig(name, DatabaseType.POSTGRESQL, f"{name}://localhost"))
+    mgr.add_sync_pair("pg", "mongo", SyncDirection.SOURCE_TO_TARGET)
+    for connector in mgr.connectors.values():
+        await connector.connect()
+    received = []
+
+    async def broken(source, records):
+        raise RuntimeError("subscriber down")
+
+    async def healthy(source, records):
+        received.append(source)
+
+    mgr.subscribe_changes(broken)
+    mgr.subscribe_changes(healthy)
+    results = await mgr.sync_scope("pg", [1, 2])
+    assert len(results) == 1
+    assert received == ["pg"]
+    assert mgr.get_status()["subscriber_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_stage_still_forwards_batch():
+    forwarded = []
+
+    async def broken(batch):
+        raise RuntimeError("index unavailable")
+
+    async def sink(batch):
+        forwarded.append(batch.seq)
+
+    pipeline = PropagationPipeline()
+    pipeline.add_stage("search", broken)
+    pipeline.add_stage("cache", sink, after=["search"])
+    runner = asyncio.create_task(pipeline.run())
+    await pipeline.publish("db", [{"id": 1}])
+    await pipeline.drain()
+    runner.cancel()
+
+    assert forwarded == [1]
+    assert pipeline.stages["search"].failed == 1
+
+
+def test_stages_must_follow_known_stages():
+    pipeline = PropagationPipeline()
+
+    async def noop(batch):
+        pass
+
+    pipeline.add_stage("search", noop)
+    with pytest.raises(ValueError):
+        pipeline.add_stage("cache", noop, after=["missing"])
+    with pytest.raises(ValueError):
+        pipeline.add_stage("search", noop)
+
+
+@pytest.mark.asyncio
+async def test_database_changes_reach_search_and_cache():
+    orchestrator = MegaOrchestrator(subsystems=["database_sync", "search_sync", "cache_sync"])
+    for name in orchestrator.subsystems:
+        getattr(orchestrator, MegaOrchestrator.SUBSYSTEM_INITIALIZERS[name])()
+    orchestrator.initialize_propagation()
+    for name in orchestrator.subsystems:
+        manager = getattr(orchestrator, name)
+        await CONNECT_GATE.connect_all(name, manager.connectors)
+    runner = asyncio.create_task(orchestrator.propagation.run())
+
+    await orchestrator.database_sync.sync_scope("PostgreSQL Primary", ["row-1", "row-2"])
+    await orchestrator.propagation.drain()
+    runner.cancel()
+
+    assert orchestrator.search_sync.sync_history.total("index_documents") == 2 * 3
+    assert orchestrator.cache_sync.sync_history.total("invalidate") == 2 * 2
+    assert orchestrator.sync_intervals()["cache_sync"] == 20 * MegaOrchestrator.SAFETY_NET_POLL_FACTOR
+    assert orchestrator.get_full_status()["propagation"]["published"] == 1
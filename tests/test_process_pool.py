@@ -0,0 +1,135 @@
+"""Tests for the multi-process execution mode."""
+
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from process_pool import (
+    BULK_THRESHOLD, ProcessPool, WorkerSpec, default_placement, merge_status,
+    recv_message, send_message, shard_manager, unlink_segment
+)
+from mega_orchestrator import MegaOrchestrator
+
+
+def test_messages_round_trip_inline_and_through_shared_memory():
+    parent, child = multiprocessing.Pipe()
+    small = {"cmd": "status", "id": 1}
+    large = {"payload": b"x" * (BULK_THRESHOLD * 2)}
+
+    send_message(child, small)
+    send_message(child, large, "psync_test_round_trip")
+    send_message(child, large)
+    assert recv_message(parent) == small
+    assert recv_message(parent) == large
+    assert not unlink_segment("psync_test_round_trip")
+    # Unnamed messages never use shared memory
+    assert recv_message(parent) == large
+
+
+def test_default_placement_groups_or_shards():
+    subsystems = ["a", "b", "c"]
+    assert [s.subsystems for s in default_placement(subsystems, 2)] == [["a", "c"], ["b"]]
+
+    sharded = default_placement(subsystems, 5)
+    assert [s.name for s in sharded] == ["a[0/2]", "a[1/2]", "b[0/2]", "b[1/2]", "c"]
+
+
+def test_shard_manager_splits_connectors_and_pairs():
+    orchestrator = MegaOrchestrator()
+    orchestrator.initialize_storage()
+    orchestrator.initialize_databases()
+
+    shard_manager(orchestrator.storage_sync, 1, 2)
+    assert list(orchestrator.storage_sync.connectors) == ["GCS", "MinIO"]
+
+    shard_manager(orchestrator.database_sync, 0, 2)
+    assert [p[1] for p in orchestrator.database_sync.sync_pairs] == ["PostgreSQL Backup", "DynamoDB"]
+    assert set(orchestrator.database_sync.connectors) == {"PostgreSQL Primary", "PostgreSQL Backup", "DynamoDB"}
+
+
+def test_merge_status_combines_shards():
+    merged = merge_status(
+        {"running": False, "total_syncs": 2, "storage_providers": ["S3"]},
+        {"running": True, "total_syncs": 3, "storage_providers": ["GCS"]}
+    )
+    assert merged == {"running": True, "total_syncs": 5, "storage_providers": ["S3", "GCS"]}
+
+
+@pytest.mark.asyncio
+async def test_late_replies_are_read_and_their_segments_freed():
+    pool = ProcessPool([WorkerSpec(["cache_sync"])], {"cache_sync": 1})
+    worker = pool.workers[0]
+    worker.conn, child = multiprocessing.Pipe()
+    pool._watch(worker)
+
+    worker.segments[99] = "psync_test_late"
+    send_message(child, {"id": 99, "payload": b"x" * BULK_THRESHOLD}, "psync_test_late")
+    await asyncio.sleep(0.05)
+    assert not worker.conn.poll()
+    assert worker.segments == {} and not unlink_segment("psync_test_late")
+    pool._unwatch(worker)
+
+
+class AliveProcess:
+    pid = 0
+
+    def is_alive(self) -> bool:
+        return True
+
+
+@pytest.mark.asyncio
+async def test_timed_out_request_frees_the_segment_its_reply_uses():
+    pool = ProcessPool([WorkerSpec(["cache_sync"])], {"cache_sync": 1}, status_timeout=0.05)
+    worker = pool.workers[0]
+    worker.conn, child = multiprocessing.Pipe()
+    worker.process = AliveProcess()
+
+    status = await pool.collect_status()
+    assert status["workers"][0]["responded"] is False
+    assert worker.segments == {}
+
+    # The worker answers after the parent gave up; the reply is dropped and nothing is left behind
+    request = recv_message(child)
+    send_message(child, {"id": request["id"], "payload": b"x" * BULK_THRESHOLD}, request["segment"])
+    await asyncio.sleep(0.05)
+    assert not worker.conn.poll()
+    assert not unlink_segment(request["segment"])
+    pool._unwatch(worker)
+
+
+def test_segments_of_unread_replies_are_freed_when_a_worker_goes():
+    pool = ProcessPool([WorkerSpec(["cache_sync"])], {"cache_sync": 1})
+    worker = pool.workers[0]
+    worker.conn, child = multiprocessing.Pipe()
+    worker.segments[5] = "psync_test_unread"
+    send_message(child, {"id": 5, "payload": b"x" * BULK_THRESHOLD}, "psync_test_unread")
+
+    pool._release_segments(worker)
+    assert worker.segments == {} and not unlink_segment("psync_test_unread")
+    assert recv_message(worker.conn) is None
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_shards_and_aggregates_status():
+    pool = ProcessPool([WorkerSpec(["cache_sync"], 0, 2), WorkerSpec(["cache_sync"], 1, 2)],
+                       {"cache_sync": 1}, status_timeout=5.0)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            status = await pool.collect_status()
+            cache = status["subsystems"].get("cache_sync", {})
+            if cache.get("total_syncs", 0) >= 2 or time.monotonic() > deadline:
+                break
+            await asyncio.sleep(0.2)
+    finally:
+        pool.stop()
+
+    assert all(w["responded"] for w in status["workers"])
+    assert len({w["pid"] for w in status["workers"]}) == 2
+    assert sorted(cache["cache_providers"]) == ["Redis Primary", "Redis Replica"]
+    assert cache["total_syncs"] >= 2
+    assert {"Redis Primary.sync_cache", "Redis Replica.sync_cache"} <= set(status["connector_metrics"])
+    assert not any(w.alive for w in pool.workers)
@@ -0,0 +1,64 @@
+"""Tests for adaptive sync intervals and the global polling budget."""
+
+import asyncio
+
+import pytest
+
+from scheduler import AdaptiveScheduler, SchedulePolicy, SCHEDULER
+from cache_sync import CacheSyncManager, CacheConfig, CacheType
+
+
+def test_unconfigured_scheduler_keeps_configured_interval():
+    scheduler = AdaptiveScheduler()
+    assert scheduler.next_interval("cache_sync", 20, 500, ["Redis"]) == 20
+    assert scheduler.get_status()["enabled"] is False
+
+
+def test_idle_cycles_back_off_to_the_maximum():
+    scheduler = AdaptiveScheduler()
+    scheduler.configure(SchedulePolicy(max_factor=8))
+    intervals = [scheduler.next_interval("ml_sync", 10, 0, ["MLflow"]) for _ in range(5)]
+
+    assert intervals == [20, 40, 80, 80, 80]
+    assert scheduler.get_status()["subsystems"]["ml_sync"]["idle_cycles"] == 5
+
+
+def test_growing_backlog_tightens_to_the_minimum():
+    scheduler = AdaptiveScheduler()
+    scheduler.configure(SchedulePolicy(target_items=50, min_factor=0.25))
+    total, intervals = 0, []
+    for found in (50, 100, 400, 400):
+        total += found
+        intervals.append(scheduler.next_interval("database_sync", 40, total, ["PostgreSQL"]))
+
+    assert intervals == [40, 20, 10, 10]
+
+
+def test_budget_stretches_intervals_when_oversubscribed():
+    scheduler = AdaptiveScheduler()
+    scheduler.configure(SchedulePolicy(target_items=10, budget=1.0))
+    connectors = [f"c{i}" for i in range(10)]
+    # 10 connectors every 10s is exactly the budget
+    assert scheduler.next_interval("storage_sync", 10, 10, connectors) == pytest.approx(10)
+    # A second subsystem doubles demand, so it is stretched to fit
+    assert scheduler.next_interval("message_sync", 10, 10, connectors) == pytest.approx(20)
+    assert scheduler.demand() == pytest.approx(1.5)
+
+
+@pytest.mark.asyncio
+async def test_manager_cycles_use_adaptive_interval():
+    manager = CacheSyncManager()
+    manager.register_cache(CacheConfig("SchedRedis", CacheType.REDIS, "localhost", 6379))
+    SCHEDULER.configure(SchedulePolicy(target_items=1000))
+    try:
+        task = asyncio.create_task(manager.run_continuous_sync(check_interval=1))
+        await asyncio.sleep(0.4)
+        manager.is_running = False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        job = SCHEDULER.jobs["cache_sync"]
+        # 10 keys against a target of 1000 loosens the interval by at most max_step
+        assert job.last_found == 10
+        assert job.effective == pytest.approx(2)
+    finally:
+        SCHEDULER.configure(None)
@@ -0,0 +1,137 @@
+"""Tests for the virtual-clock simulation mode."""
+
+import asyncio
+import random
+import time
+from datetime import timedelta
+
+import mega_orchestrator
+from breakers import BREAKERS
+from clock import SYSTEM_CLOCK
+from simulation import SIMULATION, ConnectorModel, VirtualClock, VirtualEventLoop, poisson, simulate, use_clock
+from scheduler import SchedulePolicy
+
+
+def test_virtual_loop_sleeps_without_waiting():
+    clock = VirtualClock()
+    loop = VirtualEventLoop(clock)
+
+    async def nap():
+        started = loop.time()
+        await asyncio.gather(asyncio.sleep(3600), asyncio.sleep(60))
+        return loop.time() - started
+
+    wall = time.perf_counter()
+    try:
+        with use_clock(clock):
+            assert loop.run_until_complete(nap()) == 3600
+            assert BREAKERS.get("VirtualNap").clock is clock
+            # The process's own time is untouched
+            assert time.time() - clock.time() > 1e7
+    finally:
+        loop.close()
+    assert time.perf_counter() - wall < 1.0
+    assert clock.now == 3600 and BREAKERS.clock is SYSTEM_CLOCK
+    BREAKERS.breakers.pop("VirtualNap")
+
+
+def test_virtual_time_waits_for_executor_work():
+    clock = VirtualClock()
+    loop = VirtualEventLoop(clock)
+    order = []
+
+    async def timer():
+        await asyncio.sleep(1)
+        order.append(("timer", clock.now))
+
+    async def work():
+        await asyncio.to_thread(time.sleep, 0.05)
+        order.append(("thread", clock.now))
+
+    async def both():
+        await asyncio.gather(timer(), work())
+
+    try:
+        loop.run_until_complete(both())
+        loop.run_until_complete(loop.shutdown_default_executor())
+    finally:
+        loop.close()
+    assert order == [("thread", 0.0), ("timer", 1.0)]
+
+
+def test_poisson_mean():
+    rng = random.Random(3)
+    for mean in (0.5, 4.0, 200.0):
+        draws = [poisson(rng, mean) for _ in range(4000)]
+        assert abs(sum(draws) / len(draws) - mean) < max(0.1, mean * 0.05)
+    assert poisson(rng, 0) == 0
+
+
+def test_simulation_is_reproducible_per_seed():
+    options = dict(models={"*": ConnectorModel(error_rate=0.05)}, change_rates={"message_sync": 1.0},
+                   subsystems=["message_sync", "cache_sync"])
+
+    def outcome(seed):
+        report = simulate(1800, seed=seed, **options)
+        return report["cycles"], report["changes"], report["calls"], report["failures"]
+
+    assert outcome(5) == outcome(5)
+    assert outcome(5) != outcome(6)
+    assert not SIMULATION.active and SIMULATION.clock is SYSTEM_CLOCK
+
+
+def test_outage_fails_only_the_modelled_connector_while_it_lasts():
+    report = simulate(600, seed=1, models={"Kafka": ConnectorModel(outages=[(0, 300)])},
+                      subsystems=["message_sync"])
+    assert report["virtual_seconds"] == 600
+    cycles = report["cycles"]["message_sync"]
+    assert cycles >= 30
+    # Every Kafka call in the first half fails; the other queues and the second half are clean
+    assert cycles // 2 - 2 <= report["failures"] <= cycles // 2 + 2
+    breakers = report["status"]["breakers"]
+    assert breakers["Kafka"]["window_errors"] == 0 and breakers["SQS"]["window_errors"] == 0
+
+
+def test_adaptive_intervals_poll_less_when_nothing_changes():
+    options = dict(seed=2, change_rates={"message_sync": 0.0}, subsystems=["message_sync"])
+    fixed = simulate(3600, **options)
+    adaptive = simulate(3600, schedule=SchedulePolicy(), **options)
+    assert adaptive["cycles"]["message_sync"] < fixed["cycles"]["message_sync"] / 4
+    assert fixed["changes"]["message_sync"] == 0
+
+
+def test_graphql_cycles_idle_without_schema_changes():
+    options = dict(seed=3, change_rates={"graphql_sync": 0.0}, subsystems=["graphql_sync"])
+    fixed = simulate(3600, **options)
+    adaptive = simulate(3600, schedule=SchedulePolicy(), **options)
+    assert adaptive["cycles"]["graphql_sync"] < fixed["cycles"]["graphql_sync"] / 4
+
+
+def test_propagated_writes_do_not_speed_up_an_idle_poll_loop():
+    options = dict(seed=4, change_rates={"search_sync": 0.0, "database_sync": 0.05},
+                   subsystems=["database_sync", "search_sync"], schedule=SchedulePolicy())
+    isolated = simulate(3600, propagation=False, **options)
+    propagated = simulate(3600, **options)
+    assert propagated["cycles"]["search_sync"] == isolated["cycles"]["search_sync"]
+    assert propagated["status"]["scheduler"]["subsystems"]["search_sync"]["last_found"] == 0
+
+
+def test_uptime_and_sync_age_follow_virtual_time(monkeypatch):
+    created = []
+
+    class Recorded(mega_orchestrator.MegaOrchestrator):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(mega_orchestrator, "MegaOrchestrator", Recorded)
+    report = simulate(3600, seed=5, subsystems=["cache_sync"])
+    status, orchestrator = report["status"], created[0]
+
+    assert status["uptime_seconds"] == 3600
+    assert status["readiness"]["uptime"] == 3600
+    assert status["health"]["last_check"] <= (orchestrator.start_time + timedelta(hours=1)).isoformat()
+    for connector in orchestrator.cache_sync.connectors.values():
+        assert orchestrator.start_time < connector.last_sync <= orchestrator.start_time + timedelta(hours=1)
+    interval = orchestrator.sync_intervals()["cache_sync"]
+    assert 0 < orchestrator.monitoring.latest["cache_sync"].details["last_sync_age"] <= interval
@@ -0,0 +1,138 @@
+"""Tests for concurrent connector startup and the readiness timeline."""
+
+import asyncio
+import time
+
+import pytest
+
+from startup import ConnectGate, ConnectPolicy, ReadinessTimeline
+from mega_orchestrator import MegaOrchestrator
+from webhook_sync import EventType
+
+
+class FakeConnector:
+    def __init__(self, delay: float = 0.0, failures: int = 0, hang: bool = False):
+        self.delay = delay
+        self.failures = failures
+        self.hang = hang
+        self.calls = 0
+        self.connected = False
+
+    async def connect(self) -> bool:
+        self.calls += 1
+        if self.hang:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise OSError("connection refused")
+        self.connected = True
+        return True
+
+
+@pytest.mark.asyncio
+async def test_connects_concurrently_under_global_limit():
+    in_flight = peak = 0
+
+    class Tracked(FakeConnector):
+        async def connect(self) -> bool:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await super().connect()
+            finally:
+                in_flight -= 1
+
+    gate = ConnectGate(ConnectPolicy(concurrency=3))
+    connectors = {f"c{i}": Tracked(delay=0.1) for i in range(6)}
+    started = time.monotonic()
+    await gate.connect_all("storage_sync", connectors)
+
+    assert all(c.connected for c in connectors.values())
+    assert peak == 3
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_retries_with_backoff_then_gives_up():
+    readiness = ReadinessTimeline()
+    gate = ConnectGate(ConnectPolicy(timeout=0.05, attempts=3, backoff=0.01), readiness)
+    flaky, dead = FakeConnector(failures=2), FakeConnector(hang=True)
+
+    connectors = {"flaky": flaky, "dead": dead}
+    assert await gate.connect_all("cache_sync", connectors) == ["dead"]
+    assert list(connectors) == ["flaky"]
+    assert gate.get_status()["reconnecting"] == ["cache_sync/dead"]
+    gate.stop()
+
+    assert flaky.connected and flaky.calls == 3
+    assert dead.calls == 3
+    assert gate.retries == 4
+    entry = readiness.get_status()["subsystems"]["cache_sync"]
+    assert entry["connected"] == 1
+    assert entry["failed"] == ["dead"]
+
+
+@pytest.mark.asyncio
+async def test_failed_connector_is_skipped_then_rejoins(monkeypatch):
+    import storage_sync
+    from storage_sync import StorageSyncManager, StorageConfig, StorageType
+
+    gate = ConnectGate(ConnectPolicy(timeout=1.0, attempts=1, backoff=0.05, reconnect_backoff=0.05))
+    monkeypatch.setattr(storage_sync, "CONNECT_GATE", gate)
+    manager = StorageSyncManager()
+    for name in ("RejoinA", "RejoinB", "RejoinC"):
+        manager.register_storage(StorageConfig(name, StorageType.S3, "s3.amazonaws.com", name.lower(), {}))
+    broken = manager.connectors["RejoinC"]
+    healthy_connect = broken.connect
+
+    async def refuse():
+        raise OSError("connection refused")
+
+    broken.connect = refuse
+    run = asyncio.create_task(manager.run_continuous_sync(check_interval=0.02))
+    await asyncio.sleep(0.3)
+    assert {r.source for r in manager.sync_history} == {"RejoinA", "RejoinB"}
+    assert all(r.ok for r in manager.sync_history)
+
+    broken.connect = healthy_connect
+    deadline = time.monotonic() + 2.0
+    while not manager.sync_history.total(source="RejoinC") and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    manager.is_running = False
+    run.cancel()
+    gate.stop()
+    assert "RejoinC" in manager.connectors
+    assert manager.sync_history.total(source="RejoinC") > 0
+
+
+def test_readiness_records_first_sync_only():
+    readiness = ReadinessTimeline()
+    readiness.connected("cache_sync", 0.1, 2, [])
+    readiness.connected("search_sync", 0.2, 3, [])
+    readiness.synced("cache_sync")
+    assert readiness.get_status()["ready"] is False
+
+    first = readiness.get_status()["subsystems"]["cache_sync"]["first_sync_at"]
+    readiness.synced("cache_sync")
+    readiness.synced("search_sync")
+    status = readiness.get_status()
+    assert status["subsystems"]["cache_sync"]["first_sync_at"] == first
+    assert status["ready"] is True
+    assert status["time_to_ready"] == status["subsystems"]["search_sync"]["first_sync_at"]
+
+
+def test_disabled_subsystems_are_never_loaded():
+    orchestrator = MegaOrchestrator(subsystems=["cache_sync", "database_sync"])
+    assert list(orchestrator.sync_intervals()) == ["database_sync", "cache_sync"]
+    assert "storage_sync" not in vars(orchestrator)
+
+    orchestrator.initialize_event_routes()
+    status = orchestrator.get_full_status()
+    assert status["storage_sync"] is None
+    assert status["cache_sync"]["running"] is False
+    assert "storage_sync" not in vars(orchestrator)
+    assert list(orchestrator.sync_router.routes) == [EventType.DATA_SYNC]
+
+    with pytest.raises(ValueError):
+        MegaOrchestrator(subsystems=["nope"])
@@ -0,0 +1,109 @@
+"""Tests for checkpointed orchestrator state."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from state_store import StateStore, capture_manager, decode, encode, restore_manager, staggered_delays
+from storage_sync import StorageSyncManager, StorageConfig, StorageType
+from mega_orchestrator import MegaOrchestrator
+
+
+def test_encoding_round_trips_and_is_compact():
+    value = {"n": [0, 1, -1, 300, -2**40, 2**63], "f": 1.5, "s": "zürich", "b": b"\x00\xff",
+             "flags": [True, False, None], "nested": {"a": {"b": []}}}
+    assert decode(encode(value)) == value
+
+    state = {"connectors": {f"bucket-{i}": {"last_sync": 1.7e9 + i, "counters": {"sync_count": i * 10}}
+                            for i in range(20)}}
+    assert len(encode(state)) < len(json.dumps(state))
+
+
+def test_naive_datetimes_round_trip():
+    for value in (datetime(2024, 2, 29, 23, 59, 59, 999999), datetime(1969, 7, 20, 20, 17), datetime(1970, 1, 1)):
+        assert decode(encode(value)) == value
+    with pytest.raises(TypeError):
+        encode(datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+
+def test_log_replays_latest_state_and_drops_torn_tail(tmp_path):
+    path = str(tmp_path / "state.log")
+    store = StateStore(path, fsync=False)
+    store.put("a", {"v": 1})
+    store.put("b", {"v": 2})
+    store.put("a", {"v": 3})
+    store.close()
+
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00garbage")
+
+    reloaded = StateStore(path)
+    assert reloaded.load() == {"a": {"v": 3}, "b": {"v": 2}}
+    assert reloaded.frames == 3
+    assert reloaded.truncated_bytes == 11
+    assert StateStore(path).load() == {"a": {"v": 3}, "b": {"v": 2}}
+
+
+def test_compaction_keeps_one_frame_per_key(tmp_path):
+    path = str(tmp_path / "state.log")
+    store = StateStore(path, compact_ratio=4, min_compact_frames=8, fsync=False)
+    for i in range(20):
+        store.put(f"k{i % 2}", {"i": i})
+        store.commit()
+    store.close()
+
+    assert store.compactions >= 1
+    reloaded = StateStore(path)
+    assert reloaded.load() == {"k0": {"i": 18}, "k1": {"i": 19}}
+    assert reloaded.frames < 8
+
+
+def storage_manager() -> StorageSyncManager:
+    manager = StorageSyncManager()
+    for name in ("S3", "GCS"):
+        manager.register_storage(StorageConfig(name, StorageType.S3, "s3.com", name.lower(), {}))
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_manager_state_round_trip():
+    manager = storage_manager()
+    s3 = manager.connectors["S3"]
+    await s3.connect()
+    await s3.sync_files([{"path": "a.txt", "size": 1}, {"path": "b.txt", "size": 2}])
+    manager.sync_history.record("S3", "sync_files", 2)
+
+    restored = storage_manager()
+    latest = restore_manager(restored, decode(encode(capture_manager(manager))))
+
+    assert restored.connectors["S3"].sync_count == 2
+    assert restored.connectors["S3"].last_sync == s3.last_sync
+    assert restored.connectors["GCS"].last_sync is None
+    assert restored.sync_history.total_records == 1
+    assert restored.sync_history.total(kind="sync_files") == 2
+    assert latest is not None
+
+
+def test_first_cycles_follow_saved_schedule():
+    delays = staggered_delays(
+        {"cache": 990.0, "queue": 900.0, "search": 800.0, "fresh": None},
+        {"cache": 20, "queue": 15, "search": 25, "fresh": 30},
+        step=2.0, now=1000.0
+    )
+    assert delays == {"cache": 10.0, "search": 0.0, "queue": 2.0}
+
+
+def test_orchestrator_checkpoint_and_restore(tmp_path):
+    path = str(tmp_path / "state.log")
+    first = MegaOrchestrator(state_path=path)
+    first.initialize_cache()
+    first.cache_sync.connectors["Redis Primary"].keys_synced = 42
+    first.checkpoint()
+    first.state_store.close()
+
+    second = MegaOrchestrator(state_path=path)
+    second.initialize_cache()
+    second.restore_state(second.sync_intervals())
+    assert second.cache_sync.connectors["Redis Primary"].keys_synced == 42
+    assert second.get_full_status()["state_store"]["keys"] == 8
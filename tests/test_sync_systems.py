@@ -2,6 +2,8 @@
 
 import pytest
 import asyncio
+import time
+from datetime import datetime, timedelta
 
 from sync_engine import AutonomousSyncEngine, CloudProvider, SyncConfig
 from database_sync import (
@@ -115,3 +117,260 @@ async def test_monitoring_health_check():
     mon = MonitoringSystem()
     status = await mon.check_component_health("test_component")
     assert status == HealthStatus.HEALTHY
+
+
+@pytest.mark.asyncio
+async def test_webhook_handlers_run_concurrently():
+    mgr = WebhookManager(handler_timeout=1.0)
+
+    async def slow(event):
+        await asyncio.sleep(0.2)
+
+    mgr.register_handler(EventType.DEPLOYMENT, slow)
+    mgr.register_handler(EventType.DEPLOYMENT, slow)
+    mgr.register_handler(EventType.DEPLOYMENT, lambda e: None)
+    event = WebhookEvent(EventType.DEPLOYMENT, "ci", datetime.utcnow(), {})
+
+    started = time.perf_counter()
+    await mgr.emit_event(event)
+    assert time.perf_counter() - started < 0.35
+
+    handlers = mgr.get_status()["handlers"]
+    assert len(handlers) == 3
+    assert all(h["calls"] == 1 and h["errors"] == 0 for h in handlers.values())
+
+
+@pytest.mark.asyncio
+async def test_webhook_handler_timeout_and_ordering():
+    mgr = WebhookManager(handler_timeout=0.05)
+    seen = []
+
+    async def hangs(event):
+        await asyncio.sleep(10)
+
+    async def ordered(event):
+        await asyncio.sleep(0.01 * (3 - event.data["n"]))
+        seen.append(event.data["n"])
+
+    mgr.register_handler(EventType.DATA_SYNC, hangs)
+    mgr.register_handler(EventType.DATA_SYNC, ordered, timeout=1.0, ordered=True)
+    await asyncio.gather(*(
+        mgr.emit_event(WebhookEvent(EventType.DATA_SYNC, "db", datetime.utcnow(), {"n": n}))
+        for n in range(3)
+    ))
+
+    assert seen == [0, 1, 2]
+    stats = mgr.get_status()["handlers"]
+    hang_stats = next(v for k, v in stats.items() if "hangs" in k)
+    assert hang_stats["timeouts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_webhook_ordered_worker_exit_fails_pending_emits():
+    from webhook_sync import WorkerStopped
+    mgr = WebhookManager(handler_timeout=5.0)
+    started = asyncio.Event()
+
+    async def slow(event):
+        started.set()
+        await asyncio.sleep(10)
+
+    mgr.register_handler(EventType.DATA_SYNC, slow, ordered=True)
+    emits = [asyncio.create_task(mgr.emit_event(WebhookEvent(EventType.DATA_SYNC, "db", datetime.utcnow(), {})))
+             for _ in range(3)]
+    await started.wait()
+    mgr.event_handlers[EventType.DATA_SYNC][0].worker.cancel()
+
+    results = await asyncio.wait_for(asyncio.gather(*emits, return_exceptions=True), 1.0)
+    assert all(isinstance(r, WorkerStopped) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_webhook_ordered_handler_can_emit_its_own_event_type():
+    mgr = WebhookManager()
+    seen = []
+
+    async def relay(event):
+        seen.append(event.data["hop"])
+        if event.data["hop"] < 2:
+            await mgr.emit_event(WebhookEvent(EventType.DATA_SYNC, "db", datetime.utcnow(), {"hop": event.data["hop"] + 1}))
+
+    mgr.register_handler(EventType.DATA_SYNC, relay, ordered=True)
+    await asyncio.wait_for(mgr.emit_event(WebhookEvent(EventType.DATA_SYNC, "db", datetime.utcnow(), {"hop": 0})), 1.0)
+    assert seen == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_webhook_ingest_workers_drain_queue():
+    mgr = WebhookManager(ingest_workers=2, ingest_batch_size=4)
+    received = []
+    mgr.register_handler(EventType.INDEX_UPDATE, lambda e: received.append(e.source))
+    listener = asyncio.create_task(mgr.run_webhook_listener())
+
+    for i in range(10):
+        assert mgr.submit(WebhookEvent(EventType.INDEX_UPDATE, f"src{i}", datetime.utcnow(), {}))
+    await asyncio.wait_for(mgr.ingest_queue.join(), 1.0)
+    mgr.is_running = False
+    listener.cancel()
+
+    assert sorted(received) == sorted(f"src{i}" for i in range(10))
+    assert mgr.get_status()["ingest"]["processed"] == 10
+
+
+@pytest.mark.asyncio
+async def test_webhook_ingest_worker_survives_failing_events(monkeypatch):
+    mgr = WebhookManager(ingest_workers=1, ingest_batch_size=4)
+    emit = mgr.emit_event
+
+    async def flaky(event):
+        if event.source == "bad":
+            raise RuntimeError("handler blew up")
+        await emit(event)
+
+    monkeypatch.setattr(mgr, "emit_event", flaky)
+    received = []
+    mgr.register_handler(EventType.INDEX_UPDATE, lambda e: received.append(e.source))
+    listener = asyncio.create_task(mgr.run_webhook_listener())
+
+    for source in ("a", "bad", "b"):
+        assert mgr.submit(WebhookEvent(EventType.INDEX_UPDATE, source, datetime.utcnow(), {}))
+    await asyncio.wait_for(mgr.ingest_queue.join(), 1.0)
+    # The worker is still draining after the failure
+    assert mgr.submit(WebhookEvent(EventType.INDEX_UPDATE, "c", datetime.utcnow(), {}))
+    await asyncio.wait_for(mgr.ingest_queue.join(), 1.0)
+    mgr.is_running = False
+    listener.cancel()
+
+    assert sorted(received) == ["a", "b", "c"]
+    assert mgr.get_status()["ingest"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_coalesces_bursts_per_source():
+    mgr = WebhookManager()
+    mgr.enable_coalescing(EventType.DEPLOYMENT, window=0.05, max_delay=1.0)
+    received = []
+    mgr.register_handler(EventType.DEPLOYMENT, lambda e: received.append(e))
+
+    for i in range(20):
+        await mgr.emit_event(WebhookEvent(EventType.DEPLOYMENT, "ci", datetime.utcnow(), {"file": f"f{i}"}))
+    await mgr.emit_event(WebhookEvent(EventType.DEPLOYMENT, "cd", datetime.utcnow(), {"file": "x"}))
+    await asyncio.sleep(0.15)
+    await mgr.flush_coalesced()
+
+    by_source = {e.source: e for e in received}
+    assert len(received) == 2
+    assert by_source["ci"].coalesced == 20
+    assert len(by_source["ci"].data["coalesced_events"]) == 20
+    assert by_source["cd"].coalesced == 1
+    assert mgr.get_status()["coalescing"]["events_merged"] == 19
+
+
+@pytest.mark.asyncio
+async def test_webhook_coalescing_enforces_max_delay():
+    mgr = WebhookManager()
+    mgr.enable_coalescing(EventType.DATA_SYNC, window=0.05, max_delay=0.1)
+    received = []
+    mgr.register_handler(EventType.DATA_SYNC, lambda e: received.append(e.coalesced))
+
+    for _ in range(10):
+        await mgr.emit_event(WebhookEvent(EventType.DATA_SYNC, "db", datetime.utcnow(), {}))
+        await asyncio.sleep(0.03)
+    await mgr.flush_coalesced()
+
+    assert len(received) >= 2
+    assert sum(received) == 10
+
+
+@pytest.mark.asyncio
+async def test_webhook_shutdown_delivers_pending_bursts():
+    mgr = WebhookManager()
+    mgr.enable_coalescing(EventType.DEPLOYMENT, window=60.0, max_delay=60.0)
+    received = []
+    mgr.register_handler(EventType.DEPLOYMENT, lambda e: received.append(e.coalesced))
+    listener = asyncio.create_task(mgr.run_webhook_listener())
+    await asyncio.sleep(0)
+
+    for _ in range(3):
+        await mgr.emit_event(WebhookEvent(EventType.DEPLOYMENT, "ci", datetime.utcnow(), {}))
+    listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
+
+    assert received == [3]
+    assert mgr.get_status()["coalescing"]["pending_bursts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_monitoring_derives_status_from_manager_metrics():
+    mon = MonitoringSystem()
+    mgr = StorageSyncManager()
+    mgr.register_storage(StorageConfig("S3", StorageType.S3, "s3.amazonaws.com", "bucket", {}))
+    mon.register_component("storage_sync", mgr, interval=30)
+    assert await mon.check_component_health("storage_sync") == HealthStatus.HEALTHY
+
+    mgr.is_running = True
+    mgr.connectors["S3"].last_sync = datetime.utcnow() - timedelta(seconds=90)
+    assert await mon.check_component_health("storage_sync") == HealthStatus.DEGRADED
+    mgr.is_running = False
+    assert await mon.check_component_health("storage_sync") == HealthStatus.UNHEALTHY
+    mgr.is_running = True
+
+    mgr.connectors["S3"].last_sync = datetime.utcnow()
+    for ok in (True, False):
+        mgr.sync_history.record("S3", "sync_files", ok=ok)
+    assert await mon.check_component_health("storage_sync") == HealthStatus.UNHEALTHY
+
+
+@pytest.mark.asyncio
+async def test_monitoring_checks_run_concurrently_and_are_cached():
+    mon = MonitoringSystem(check_timeout=0.1)
+    for name in ("a", "b", "c"):
+        mon.register_component(name, WebhookManager(), interval=0)
+
+    async def hangs(name):
+        await asyncio.sleep(5)
+
+    original = mon._probe
+    mon._probe = lambda name: hangs(name) if name == "c" else original(name)
+    started = time.perf_counter()
+    await mon.run_checks()
+    assert time.perf_counter() - started < 0.5
+
+    health = mon.get_health()
+    assert health["status"] == "unhealthy"
+    assert health["components"] == {"a": "healthy", "b": "healthy", "c": "unhealthy"}
+    assert mon.get_status()["total_checks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_monitoring_degrades_when_throughput_falls_below_its_baseline():
+    mon = MonitoringSystem()
+    mgr = StorageSyncManager()
+    mgr.register_storage(StorageConfig("S3", StorageType.S3, "s3.amazonaws.com", "bucket", {}))
+    mgr.is_running = True
+    mgr.connectors["S3"].last_sync = datetime.utcnow()
+    mon.register_component("storage_sync", mgr, interval=30)
+
+    for _ in range(5):
+        mgr.sync_history.record("S3", "sync_files", count=100)
+    assert await mon.check_component_health("storage_sync") == HealthStatus.HEALTHY
+    assert mon.components["storage_sync"].throughput_baseline > 0
+
+    mgr.sync_history = type(mgr.sync_history)()
+    mgr.sync_history.record("S3", "sync_files", count=1)
+    assert await mon.check_component_health("storage_sync") == HealthStatus.DEGRADED
+
+
+@pytest.mark.asyncio
+async def test_monitoring_records_rollups_and_connector_error_rate():
+    from metrics import REGISTRY
+    mon = MonitoringSystem()
+    mon.register_component("webhook_manager", WebhookManager(), interval=0)
+    await mon.run_checks()
+    REGISTRY.observe("RollupKafka", "sync_messages", 0.01)
+    REGISTRY.observe("RollupKafka", "sync_messages", 0.01, error=True)
+    await mon.run_checks()
+
+    assert mon.timeseries.aggregate("webhook_manager.severity", 0, agg="count") == 2
+    assert mon.error_rate("RollupKafka", 3600) == pytest.approx(0.5)
@@ -0,0 +1,43 @@
+"""Tests for the multi-resolution time series store."""
+
+import pytest
+
+from history_store import OTHER
+from timeseries import TimeSeriesStore, Resolution
+
+
+def test_rollups_answer_range_queries_per_resolution():
+    store = TimeSeriesStore((Resolution(10, 6), Resolution(60, 10)))
+    for t in range(0, 600, 10):
+        store.record("kafka.error_rate", t / 600, timestamp=t)
+
+    recent = store.query("kafka.error_rate", 550, 599)
+    assert [ts for ts, _ in recent] == [550.0, 560.0, 570.0, 580.0, 590.0]
+
+    # Older than the 10 s ring retains, so the 1 min rollup answers
+    hourly = store.query("kafka.error_rate", 0, 599)
+    assert len(hourly) == 10
+    assert hourly[0] == (0.0, pytest.approx(25 / 600))
+    assert store.aggregate("kafka.error_rate", 0, 599, agg="max") == pytest.approx(590 / 600)
+    assert store.aggregate("kafka.error_rate", 0, 599, agg="count") == 60
+
+
+def test_memory_is_fixed_by_resolution_layout():
+    store = TimeSeriesStore((Resolution(10, 100),))
+    for t in range(100000):
+        store.record("x", 1.0, timestamp=t)
+    ring = store.series["x"][0]
+    assert len(ring.sums) == 100
+    assert store.stats()["bytes"] == 100 * 40
+    assert store.query("missing", 0, 10) == []
+
+
+def test_series_past_the_cap_roll_up_under_other():
+    store = TimeSeriesStore((Resolution(10, 10),), max_series=3)
+    for i in range(10):
+        store.record(f"connector{i}.calls", 1.0, timestamp=5)
+    assert store.keys() == ["connector0.calls", "connector1.calls", "connector2.calls", OTHER]
+    assert store.aggregate(OTHER, 0, 9, agg="sum") == 7
+    assert store.query("connector9.calls", 0, 9) == []
+    stats = store.stats()
+    assert stats["overflowed"] == 7 and stats["bytes"] == stats["max_bytes"] == 4 * 10 * 40
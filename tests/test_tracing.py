@@ -0,0 +1,62 @@
+"""Tests for tracing spans and export."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from cache_sync import CacheConnector, CacheConfig, CacheType
+from tracing import Tracer, TRACER
+from webhook_sync import WebhookManager, WebhookEvent, EventType
+
+
+def test_parent_child_spans_and_sampling():
+    tracer = Tracer(sample_rate=1.0)
+    with tracer.span("cycle", iteration=1) as root:
+        with tracer.span("sync_data", connector="pg") as child:
+            pass
+    assert child.parent_id == root.span_id
+    assert child.trace_id == root.trace_id
+    assert [p["name"] for p in tracer.critical_path(root.trace_id)] == ["cycle", "sync_data"]
+
+    unsampled = Tracer(sample_rate=0.0)
+    with unsampled.span("cycle") as root:
+        with unsampled.span("child") as child:
+            assert not child.recording
+    assert not unsampled.finished
+
+
+def test_buffer_is_bounded_and_exports_otlp_json(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(sample_rate=1.0, buffer_size=3, export_path=str(path), export_batch=100)
+    for i in range(5):
+        with tracer.span("op", n=i, ok=True, ratio=0.5):
+            pass
+    assert len(tracer.finished) == 3
+    assert tracer.get_status()["evicted"] == 2
+    assert tracer.flush() == 5
+
+    request = json.loads(path.read_text().splitlines()[0])
+    spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(spans) == 5
+    assert {"key": "n", "value": {"intValue": "4"}} in spans[-1]["attributes"]
+    assert spans[0]["status"] == {"code": 1}
+
+
+@pytest.mark.asyncio
+async def test_spans_propagate_through_webhooks_and_connectors(monkeypatch):
+    monkeypatch.setattr(TRACER, "sample_rate", 1.0)
+    connector = CacheConnector(CacheConfig("TraceRedis", CacheType.REDIS, "localhost", 6379))
+    await connector.connect()
+
+    mgr = WebhookManager()
+
+    async def handler(event):
+        await connector.sync_cache({"k": "v"})
+
+    mgr.register_handler(EventType.DATA_SYNC, handler)
+    await mgr.emit_event(WebhookEvent(EventType.DATA_SYNC, "db", datetime.utcnow(), {}))
+
+    sync_span = next(s for s in reversed(TRACER.finished) if s.attributes.get("connector") == "TraceRedis")
+    path = [p["name"] for p in TRACER.critical_path(sync_span.trace_id)]
+    assert path == ["webhook.emit", "webhook.handler", "sync_cache"]
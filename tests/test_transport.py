@@ -0,0 +1,129 @@
+"""Tests for the shared HTTP transport and connector base class."""
+
+import asyncio
+
+import pytest
+
+from transport import BaseConnector, DnsCache, Transport, TransportLimits
+from search_sync import SearchEngineConnector, SearchEngineConfig, SearchEngineType
+from cache_sync import CacheConnector, CacheConfig, CacheType
+
+
+async def start_server(delay: float = 0.0):
+    """Minimal keep-alive HTTP/1.1 server that counts accepted connections."""
+    stats = {"connections": 0, "requests": 0, "active": 0, "peak": 0}
+
+    async def handle(reader, writer):
+        stats["connections"] += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                stats["requests"] += 1
+                stats["active"] += 1
+                stats["peak"] = max(stats["peak"], stats["active"])
+                await asyncio.sleep(delay)
+                stats["active"] -= 1
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], stats
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused_and_dns_cached():
+    server, port, stats = await start_server()
+    transport = Transport()
+    try:
+        for _ in range(20):
+            response = await transport.request("GET", f"http://localhost:{port}/health")
+            assert response.text == "ok"
+    finally:
+        await transport.aclose()
+        server.close()
+
+    assert stats["requests"] == 20
+    assert stats["connections"] == 1
+    assert transport.dns.misses == 1
+    assert transport.get_status()["origins"] == []
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_caps_connections():
+    server, port, stats = await start_server(delay=0.05)
+    transport = Transport(TransportLimits(max_per_host=3))
+    try:
+        responses = await asyncio.gather(*(transport.request("GET", f"http://localhost:{port}/") for _ in range(12)))
+    finally:
+        await transport.aclose()
+        server.close()
+
+    assert all(r.status_code == 200 for r in responses)
+    assert stats["connections"] <= 3
+    assert transport.dns.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_total_cap_holds_for_requests_through_the_raw_client():
+    server, port, stats = await start_server(delay=0.05)
+    transport = Transport(TransportLimits(max_connections=2, max_per_host=8))
+    client = transport.client(f"http://localhost:{port}")
+    try:
+        responses = await asyncio.gather(*(client.get("/") for _ in range(8)))
+        assert all(r.text == "ok" for r in responses)
+        # Every slot came back once the bodies were read
+        assert transport._slots._value == 2
+    finally:
+        await transport.aclose()
+        server.close()
+
+    assert stats["peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_coalesces_lookups():
+    dns = DnsCache()
+    results = await asyncio.gather(*(dns.resolve("localhost", 80) for _ in range(5)))
+    assert all(r == results[0] for r in results)
+    assert dns.misses == 1 and dns.hits == 4
+    assert await dns.resolve("10.0.0.1", 80) == ["10.0.0.1"]
+
+
+@pytest.mark.asyncio
+async def test_connectors_share_the_base_class():
+    search = SearchEngineConnector(SearchEngineConfig("Algolia", SearchEngineType.ALGOLIA, "algolia.com", "key"))
+    cache = CacheConnector(CacheConfig("Redis", CacheType.REDIS, "localhost", 6379))
+    assert isinstance(search, BaseConnector) and isinstance(cache, BaseConnector)
+
+    with pytest.raises(Exception, match="Not connected"):
+        await search.index_documents([{"id": 1}])
+    await search.connect()
+    assert search.connected
+    assert search.http.base_url.host == "algolia.com"
+    with pytest.raises(RuntimeError):
+        cache.http
+    assert Transport.origin("http://minio.local:9000/bucket") == "http://minio.local:9000"
+
+
+def test_clients_from_a_previous_loop_are_closed():
+    transport = Transport()
+
+    async def first():
+        return transport.client("https://api.example.com")
+
+    async def second():
+        client = transport.client("https://api.example.com")
+        await asyncio.sleep(0)
+        return client
+
+    old = asyncio.run(first())
+    new = asyncio.run(second())
+    assert old is not new
+    assert old.is_closed and not new.is_closed
+    asyncio.run(transport.aclose())
@@ -0,0 +1,93 @@
+"""Tests for sampled consistency verification and targeted repair."""
+
+import pytest
+
+from verifier import ConsistencyVerifier, digest, stratify
+from database_sync import DatabaseConfig, DatabaseConnector, DatabaseType
+from storage_sync import StorageConnector, StorageConfig, StorageType
+from mega_orchestrator import MegaOrchestrator
+
+
+async def database(name: str, rows: int = 10_000) -> DatabaseConnector:
+    connector = DatabaseConnector(DatabaseConfig(name, DatabaseType.POSTGRESQL, "pg://", estimated_rows=rows))
+    await connector.connect()
+    return connector
+
+
+def test_stratify_ranges_and_hashed_keys():
+    assert stratify(range(0, 100), 4) == [range(0, 25), range(25, 50), range(50, 75), range(75, 100)]
+    strata = stratify([f"file_{i}" for i in range(50)], 4)
+    assert sorted(k for s in strata for k in s) == sorted(f"file_{i}" for i in range(50))
+    assert stratify(["a", "b"], 4) == stratify(["a", "b"], 4)
+
+
+@pytest.mark.asyncio
+async def test_clean_replicas_stay_within_budget_and_bound_divergence():
+    source, target = await database("VerifyPG"), await database("VerifyMongo")
+    verifier = ConsistencyVerifier(budget=100, interval=2, seed=7)
+    verifier.add("db", source, [target])
+    for _ in range(5):
+        await verifier.verify_once()
+
+    estimate = verifier.estimate("db", "VerifyMongo")
+    assert estimate["divergence"] == 0
+    assert 0 < estimate["high"] < 0.05
+    assert estimate["sampled"] == 5 * 100
+    assert verifier.reads <= 5 * 100 * 2
+    assert verifier.repairs == 0
+
+
+@pytest.mark.asyncio
+async def test_divergent_range_is_estimated_then_repaired_alone():
+    source, target = await database("DriftPG"), await database("DriftMongo")
+    for key in range(2_000, 3_000):
+        target.rows[key] = 0     # 10% of the table silently corrupted in one key range
+
+    verifier = ConsistencyVerifier(budget=200, interval=2, repair_after=10**9, seed=3)
+    verifier.add("db", source, [target], strata=10)
+    for _ in range(3):
+        await verifier.verify_once()
+    estimate = verifier.estimate("db", "DriftMongo")
+    assert estimate["low"] <= 0.1 <= estimate["high"]
+
+    verifier.repair_after = 1
+    await verifier.verify_once()
+    assert verifier.repairs == 1
+    assert verifier.repaired_keys == 1_000
+    assert all(target.rows[key] == digest({"id": key, "data": f"record_{key}"}) for key in range(2_000, 3_000))
+    assert target.rows_ingested == 1_000
+
+    for _ in range(3):
+        await verifier.verify_once()
+    assert verifier.repairs == 1
+    assert verifier.estimate("db", "DriftMongo")["divergence"] == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_objects_are_copied_to_the_lagging_bucket():
+    buckets = [StorageConnector(StorageConfig(name, StorageType.S3, "s3", name, {})) for name in ("VS3", "VGCS")]
+    for bucket in buckets:
+        await bucket.connect()
+    files = [{"name": f"file_{i}.bin", "size": i} for i in range(40)]
+    await buckets[0].sync_files(files)
+    await buckets[1].sync_files(files[:30])
+
+    verifier = ConsistencyVerifier(budget=100, interval=1, max_repairs=4, seed=1)
+    verifier.add("storage", buckets[0], [buckets[1]], strata=4)
+    for _ in range(3):
+        await verifier.verify_once()
+
+    assert set(buckets[1].objects) == set(buckets[0].objects)
+
+
+def test_orchestrator_checks_each_replica_set():
+    orchestrator = MegaOrchestrator(subsystems=["database_sync", "storage_sync", "search_sync"], verify_budget=50)
+    for name in orchestrator.subsystems:
+        getattr(orchestrator, MegaOrchestrator.SUBSYSTEM_INITIALIZERS[name])()
+    orchestrator.initialize_verification()
+
+    checks = {check.name: [t.config.name for t in check.targets] for check in orchestrator.verifier.checks}
+    assert checks["database_sync/PostgreSQL Primary"] == ["PostgreSQL Backup", "MongoDB", "DynamoDB", "Elasticsearch"]
+    assert checks["storage_sync/S3"] == ["GCS", "Azure Blob", "MinIO"]
+    assert checks["search_sync/Elasticsearch"] == ["Algolia", "Meilisearch"]
+    assert MegaOrchestrator(subsystems=["database_sync"]).verifier is None
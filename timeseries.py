@@ -0,0 +1,161 @@
+"""Time Series Store - Fixed-memory multi-resolution rollups for health and throughput."""
+
+import logging
+from array import array
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
+
+from clock import Clock, SYSTEM_CLOCK
+from history_store import OTHER
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Resolution:
+    step: int
+    capacity: int
+
+    @property
+    def retention(self) -> int:
+        return self.step * self.capacity
+
+# 10 s raw for 6 h, 1 min for 2 days, 1 h for 8 weeks
+DEFAULT_RESOLUTIONS = (Resolution(10, 2160), Resolution(60, 2880), Resolution(3600, 1344))
+
+class RollupRing:
+    """One resolution of one series: parallel arrays indexed by time slot.
+
+    Each slot keeps sum/count/min/max, which merge exactly, so every
+    resolution is written directly instead of being recomputed from the
+    finer one.
+    """
+
+    BYTES_PER_SLOT = 5 * 8
+
+    def __init__(self, resolution: Resolution):
+        self.step = resolution.step
+        self.capacity = resolution.capacity
+        self.slots = array("q", [-1]) * self.capacity
+        self.sums = array("d", [0.0]) * self.capacity
+        self.counts = array("d", [0.0]) * self.capacity
+        self.mins = array("d", [0.0]) * self.capacity
+        self.maxs = array("d", [0.0]) * self.capacity
+
+    def add(self, timestamp: float, value: float) -> None:
+        slot = int(timestamp // self.step)
+        i = slot % self.capacity
+        if self.slots[i] != slot:
+            self.slots[i] = slot
+            self.sums[i] = value
+            self.counts[i] = 1
+            self.mins[i] = value
+            self.maxs[i] = value
+            return
+        self.sums[i] += value
+        self.counts[i] += 1
+        if value < self.mins[i]:
+            self.mins[i] = value
+        if value > self.maxs[i]:
+            self.maxs[i] = value
+
+    def points(self, start: float, end: float) -> List[Tuple[float, float, float, float, float]]:
+        """(slot_start, sum, count, min, max) for populated slots in [start, end]."""
+        first, last = int(start // self.step), int(end // self.step)
+        first = max(first, last - self.capacity + 1)
+        result = []
+        for slot in range(first, last + 1):
+            i = slot % self.capacity
+            if self.slots[i] == slot:
+                result.append((float(slot * self.step), self.sums[i], self.counts[i], self.mins[i], self.maxs[i]))
+        return result
+
+class TimeSeriesStore:
+    """Rollup rings per series key; at most ``max_series`` keys plus ``OTHER``.
+
+    Memory is ``bytes_per_series()`` per key, so the cap bounds the whole
+    store; values for keys past it are rolled up together under ``OTHER``.
+    """
+
+    def __init__(self, resolutions: Tuple[Resolution, ...] = DEFAULT_RESOLUTIONS, max_series: int = 256,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.clock = clock
+        self.resolutions = tuple(sorted(resolutions, key=lambda r: r.step))
+        self.max_series = max_series
+        self.series: Dict[str, List[RollupRing]] = {}
+        self.overflowed = 0
+
+    def record(self, key: str, value: float, timestamp: Optional[float] = None) -> None:
+        rings = self.series.get(key)
+        if rings is None:
+            if len(self.series) >= self.max_series:
+                self.overflowed += 1
+                key = OTHER
+                rings = self.series.get(key)
+            if rings is None:
+                rings = self.series[key] = [RollupRing(r) for r in self.resolutions]
+        ts = timestamp if timestamp is not None else self.clock.time()
+        for ring in rings:
+            ring.add(ts, value)
+
+    def _ring_for(self, key: str, start: float, end: float) -> Optional[RollupRing]:
+        rings = self.series.get(key)
+        if rings is None:
+            return None
+        for ring in rings:
+            # Finest resolution that still holds the whole range
+            oldest_kept = (int(end // ring.step) - ring.capacity + 1) * ring.step
+            if oldest_kept <= start:
+                return ring
+        return rings[-1]
+
+    def query(self, key: str, start: float, end: Optional[float] = None,
+              agg: str = "mean") -> List[Tuple[float, float]]:
+        """(slot_start, value) points at the finest resolution covering the range."""
+        end = end if end is not None else self.clock.time()
+        ring = self._ring_for(key, start, end)
+        if ring is None:
+            return []
+        return [(ts, _reduce(agg, s, n, lo, hi)) for ts, s, n, lo, hi in ring.points(start, end)]
+
+    def aggregate(self, key: str, start: float, end: Optional[float] = None,
+                  agg: str = "mean") -> Optional[float]:
+        """Single value over the range; None when there is no data."""
+        end = end if end is not None else self.clock.time()
+        ring = self._ring_for(key, start, end)
+        if ring is None:
+            return None
+        points = ring.points(start, end)
+        if not points:
+            return None
+        total = sum(p[1] for p in points)
+        count = sum(p[2] for p in points)
+        return _reduce(agg, total, count, min(p[3] for p in points), max(p[4] for p in points))
+
+    def keys(self) -> List[str]:
+        return list(self.series)
+
+    def bytes_per_series(self) -> int:
+        return sum(r.capacity for r in self.resolutions) * RollupRing.BYTES_PER_SLOT
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": len(self.series),
+            "max_series": self.max_series,
+            "overflowed": self.overflowed,
+            "resolutions": [{"step": r.step, "retention_seconds": r.retention} for r in self.resolutions],
+            "bytes": len(self.series) * self.bytes_per_series(),
+            "max_bytes": (self.max_series + 1) * self.bytes_per_series()
+        }
+
+def _reduce(agg: str, total: float, count: float, low: float, high: float) -> float:
+    if agg == "mean":
+        return total / count if count else 0.0
+    if agg == "sum":
+        return total
+    if agg == "count":
+        return count
+    if agg == "min":
+        return low
+    if agg == "max":
+        return high
+    raise ValueError(f"unknown aggregation: {agg}")
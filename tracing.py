@@ -0,0 +1,218 @@
+"""Tracing - Lightweight spans with context propagation and OTLP-style JSON export."""
+
+import contextvars
+import json
+import logging
+import random
+from collections import deque
+from typing import Dict, List, Any, Deque, Optional
+
+from clock import Clock, SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "zero-human-enterprise-grid"
+
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+_current: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+class Span:
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "start_ns",
+                 "end_ns", "attributes", "status", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, span_id: str,
+                 parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token = None
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = self.tracer.clock.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = self.tracer.clock.time_ns()
+        if exc is not None:
+            self.status = STATUS_ERROR
+            self.attributes["exception"] = repr(exc)
+        elif self.status == STATUS_UNSET:
+            self.status = STATUS_OK
+        _current.reset(self._token)
+        self.tracer._finish(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": self.status}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class NonRecordingSpan:
+    """Stand-in for spans outside the sample; marks the context so children skip too."""
+
+    __slots__ = ("_token", "_mark")
+
+    def __init__(self, mark: bool):
+        self._mark = mark
+        self._token = None
+
+    @property
+    def recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "NonRecordingSpan":
+        if self._mark:
+            self._token = _current.set(UNSAMPLED)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+
+UNSAMPLED = object()
+_NOOP = NonRecordingSpan(mark=False)
+
+class Tracer:
+    """Head-sampled tracer; the sampling decision is made once per root span."""
+
+    def __init__(self, sample_rate: float = 0.1, buffer_size: int = 4096,
+                 export_path: Optional[str] = None, export_batch: int = 256, clock: Clock = SYSTEM_CLOCK):
+        self.sample_rate = sample_rate
+        self.clock = clock
+        self.export_path = export_path
+        self.export_batch = export_batch
+        self.finished: Deque[Span] = deque(maxlen=buffer_size)
+        self._pending: List[Span] = []
+        self._random = random.Random()
+        self.spans_started = 0
+        self.spans_evicted = 0
+
+    def configure(self, sample_rate: Optional[float] = None, export_path: Optional[str] = None,
+                  buffer_size: Optional[int] = None) -> None:
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if export_path is not None:
+            self.export_path = export_path
+        if buffer_size is not None:
+            self.finished = deque(self.finished, maxlen=buffer_size)
+
+    def span(self, name: str, **attributes: Any):
+        parent = _current.get()
+        if parent is UNSAMPLED:
+            return _NOOP
+        if parent is None:
+            if self.sample_rate <= 0 or self._random.random() >= self.sample_rate:
+                return NonRecordingSpan(mark=True)
+            trace_id, parent_id = f"{self._random.getrandbits(128):032x}", None
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        self.spans_started += 1
+        return Span(self, name, trace_id, f"{self._random.getrandbits(64):016x}", parent_id, attributes)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        span = _current.get()
+        return span if isinstance(span, Span) else None
+
+    def _finish(self, span: Span) -> None:
+        if len(self.finished) == self.finished.maxlen:
+            self.spans_evicted += 1
+        self.finished.append(span)
+        if self.export_path:
+            self._pending.append(span)
+            if len(self._pending) >= self.export_batch:
+                self.flush()
+
+    def flush(self) -> int:
+        """Append pending spans to export_path as one OTLP/JSON ExportTraceServiceRequest line."""
+        if not self.export_path or not self._pending:
+            return 0
+        spans, self._pending = self._pending, []
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [s.to_otlp() for s in spans]}]
+            }]
+        }
+        try:
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.error(f"Span export to {self.export_path} failed: {e}")
+            return 0
+        return len(spans)
+
+    def trace(self, trace_id: str) -> List[Span]:
+        return [s for s in self.finished if s.trace_id == trace_id]
+
+    def slowest(self, name: str, limit: int = 5) -> List[Span]:
+        """Slowest buffered spans with this name, e.g. ``database_sync.cycle``."""
+        return sorted((s for s in self.finished if s.name == name), key=lambda s: s.duration_ms, reverse=True)[:limit]
+
+    def critical_path(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Walk from the root through the child that finished last at each level."""
+        spans = self.trace(trace_id)
+        children: Dict[Optional[str], List[Span]] = {}
+        ids = {s.span_id for s in spans}
+        for s in spans:
+            children.setdefault(s.parent_id if s.parent_id in ids else None, []).append(s)
+
+        path = []
+        level = children.get(None, [])
+        while level:
+            span = max(level, key=lambda s: s.end_ns)
+            path.append({"name": span.name, "duration_ms": round(span.duration_ms, 3), "attributes": dict(span.attributes)})
+            level = children.get(span.span_id, [])
+        return path
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "spans_started": self.spans_started,
+            "buffered": len(self.finished),
+            "evicted": self.spans_evicted,
+            "export_path": self.export_path
+        }
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+TRACER = Tracer()
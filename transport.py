@@ -0,0 +1,350 @@
+"""Transport - Shared keep-alive HTTP client pool and the common connector base class."""
+
+import asyncio
+import contextlib
+import ipaddress
+import logging
+import socket
+import time
+from typing import Dict, List, Any, AsyncIterator, Iterator, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+
+import httpcore
+import httpx
+
+from clock import Clock, SYSTEM_CLOCK
+from payload_codec import CODECS, EndpointCodec, Encoded
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 multiplexing in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+@dataclass
+class TransportLimits:
+    max_connections: int = 256      # requests in flight across all hosts
+    max_per_host: int = 32          # pooled connections per origin
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    dns_ttl: float = 300.0
+
+class DnsCache:
+    """Resolved addresses per (host, port) for ``ttl`` seconds; concurrent lookups share one query."""
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+            self._entries[key] = (time.monotonic() + self.ttl, addresses)
+            future.set_result(addresses)
+            return addresses
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here so an unawaited future does not warn
+            raise
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, host: str, port: int) -> None:
+        self._entries.pop((host, port), None)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Opens TCP connections to cached addresses; TLS still verifies against the original host name."""
+
+    def __init__(self, dns: DnsCache):
+        self.dns = dns
+        self._inner = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None, socket_options=None):
+        last_error: Optional[Exception] = None
+        for address in await self.dns.resolve(host, port):
+            try:
+                return await self._inner.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        # Every cached address failed; the next connection resolves afresh
+        self.dns.invalidate(host, port)
+        raise last_error or httpcore.ConnectError(f"no addresses for {host}")
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None, socket_options=None):
+        return await self._inner.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._inner.sleep(seconds)
+
+# Most specific first: the timeouts are also network errors
+_HTTPCORE_ERRORS: List[Tuple[type, type]] = [
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+]
+
+@contextlib.contextmanager
+def _as_httpx_errors(request: httpx.Request) -> Iterator[None]:
+    try:
+        yield
+    except Exception as e:
+        for core_error, httpx_error in _HTTPCORE_ERRORS:
+            if isinstance(e, core_error):
+                raise httpx_error(str(e), request=request) from e
+        raise
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: Any, request: httpx.Request, slot: Optional[asyncio.Semaphore] = None):
+        self._stream = stream
+        self._request = request
+        self._slot = slot
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _as_httpx_errors(self._request):
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            if hasattr(self._stream, "aclose"):
+                await self._stream.aclose()
+        finally:
+            # The request holds its transport-wide slot until its body is done with
+            slot, self._slot = self._slot, None
+            if slot is not None:
+                slot.release()
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """An httpx transport over an httpcore pool whose connections go through the DNS cache.
+
+    httpx's own transport cannot be given a network backend, so this one is
+    built on the public interfaces of both libraries instead. Every request
+    holds one of ``slots``, shared by all origins, until its response is
+    closed, whichever client it was sent through.
+    """
+
+    def __init__(self, limits: TransportLimits, dns: DnsCache, slots: asyncio.Semaphore):
+        self.slots = slots
+        self.pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_per_host,
+            max_keepalive_connections=limits.max_per_host,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=HTTP2_AVAILABLE,
+            network_backend=CachingNetworkBackend(dns)
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(scheme=request.url.raw_scheme, host=request.url.raw_host,
+                             port=request.url.port, target=request.url.raw_path),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions
+        )
+        await self.slots.acquire()
+        try:
+            with _as_httpx_errors(request):
+                response = await self.pool.handle_async_request(core_request)
+        except BaseException:
+            self.slots.release()
+            raise
+        return httpx.Response(status_code=response.status, headers=response.headers,
+                              stream=_ResponseStream(response.stream, request, self.slots),
+                              extensions=response.extensions)
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+class Transport:
+    """One keep-alive client per origin, shared by every connector in the process.
+
+    Connections are reused across cycles, so TLS handshakes and DNS lookups
+    happen once per connection rather than per call. With ``h2`` installed
+    requests to the same origin are multiplexed over HTTP/2.
+    """
+
+    def __init__(self, limits: Optional[TransportLimits] = None):
+        self.limits = limits or TransportLimits()
+        self.dns = DnsCache(self.limits.dns_ttl)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests = 0
+        self.errors = 0
+
+    @staticmethod
+    def origin(url: str) -> str:
+        parsed = httpx.URL(url if "://" in url else f"https://{url}")
+        default_port = 443 if parsed.scheme == "https" else 80
+        return f"{parsed.scheme}://{parsed.host}:{parsed.port or default_port}"
+
+    def _bind_loop(self) -> None:
+        # Pools and semaphores belong to one event loop; a new loop starts fresh
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not self._loop:
+            stale, self._clients = list(self._clients.values()), {}
+            if stale and loop is not None:
+                loop.create_task(self._close_stale(stale))
+            self._slots = asyncio.Semaphore(self.limits.max_connections)
+            self._loop = loop
+
+    @staticmethod
+    async def _close_stale(clients: List[httpx.AsyncClient]) -> None:
+        # Their sockets belong to the previous loop; if it is gone, closing is best effort
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"[Transport] Closing a client from a previous event loop failed: {e!r}")
+
+    def client(self, url: str) -> httpx.AsyncClient:
+        self._bind_loop()
+        origin = self.origin(url)
+        client = self._clients.get(origin)
+        if client is None:
+            client = self._clients[origin] = httpx.AsyncClient(
+                base_url=origin,
+                transport=PooledTransport(self.limits, self.dns, self._slots),
+                timeout=httpx.Timeout(self.limits.read_timeout, connect=self.limits.connect_timeout)
+            )
+        return client
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        client = self.client(url)
+        self.requests += 1
+        try:
+            return await client.request(method, url if "://" in url else f"https://{url}", **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "origins": sorted(self._clients),
+            "requests": self.requests,
+            "errors": self.errors,
+            "dns": self.dns.get_status()
+        }
+
+TRANSPORT = Transport()
+
+class BaseConnector:
+    """Connection state every connector shares, and its handle on the pooled HTTP transport.
+
+    Subclasses describe what they connect to in ``target``; HTTP-based ones
+    also return their API address from ``base_url``. Payloads go out through
+    the endpoint's codec in ``wire_format`` ("binary" or "json").
+    """
+
+    wire_format = "binary"
+
+    def __init__(self, config: Any):
+        self.config = config
+        self.connected = False
+        self.last_sync: Optional[datetime] = None
+        # Stamps last_sync; managers hand their own clock over on registration
+        self.clock: Clock = SYSTEM_CLOCK
+        # Set by a ClusterMember to the lease this connector writes under
+        self.fence: Optional[Any] = None
+
+    @property
+    def target(self) -> str:
+        return "endpoint"
+
+    def base_url(self) -> Optional[str]:
+        return None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        url = self.base_url()
+        if url is None:
+            raise RuntimeError(f"{self.config.name} does not speak HTTP")
+        return TRANSPORT.client(url)
+
+    @property
+    def codec(self) -> EndpointCodec:
+        return CODECS.get(self.config.name, self.wire_format)
+
+    def encode(self, payload: Any) -> Encoded:
+        return self.codec.encode(payload)
+
+    async def request(self, method: str, path: str = "", payload: Any = None, **kwargs: Any) -> httpx.Response:
+        url = self.base_url()
+        if url is None:
+            raise RuntimeError(f"{self.config.name} does not speak HTTP")
+        if payload is None:
+            return await TRANSPORT.request(method, url.rstrip("/") + path, **kwargs)
+        encoded = self.encode(payload)
+        kwargs["headers"] = {**encoded.headers, **kwargs.get("headers", {})}
+        started = time.monotonic()
+        response = await TRANSPORT.request(method, url.rstrip("/") + path, content=encoded.body, **kwargs)
+        self.codec.compression.observe_link(len(encoded.body), time.monotonic() - started)
+        return response
+
+    async def connect(self) -> bool:
+        logger.info(f"[{self.config.name}] Connecting to {self.target}...")
+        await self._open()
+        self.connected = True
+        return True
+
+    async def _open(self) -> None:
+        # Stand-in for the protocol handshake; HTTP connections are opened lazily by the pool
+        await asyncio.sleep(0.1)
+
+    def ensure_connected(self) -> None:
+        if not self.connected:
+            raise Exception("Not connected")
@@ -0,0 +1,196 @@
+"""Verifier - Sampled consistency checks between replicated endpoints, with targeted repair."""
+
+import asyncio
+import logging
+import math
+import random
+import zlib
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from dataclasses import dataclass
+
+from bulk_load import split_ranges
+
+logger = logging.getLogger(__name__)
+
+def digest(value: Any) -> int:
+    """Stable content checksum; equal rows, objects or documents give equal digests."""
+    return zlib.crc32(repr(value).encode("utf-8"))
+
+def stratify(keys: Sequence, count: int) -> List[Sequence]:
+    """Contiguous ranges for an ordered key space, hash buckets for anything else."""
+    if isinstance(keys, range):
+        return [range(r.start, r.end) for r in split_ranges(keys.start, keys.stop, count)]
+    strata: List[List[Any]] = [[] for _ in range(count)]
+    for key in keys:
+        strata[digest(key) % count].append(key)
+    return strata
+
+@dataclass
+class StratumStats:
+    sampled: int = 0
+    diverged: int = 0
+    repairs: int = 0
+
+    def smoothed(self) -> float:
+        # Never exactly 0 or 1, so a clean sample still leaves an upper bound and earns samples
+        return (self.diverged + 0.5) / (self.sampled + 1)
+
+@dataclass
+class ReplicaCheck:
+    """A source and the targets that should hold the same keys.
+
+    Source and targets provide ``replica_keys()``, ``read_digests(keys)``
+    and ``repair_from(source, keys)``.
+    """
+    name: str
+    source: Any
+    targets: List[Any]
+    strata: int = 16
+
+class ConsistencyVerifier:
+    """Estimates per-target divergence from stratified random samples under an I/O budget.
+
+    Each round spends at most ``budget * interval`` key reads (a key read on
+    the source and every target counts once per endpoint), shared between
+    checks. Samples go to strata in proportion to size times the standard
+    deviation seen so far (Neyman allocation), so strata that have shown
+    divergence are sampled harder. The estimate is the size-weighted
+    divergence rate with a normal-approximation interval; strata not sampled
+    yet widen the upper bound by their full weight. A stratum with
+    ``repair_after`` diverged samples is re-copied from the source on its own,
+    at most ``max_repairs`` per check per round.
+    """
+
+    def __init__(self, budget: float = 100.0, interval: float = 30.0, z: float = 1.96,
+                 repair_after: int = 1, max_repairs: int = 1, seed: Optional[int] = None):
+        self.budget = budget
+        self.interval = interval
+        self.z = z
+        self.repair_after = repair_after
+        self.max_repairs = max_repairs
+        self.rng = random.Random(seed)
+        self.checks: List[ReplicaCheck] = []
+        self.stats: Dict[Tuple[str, str], List[StratumStats]] = {}
+        self.sizes: Dict[str, List[int]] = {}
+        self.rounds = 0
+        self.reads = 0
+        self.repairs = 0
+        self.repaired_keys = 0
+
+    def add(self, name: str, source: Any, targets: List[Any], strata: int = 16) -> None:
+        self.checks.append(ReplicaCheck(name, source, targets, strata))
+        for target in targets:
+            self.stats[(name, target.config.name)] = [StratumStats() for _ in range(strata)]
+        logger.info(f"[Verifier] {name}: {source.config.name} -> {[t.config.name for t in targets]}")
+
+    def _allocate(self, check: ReplicaCheck, strata: List[Sequence], samples: int) -> List[int]:
+        weights = []
+        for h, keys in enumerate(strata):
+            p = sum(self.stats[(check.name, t.config.name)][h].smoothed() for t in check.targets) / len(check.targets)
+            weights.append(len(keys) * math.sqrt(p * (1 - p)))
+        total = sum(weights)
+        if total == 0:
+            return [0] * len(strata)
+        allocation = [min(len(keys), int(samples * w / total)) for keys, w in zip(strata, weights)]
+        # Hand out what flooring left over, largest weight first
+        for h in sorted(range(len(strata)), key=lambda h: -weights[h]):
+            if sum(allocation) >= samples:
+                break
+            if allocation[h] < len(strata[h]):
+                allocation[h] += 1
+        return allocation
+
+    async def verify(self, check: ReplicaCheck, reads: int) -> None:
+        strata = stratify(await check.source.replica_keys(), check.strata)
+        self.sizes[check.name] = [len(keys) for keys in strata]
+        allocation = self._allocate(check, strata, reads // (1 + len(check.targets)))
+        sample = {h: self.rng.sample(strata[h], n) for h, n in enumerate(allocation) if n}
+        keys = [key for picked in sample.values() for key in picked]
+        if not keys:
+            return
+
+        expected = await check.source.read_digests(keys)
+        self.reads += len(keys)
+        replies = await asyncio.gather(*(t.read_digests(keys) for t in check.targets), return_exceptions=True)
+        for target, actual in zip(check.targets, replies):
+            if isinstance(actual, BaseException):
+                logger.warning(f"[Verifier] {check.name}: could not read {target.config.name}: {actual}")
+                continue
+            self.reads += len(keys)
+            stats = self.stats[(check.name, target.config.name)]
+            for h, picked in sample.items():
+                stats[h].sampled += len(picked)
+                stats[h].diverged += sum(1 for key in picked if actual.get(key) != expected.get(key))
+
+            suspect = [h for h, s in enumerate(stats) if s.diverged >= self.repair_after]
+            for h in sorted(suspect, key=lambda h: -stats[h].diverged / stats[h].sampled)[:self.max_repairs]:
+                await self._repair(check, target, h, strata[h])
+
+    async def _repair(self, check: ReplicaCheck, target: Any, h: int, keys: Sequence) -> None:
+        stats = self.stats[(check.name, target.config.name)][h]
+        logger.warning(f"[Verifier] {check.name}: {target.config.name} diverged in stratum {h} "
+                       f"({stats.diverged}/{stats.sampled} sampled keys); repairing {len(keys)} keys")
+        try:
+            repaired = await target.repair_from(check.source, keys)
+        except Exception as e:
+            logger.error(f"[Verifier] {check.name}: repair of {target.config.name} stratum {h} failed: {e}")
+            return
+        self.repairs += 1
+        self.repaired_keys += repaired
+        # The stratum was just re-copied; earlier samples no longer describe it
+        self.stats[(check.name, target.config.name)][h] = StratumStats(repairs=stats.repairs + 1)
+
+    async def verify_once(self) -> None:
+        if not self.checks:
+            return
+        self.rounds += 1
+        share = int(self.budget * self.interval) // len(self.checks)
+        for check in self.checks:
+            try:
+                await self.verify(check, share)
+            except Exception as e:
+                logger.error(f"[Verifier] {check.name} round failed: {e}")
+
+    async def run(self) -> None:
+        while True:
+            await self.verify_once()
+            await asyncio.sleep(self.interval)
+
+    def estimate(self, check: str, target: str) -> Dict[str, Any]:
+        """Divergent share of the target's keys, with a ``z`` confidence interval."""
+        stats = self.stats[(check, target)]
+        sizes = self.sizes.get(check) or [0] * len(stats)
+        total = sum(sizes)
+        if total == 0:
+            return {"divergence": None, "low": None, "high": None, "sampled": 0}
+        rate = variance = unsampled = 0.0
+        for size, s in zip(sizes, stats):
+            weight = size / total
+            if s.sampled == 0:
+                unsampled += weight
+                continue
+            p = s.diverged / s.sampled
+            q = s.smoothed()
+            rate += weight * p
+            fpc = max(0.0, 1 - s.sampled / size) if size else 0.0
+            variance += weight ** 2 * q * (1 - q) / s.sampled * fpc
+        margin = self.z * math.sqrt(variance)
+        return {
+            "divergence": round(rate, 6),
+            "low": round(max(0.0, rate - margin), 6),
+            "high": round(min(1.0, rate + margin + unsampled), 6),
+            "sampled": sum(s.sampled for s in stats)
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "rounds": self.rounds,
+            "reads": self.reads,
+            "budget": self.budget,
+            "repairs": self.repairs,
+            "repaired_keys": self.repaired_keys,
+            "checks": {
+                check.name: {t.config.name: self.estimate(check.name, t.config.name) for t in check.targets}
+                for check in self.checks
+            }
+        }
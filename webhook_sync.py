@@ -1,14 +1,28 @@
 """Webhook Event Manager - Event-driven synchronization."""
 
 import asyncio
+import contextvars
+import hashlib
+import hmac
 import logging
-from typing import Dict, List, Any, Callable, Optional
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional, Set, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+from history_store import HistoryStore
+from tracing import TRACER
+
 logger = logging.getLogger(__name__)
 
+# Ordered handlers whose worker is running the current task (or spawned it)
+_ORDERED_ACTIVE: contextvars.ContextVar = contextvars.ContextVar("ordered_handlers", default=frozenset())
+
+class WorkerStopped(RuntimeError):
+    """An ordered handler's worker exited before handling the event."""
+
 class EventType(Enum):
     DEPLOYMENT = "deployment"
     DATA_SYNC = "data_sync"
@@ -21,51 +35,356 @@ class WebhookEvent:
     source: str
     timestamp: datetime
     data: Dict[str, Any]
+    coalesced: int = 1
+
+    @classmethod
+    def from_dict(cls, payload: Any) -> "WebhookEvent":
+        """Validate an inbound JSON payload; raises ValueError on bad input."""
+        if not isinstance(payload, dict):
+            raise ValueError("payload must be a JSON object")
+        try:
+            event_type = EventType(payload.get("event_type"))
+        except ValueError:
+            raise ValueError(f"unknown event_type: {payload.get('event_type')!r}")
+        source = payload.get("source")
+        if not isinstance(source, str) or not source:
+            raise ValueError("source must be a non-empty string")
+        data = payload.get("data", {})
+        if not isinstance(data, dict):
+            raise ValueError("data must be a JSON object")
+        timestamp = datetime.utcnow()
+        if payload.get("timestamp") is not None:
+            try:
+                timestamp = datetime.fromisoformat(payload["timestamp"])
+            except (TypeError, ValueError):
+                raise ValueError("timestamp must be an ISO-8601 string")
+        return cls(event_type, source, timestamp, data)
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check an ``sha256=<hex>`` HMAC header against the raw request body."""
+    if not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+@dataclass
+class CoalesceConfig:
+    window: float = 0.5
+    max_delay: float = 5.0
+
+@dataclass
+class PendingBurst:
+    events: List[WebhookEvent]
+    first_seen: float
+    timer: Optional[asyncio.TimerHandle] = None
+
+    def merge(self) -> WebhookEvent:
+        first, last = self.events[0], self.events[-1]
+        if len(self.events) == 1:
+            return first
+        data: Dict[str, Any] = {}
+        for event in self.events:
+            data.update(event.data)
+        data["coalesced_events"] = [event.data for event in self.events]
+        return WebhookEvent(first.event_type, first.source, last.timestamp, data,
+                            coalesced=sum(event.coalesced for event in self.events))
+
+@dataclass
+class HandlerStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    def record(self, latency: float) -> None:
+        self.calls += 1
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def to_dict(self) -> Dict[str, Any]:
+        avg = self.total_latency / self.calls if self.calls else 0.0
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_latency_ms": round(avg * 1000, 3),
+            "max_latency_ms": round(self.max_latency * 1000, 3)
+        }
+
+@dataclass
+class HandlerRegistration:
+    name: str
+    handler: Callable
+    timeout: Optional[float] = None
+    ordered: bool = False
+    stats: HandlerStats = field(default_factory=HandlerStats)
+    queue: Optional[asyncio.Queue] = None
+    worker: Optional[asyncio.Task] = None
+
+    @property
+    def is_async(self) -> bool:
+        return asyncio.iscoroutinefunction(self.handler)
 
 class WebhookManager:
-    def __init__(self):
-        self.event_handlers: Dict[EventType, List[Callable]] = {}
-        self.event_history: List[WebhookEvent] = []
+    def __init__(self, max_concurrency: int = 32, handler_timeout: float = 5.0,
+                 executor_workers: int = 8, queue_size: int = 10000,
+                 ingest_workers: int = 4, ingest_batch_size: int = 64,
+                 history_capacity: int = 10000):
+        self.event_handlers: Dict[EventType, List[HandlerRegistration]] = {}
+        self.event_history = HistoryStore(history_capacity)
         self.is_running = False
-    
-    def register_handler(self, event_type: EventType, handler: Callable) -> None:
+        self.max_concurrency = max_concurrency
+        self.handler_timeout = handler_timeout
+        self.executor_workers = executor_workers
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.ingest_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.ingest_workers = ingest_workers
+        self.ingest_batch_size = ingest_batch_size
+        self.events_accepted = 0
+        self.events_rejected = 0
+        self.events_processed = 0
+        self.ingest_errors = 0
+        self.coalesce_configs: Dict[EventType, CoalesceConfig] = {}
+        self._pending: Dict[Tuple[EventType, str], PendingBurst] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.events_merged = 0
+        self.bursts_flushed = 0
+
+    def register_handler(self, event_type: EventType, handler: Callable,
+                         timeout: Optional[float] = None, ordered: bool = False) -> None:
+        """Register a handler; ordered handlers see events strictly one at a time in emit order."""
         if event_type not in self.event_handlers:
             self.event_handlers[event_type] = []
-        self.event_handlers[event_type].append(handler)
+        handlers = self.event_handlers[event_type]
+        name = f"{event_type.value}.{getattr(handler, '__qualname__', type(handler).__name__)}"
+        if any(r.name == name for r in handlers):
+            name = f"{name}#{len(handlers)}"
+        handlers.append(HandlerRegistration(name, handler, timeout, ordered))
         logger.info(f"Registered handler for {event_type.value}")
-    
+
+    def enable_coalescing(self, event_type: EventType, window: float = 0.5,
+                          max_delay: float = 5.0) -> None:
+        """Merge bursts of event_type per source until quiet for window seconds (at most max_delay)."""
+        self.coalesce_configs[event_type] = CoalesceConfig(window, max(window, max_delay))
+        logger.info(f"Coalescing {event_type.value} events (window={window}s, max_delay={max_delay}s)")
+
     async def emit_event(self, event: WebhookEvent) -> None:
         logger.info(f"[Event] {event.event_type.value} from {event.source}")
-        self.event_history.append(event)
-        
+        self.event_history.record(event.source, event.event_type.value, event.coalesced, payload=event.data)
+
+        if event.event_type in self.coalesce_configs:
+            self._buffer(event)
+            return
+        await self._fan_out(event)
+
+    def _buffer(self, event: WebhookEvent) -> None:
+        config = self.coalesce_configs[event.event_type]
+        key = (event.event_type, event.source)
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        burst = self._pending.get(key)
+        if burst is None:
+            burst = self._pending[key] = PendingBurst([], now)
+        else:
+            self.events_merged += 1
+        burst.events.append(event)
+
+        # Debounce: every arrival pushes the flush back, but never past first_seen + max_delay
+        if burst.timer is not None:
+            burst.timer.cancel()
+        delay = min(config.window, burst.first_seen + config.max_delay - now)
+        burst.timer = loop.call_later(max(delay, 0.0), self._flush_burst, key)
+
+    def _flush_burst(self, key: Tuple[EventType, str]) -> None:
+        burst = self._pending.pop(key, None)
+        if burst is None:
+            return
+        if burst.timer is not None:
+            burst.timer.cancel()
+        self.bursts_flushed += 1
+        task = asyncio.get_running_loop().create_task(self._fan_out(burst.merge()))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush_coalesced(self) -> None:
+        """Dispatch every pending burst now and wait for its handlers."""
+        for key in list(self._pending):
+            self._flush_burst(key)
+        if self._flush_tasks:
+            await asyncio.gather(*list(self._flush_tasks))
+
+    async def _fan_out(self, event: WebhookEvent) -> None:
         handlers = self.event_handlers.get(event.event_type, [])
-        for handler in handlers:
+        if not handlers:
+            return
+        with TRACER.span("webhook.emit", event_type=event.event_type.value, source=event.source,
+                         handlers=len(handlers), coalesced=event.coalesced):
+            # Fan out concurrently so total latency tracks the slowest handler
+            await asyncio.gather(*(self._dispatch(reg, event) for reg in handlers))
+
+    async def _dispatch(self, reg: HandlerRegistration, event: WebhookEvent) -> None:
+        if not reg.ordered:
+            await self._invoke(reg, event)
+            return
+        if reg.name in _ORDERED_ACTIVE.get():
+            # Emitted from inside this handler: queueing behind itself would never finish
+            logger.debug(f"Re-entrant emit for ordered handler {reg.name}; dispatching unordered")
+            await self._invoke(reg, event)
+            return
+        if reg.queue is None:
+            reg.queue = asyncio.Queue()
+        if reg.worker is None or reg.worker.done():
+            reg.worker = asyncio.create_task(self._ordered_worker(reg))
+        done = asyncio.get_running_loop().create_future()
+        await reg.queue.put((event, done))
+        await done
+
+    async def _ordered_worker(self, reg: HandlerRegistration) -> None:
+        _ORDERED_ACTIVE.set(_ORDERED_ACTIVE.get() | {reg.name})
+        done = None
+        try:
+            while True:
+                event, done = await reg.queue.get()
+                try:
+                    await self._invoke(reg, event)
+                    if not done.done():
+                        done.set_result(None)
+                finally:
+                    reg.queue.task_done()
+        finally:
+            # Cancelled or crashed: nobody is left to handle what callers are waiting on
+            error = WorkerStopped(f"Ordered worker for {reg.name} stopped")
+            if done is not None and not done.done():
+                done.set_exception(error)
+            while not reg.queue.empty():
+                _, pending = reg.queue.get_nowait()
+                if not pending.done():
+                    pending.set_exception(error)
+                reg.queue.task_done()
+
+    async def _invoke(self, reg: HandlerRegistration, event: WebhookEvent) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        timeout = reg.timeout if reg.timeout is not None else self.handler_timeout
+
+        async with self._semaphore:
+            with TRACER.span("webhook.handler", handler=reg.name) as span:
+                started = time.perf_counter()
+                try:
+                    if reg.is_async:
+                        await asyncio.wait_for(reg.handler(event), timeout)
+                    else:
+                        # Sync handlers run off-loop; on timeout the thread is abandoned, not killed
+                        loop = asyncio.get_running_loop()
+                        await asyncio.wait_for(
+                            loop.run_in_executor(self._get_executor(), reg.handler, event), timeout
+                        )
+                except asyncio.TimeoutError:
+                    span.set_attribute("timeout", True)
+                    reg.stats.timeouts += 1
+                    reg.stats.errors += 1
+                    logger.error(f"Handler timeout: {reg.name} after {timeout}s")
+                except Exception as e:
+                    span.set_attribute("error", repr(e))
+                    reg.stats.errors += 1
+                    logger.error(f"Handler error: {reg.name}: {e}")
+                finally:
+                    reg.stats.record(time.perf_counter() - started)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.executor_workers, thread_name_prefix="webhook-handler"
+            )
+        return self._executor
+
+    def _shutdown_handlers(self) -> None:
+        for handlers in self.event_handlers.values():
+            for reg in handlers:
+                if reg.worker is not None and not reg.worker.done():
+                    reg.worker.cancel()
+                reg.worker = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def submit(self, event: WebhookEvent) -> bool:
+        """Buffer an inbound event without waiting; False means the queue is full."""
+        try:
+            self.ingest_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.events_rejected += 1
+            return False
+        self.events_accepted += 1
+        return True
+
+    async def _ingest_worker(self) -> None:
+        while self.is_running:
+            batch = [await self.ingest_queue.get()]
+            while len(batch) < self.ingest_batch_size and not self.ingest_queue.empty():
+                batch.append(self.ingest_queue.get_nowait())
             try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
-                else:
-                    handler(event)
-            except Exception as e:
-                logger.error(f"Handler error: {e}")
-    
+                # One failing event must not take the worker, and with it the listener, down
+                outcomes = await asyncio.gather(*(self.emit_event(event) for event in batch), return_exceptions=True)
+                for event, outcome in zip(batch, outcomes):
+                    if isinstance(outcome, Exception):
+                        self.ingest_errors += 1
+                        logger.error(f"✗ {event.event_type.value} from {event.source}: {outcome!r}")
+            finally:
+                self.events_processed += len(batch)
+                for _ in batch:
+                    self.ingest_queue.task_done()
+
     async def run_webhook_listener(self) -> None:
         self.is_running = True
         logger.info("\n" + "="*80)
         logger.info("WEBHOOK MANAGER STARTED")
+        logger.info(f"Ingest workers: {self.ingest_workers}, queue size: {self.ingest_queue.maxsize}")
         logger.info("="*80 + "\n")
-        
+
+        workers = [asyncio.create_task(self._ingest_worker()) for _ in range(self.ingest_workers)]
         try:
-            while self.is_running:
-                await asyncio.sleep(10)
+            await asyncio.gather(*workers)
         except KeyboardInterrupt:
             logger.info("Webhook listener stopped.")
         finally:
             self.is_running = False
+            for worker in workers:
+                worker.cancel()
+            # Bursts still waiting out their window were accepted; deliver them before the handlers go
+            try:
+                await self.flush_coalesced()
+            except Exception as e:
+                logger.error(f"✗ flushing coalesced events on shutdown: {e!r}")
+            self._shutdown_handlers()
             logger.info("Webhook Manager Stopped")
-    
+
     def get_status(self) -> Dict[str, Any]:
         return {
             "running": self.is_running,
             "registered_event_types": len(self.event_handlers),
-            "total_events": len(self.event_history)
+            "total_events": self.event_history.total_records,
+            "ingest": {
+                "queued": self.ingest_queue.qsize(),
+                "capacity": self.ingest_queue.maxsize,
+                "accepted": self.events_accepted,
+                "rejected": self.events_rejected,
+                "processed": self.events_processed,
+                "errors": self.ingest_errors
+            },
+            "coalescing": {
+                "event_types": [t.value for t in self.coalesce_configs],
+                "pending_bursts": len(self._pending),
+                "events_merged": self.events_merged,
+                "bursts_flushed": self.bursts_flushed
+            },
+            "handlers": {
+                reg.name: reg.stats.to_dict()
+                for handlers in self.event_handlers.values()
+                for reg in handlers
+            }
         }